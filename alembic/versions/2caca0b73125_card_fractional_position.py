@@ -0,0 +1,52 @@
+"""Card fractional position
+
+Revision ID: 2caca0b73125
+Revises: 86ec981024eb
+Create Date: 2026-10-18 10:12:41.503218
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2caca0b73125'
+down_revision: Union[str, Sequence[str], None] = '86ec981024eb'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Renumber the cards of every list to 1..n keeping the current order.
+# Old rows created by 'cb1a4b0cfd38' share position 1, so this also removes duplicates.
+RENUMBER_POSITIONS = """
+    UPDATE cards SET position = ranked.rank
+    FROM (
+        SELECT id, ROW_NUMBER() OVER (
+            PARTITION BY list_id ORDER BY position, name, id
+        ) AS rank
+        FROM cards
+    ) AS ranked
+    WHERE cards.id = ranked.id
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('cards') as batch_op:
+        batch_op.alter_column('position', type_=sa.Float(),
+                              existing_type=sa.Integer(), existing_nullable=False)
+
+    # Backfill: dense integer positions are valid ranks for both position modes
+    op.execute(RENUMBER_POSITIONS)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Drop the fractional part before going back to integers
+    op.execute(RENUMBER_POSITIONS)
+
+    with op.batch_alter_table('cards') as batch_op:
+        batch_op.alter_column('position', type_=sa.Integer(),
+                              existing_type=sa.Float(), existing_nullable=False)
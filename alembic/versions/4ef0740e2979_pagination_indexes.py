@@ -0,0 +1,39 @@
+"""pagination indexes
+
+Revision ID: 4ef0740e2979
+Revises: 6171a903f1fc
+Create Date: 2026-10-18 08:02:16.579894
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4ef0740e2979'
+down_revision: Union[str, Sequence[str], None] = '6171a903f1fc'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Keyset pagination (see `app.pagination`): the id is added to the order of the indexes
+    op.create_index('ix_boards_user_id_is_inbox_id', 'boards',
+                    ['user_id', 'is_inbox', 'id'], unique=False)
+    op.drop_index('ix_boards_user_id_is_inbox', table_name='boards')
+    op.create_index('ix_card_tags_tag_id_card_id', 'card_tags',
+                    ['tag_id', 'card_id'], unique=False)
+    op.drop_index('ix_card_tags_tag_id', table_name='card_tags')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index('ix_card_tags_tag_id', 'card_tags',
+                    ['tag_id'], unique=False)
+    op.drop_index('ix_card_tags_tag_id_card_id', table_name='card_tags')
+    op.create_index('ix_boards_user_id_is_inbox', 'boards',
+                    ['user_id', 'is_inbox'], unique=False)
+    op.drop_index('ix_boards_user_id_is_inbox_id', table_name='boards')
@@ -0,0 +1,70 @@
+"""add list and board counters
+
+Revision ID: 6171a903f1fc
+Revises: 725785c9c5ad
+Create Date: 2026-10-18 07:54:50.814854
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6171a903f1fc'
+down_revision: Union[str, Sequence[str], None] = '725785c9c5ad'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('lists', sa.Column('cards_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('lists', sa.Column('done_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('boards', sa.Column('lists_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('boards', sa.Column('cards_count', sa.Integer(), server_default='0', nullable=False))
+
+    # The bottom of the lists and boards is now given by the counters: the positions that have
+    # gaps (deleted cards and lists were not compacted) are renumbered to 1..n, in the same order
+    op.execute("""
+        UPDATE cards SET position = ranked.rank
+        FROM (
+            SELECT id, row_number() OVER (PARTITION BY list_id ORDER BY position, name, id) AS rank
+            FROM cards
+        ) AS ranked
+        WHERE cards.id = ranked.id AND cards.position != ranked.rank
+    """)
+    op.execute("""
+        UPDATE lists SET position = ranked.rank
+        FROM (
+            SELECT id, row_number() OVER (PARTITION BY board_id ORDER BY position, name, id) AS rank
+            FROM lists
+        ) AS ranked
+        WHERE lists.id = ranked.id AND lists.position != ranked.rank
+    """)
+
+    op.execute("""
+        UPDATE lists SET cards_count = counts.cards_count, done_count = counts.done_count
+        FROM (
+            SELECT list_id, count(*) AS cards_count, count(*) FILTER (WHERE is_done) AS done_count
+            FROM cards GROUP BY list_id
+        ) AS counts
+        WHERE lists.id = counts.list_id
+    """)
+    op.execute("""
+        UPDATE boards SET lists_count = counts.lists_count, cards_count = counts.cards_count
+        FROM (
+            SELECT board_id, count(*) AS lists_count, sum(cards_count) AS cards_count
+            FROM lists GROUP BY board_id
+        ) AS counts
+        WHERE boards.id = counts.board_id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('boards', 'cards_count')
+    op.drop_column('boards', 'lists_count')
+    op.drop_column('lists', 'done_count')
+    op.drop_column('lists', 'cards_count')
@@ -0,0 +1,68 @@
+"""Foreign key and composite indexes
+
+Revision ID: 6adf0ab55006
+Revises: 2caca0b73125
+Create Date: 2026-10-18 11:02:17.318764
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6adf0ab55006'
+down_revision: Union[str, Sequence[str], None] = '2caca0b73125'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Single column indexes replaced by the composite ones (or already covered by the primary keys)
+LOW_VALUE_INDEXES = [
+    ('ix_cards_is_done', 'cards', ['is_done']),
+    ('ix_cards_position', 'cards', ['position']),
+    ('ix_lists_position', 'lists', ['position']),
+    ('ix_users_id', 'users', ['id']),
+    ('ix_boards_id', 'boards', ['id']),
+    ('ix_lists_id', 'lists', ['id']),
+    ('ix_cards_id', 'cards', ['id']),
+    ('ix_tags_id', 'tags', ['id']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Foreign keys: cards.list_id, lists.board_id and boards.user_id are the leading
+    # column of the composite indexes, so they do not need their own index.
+    op.create_index('ix_cards_list_id_position', 'cards',
+                    ['list_id', 'position'], unique=False)
+    op.create_index('ix_lists_board_id_position', 'lists',
+                    ['board_id', 'position'], unique=False)
+    op.create_index('ix_boards_user_id_is_inbox', 'boards',
+                    ['user_id', 'is_inbox'], unique=False)
+    op.create_index(op.f('ix_tags_board_id'), 'tags',
+                    ['board_id'], unique=False)
+    op.create_index('ix_card_tags_tag_id', 'card_tags',
+                    ['tag_id'], unique=False)
+
+    # Only one inbox per user
+    op.create_index('ux_boards_user_id_inbox', 'boards', ['user_id'], unique=True,
+                    postgresql_where=sa.text('is_inbox'),
+                    sqlite_where=sa.text('is_inbox'))
+
+    for name, table, _ in LOW_VALUE_INDEXES:
+        op.drop_index(name, table_name=table)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, table, columns in LOW_VALUE_INDEXES:
+        op.create_index(name, table, columns, unique=False)
+
+    op.drop_index('ux_boards_user_id_inbox', table_name='boards')
+    op.drop_index('ix_card_tags_tag_id', table_name='card_tags')
+    op.drop_index(op.f('ix_tags_board_id'), table_name='tags')
+    op.drop_index('ix_boards_user_id_is_inbox', table_name='boards')
+    op.drop_index('ix_lists_board_id_position', table_name='lists')
+    op.drop_index('ix_cards_list_id_position', table_name='cards')
@@ -0,0 +1,49 @@
+"""database cascades and board soft delete
+
+Revision ID: 725785c9c5ad
+Revises: c748e874a636
+Create Date: 2026-10-18 07:45:07.731048
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# (constraint, table, column, referred table) of the foreign keys deleted with their parent
+CASCADED_FOREIGN_KEYS = [
+    ('boards_user_id_fkey', 'boards', 'user_id', 'users'),
+    ('lists_board_id_fkey', 'lists', 'board_id', 'boards'),
+    ('cards_list_id_fkey', 'cards', 'list_id', 'lists'),
+    ('tags_board_id_fkey', 'tags', 'board_id', 'boards'),
+]
+
+# revision identifiers, used by Alembic.
+revision: str = '725785c9c5ad'
+down_revision: Union[str, Sequence[str], None] = 'c748e874a636'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for name, table, column, referred_table in CASCADED_FOREIGN_KEYS:
+        op.drop_constraint(name, table, type_='foreignkey')
+        op.create_foreign_key(name, table, referred_table, [column], ['id'],
+                              ondelete='CASCADE')
+
+    op.add_column('boards', sa.Column('deleted_at', sa.DateTime(), nullable=True))
+    op.create_index('ix_boards_deleted_at', 'boards', ['deleted_at'], unique=False,
+                    postgresql_where=sa.text('deleted_at IS NOT NULL'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_boards_deleted_at', table_name='boards',
+                  postgresql_where=sa.text('deleted_at IS NOT NULL'))
+    op.drop_column('boards', 'deleted_at')
+
+    for name, table, column, referred_table in CASCADED_FOREIGN_KEYS:
+        op.drop_constraint(name, table, type_='foreignkey')
+        op.create_foreign_key(name, table, referred_table, [column], ['id'])
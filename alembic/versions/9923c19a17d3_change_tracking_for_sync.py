@@ -0,0 +1,86 @@
+"""Change tracking for sync
+
+Revision ID: 9923c19a17d3
+Revises: a253a23543d6
+Create Date: 2026-10-18 07:25:42.325490
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9923c19a17d3'
+down_revision: Union[str, Sequence[str], None] = 'a253a23543d6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+SYNCED_TABLES = ['lists', 'cards', 'tags']
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in ['boards', *SYNCED_TABLES]:
+        op.add_column(table, sa.Column('created_at', sa.DateTime(),
+                      server_default=sa.text('now()'), nullable=False))
+        op.add_column(table, sa.Column('updated_at', sa.DateTime(),
+                      server_default=sa.text('now()'), nullable=False))
+
+    op.add_column('card_tags', sa.Column('created_at', sa.DateTime(),
+                  server_default=sa.text('now()'), nullable=False))
+
+    for table in SYNCED_TABLES:
+        op.add_column(table, sa.Column('change_seq', sa.Integer(),
+                      server_default='1', nullable=False))
+
+    # Existing rows are stamped with the current version of their board
+    op.execute("""
+        UPDATE lists SET change_seq = boards.version
+        FROM boards WHERE boards.id = lists.board_id
+    """)
+    op.execute("""
+        UPDATE tags SET change_seq = boards.version
+        FROM boards WHERE boards.id = tags.board_id
+    """)
+    op.execute("""
+        UPDATE cards SET change_seq = boards.version
+        FROM lists JOIN boards ON boards.id = lists.board_id
+        WHERE lists.id = cards.list_id
+    """)
+
+    op.create_index('ix_cards_list_id_change_seq', 'cards',
+                    ['list_id', 'change_seq'], unique=False)
+
+    op.create_table('tombstones',
+                    sa.Column('id', sa.Integer(), nullable=False),
+                    sa.Column('entity', sa.String(length=16), nullable=False),
+                    sa.Column('entity_id', sa.Integer(), nullable=False),
+                    sa.Column('change_seq', sa.Integer(), nullable=False),
+                    sa.Column('deleted_at', sa.DateTime(),
+                              server_default=sa.text('now()'), nullable=False),
+                    sa.Column('board_id', sa.Integer(), nullable=False),
+                    sa.ForeignKeyConstraint(
+                        ['board_id'], ['boards.id'], ondelete='CASCADE'),
+                    sa.PrimaryKeyConstraint('id')
+                    )
+    op.create_index('ix_tombstones_board_id_change_seq', 'tombstones',
+                    ['board_id', 'change_seq'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_tombstones_board_id_change_seq', table_name='tombstones')
+    op.drop_table('tombstones')
+    op.drop_index('ix_cards_list_id_change_seq', table_name='cards')
+
+    for table in SYNCED_TABLES:
+        op.drop_column(table, 'change_seq')
+
+    op.drop_column('card_tags', 'created_at')
+
+    for table in ['boards', *SYNCED_TABLES]:
+        op.drop_column(table, 'updated_at')
+        op.drop_column(table, 'created_at')
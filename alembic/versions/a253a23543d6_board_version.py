@@ -0,0 +1,29 @@
+"""Board version
+
+Revision ID: a253a23543d6
+Revises: 6adf0ab55006
+Create Date: 2026-10-18 07:15:00.437397
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a253a23543d6'
+down_revision: Union[str, Sequence[str], None] = '6adf0ab55006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('boards', sa.Column('version', sa.Integer(),
+                  server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('boards', 'version')
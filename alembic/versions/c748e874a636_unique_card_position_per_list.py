@@ -0,0 +1,42 @@
+"""unique card position per list
+
+Revision ID: c748e874a636
+Revises: 9923c19a17d3
+Create Date: 2026-10-18 07:35:54.483601
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c748e874a636'
+down_revision: Union[str, Sequence[str], None] = '9923c19a17d3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Lists that already have two cards at the same place (concurrent moves) are renumbered to 1..n
+    op.execute("""
+        UPDATE cards SET position = ranked.rank
+        FROM (
+            SELECT id, row_number() OVER (PARTITION BY list_id ORDER BY position, name, id) AS rank
+            FROM cards
+            WHERE list_id IN (
+                SELECT list_id FROM cards GROUP BY list_id, position HAVING count(*) > 1
+            )
+        ) AS ranked
+        WHERE cards.id = ranked.id
+    """)
+
+    op.create_unique_constraint('uq_cards_list_id_position', 'cards', ['list_id', 'position'],
+                                deferrable=True, initially='DEFERRED')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('uq_cards_list_id_position', 'cards', type_='unique')
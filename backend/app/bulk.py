@@ -0,0 +1,199 @@
+"""
+Set-based inserts of many cards: the bulk card creation (`POST /boards/{id}/lists/{list_id}/cards:bulk`)
+and the board import (`POST /boards:import`).
+
+Creating cards one request at a time pays for a request, a rank query and an INSERT per card, so a
+backlog of 50k cards takes hours. These routes instead:
+- Read their body as NDJSON (one JSON document per line), parsed as it is received (`iter_ndjson`):
+  only the line being read and the chunk being inserted are held in memory, not the whole body.
+  Sync stack: the route runs on a threadpool worker and receives the body through the event loop.
+  Async stack: it runs in `AsyncSession.run_sync` and awaits the body with `await_only`.
+- Give the positions in memory, from the bottom of the list read once (see `ranking.next_rank`).
+- Insert the cards (and their tag links) by chunks of `BULK_INSERT_CHUNK_SIZE` rows (`insert_rows`):
+  with `COPY` on Postgres (psycopg2 and asyncpg, the ids are taken from the sequence first), with a
+  chunked `executemany` (multi-row INSERT ... RETURNING) on the other databases.
+Everything runs in the transaction of the request: an invalid line rolls back the whole import.
+The counters are updated once (see `app.counters`) and the cards are stamped with one board version.
+"""
+import io
+from collections.abc import Callable, Iterable, Iterator
+from datetime import datetime
+from itertools import islice
+
+import anyio.from_thread
+from fastapi import Request
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import Table, func, insert, select
+from sqlalchemy.orm import Session
+from sqlalchemy.util.concurrency import await_only, in_greenlet
+
+from .core.config import settings
+from .models import Card, card_tags
+
+# Drivers with a COPY API
+COPY_DRIVERS = {"psycopg2", "asyncpg"}
+
+
+# --- Streamed body ---
+def _receive(request: Request) -> Iterator[bytes]:
+    """
+    Yield the chunks of the body as they are received, from the sync code of a route.
+    """
+    stream = request.stream()
+
+    while True:
+        try:
+            if in_greenlet():
+                chunk = await_only(stream.__anext__())
+            else:
+                chunk = anyio.from_thread.run(stream.__anext__)
+        except StopAsyncIteration:
+            return
+
+        yield chunk
+
+
+def _parse_line(model: type[BaseModel], line_number: int, line: bytes) -> BaseModel:
+    try:
+        return model.model_validate_json(line)
+    except ValidationError as error:
+        # Same errors as FastAPI, located by line
+        raise RequestValidationError([
+            {**details, "loc": ("body", line_number, *details["loc"])}
+            for details in error.errors(include_url=False)
+        ])
+
+
+def iter_ndjson(request: Request, *models: type[BaseModel]) -> Iterator[BaseModel]:
+    """
+    Parse the NDJSON body of the request as it is received, each line validated with a model:
+    the first one with `models[0]`, the second one with `models[1]`..., the last model for the rest.
+    Empty lines are skipped. An invalid line raises a `RequestValidationError` (422).
+    """
+    buffer = b""
+    line_number = 0
+
+    def parse(line: bytes) -> BaseModel:
+        nonlocal line_number
+        line_number += 1
+        return _parse_line(models[min(line_number, len(models)) - 1], line_number, line)
+
+    for chunk in _receive(request):
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+
+        for line in lines:
+            if line.strip():
+                yield parse(line)
+
+    if buffer.strip():
+        yield parse(buffer)
+
+
+def chunks(items: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(items)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+# --- Inserts ---
+def _copy_value(value) -> str:
+    # Text format of COPY: \N for NULL, backslash escapes for the separators
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, datetime):
+        value = value.isoformat()
+
+    return str(value).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+
+def _copy_rows(db: Session, table: Table, columns: list[str], rows: list[dict]) -> None:
+    connection = db.connection().connection
+    records = [tuple(row[column] for column in columns) for row in rows]
+
+    if db.get_bind().dialect.driver == "asyncpg":
+        await_only(connection.driver_connection.copy_records_to_table(
+            table.name, records=records, columns=columns))
+        return
+
+    data = io.StringIO("".join(
+        "\t".join(_copy_value(value) for value in record) + "\n" for record in records))
+    cursor = connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY {table.name} ({', '.join(columns)}) FROM STDIN", data)
+    finally:
+        cursor.close()
+
+
+def insert_rows(db: Session, table: Table, rows: list[dict], key: str | None = None) -> dict | None:
+    """
+    Insert the rows (dicts with the same keys) in one statement, with COPY when the driver has it.
+    With `key` (a column with a different value in each row), returns the ids of the new rows by key:
+    the rows returned by a multi-row INSERT are not in order (asking for the order makes SQLAlchemy
+    insert one row at a time on SQLite).
+    """
+    if not rows:
+        return {} if key else None
+
+    if db.get_bind().dialect.driver in COPY_DRIVERS:
+        ids = None
+        if key:
+            new_ids = db.execute(
+                select(func.nextval(func.pg_get_serial_sequence(table.name, "id")))
+                .select_from(func.generate_series(1, len(rows)))
+            ).scalars().all()
+            rows = [{**row, "id": row_id} for row, row_id in zip(rows, new_ids)]
+            ids = {row[key]: row["id"] for row in rows}
+
+        _copy_rows(db, table, list(rows[0]), rows)
+        return ids
+
+    if key:
+        return dict(db.execute(insert(table).returning(table.c[key], table.c.id), rows).all())
+
+    db.execute(insert(table), rows)
+    return None
+
+
+def insert_cards(
+    db: Session,
+    list_id: int,
+    cards: Iterable,
+    position: float,
+    version: int,
+    tag_ids: Callable[[BaseModel], Iterable[int]]
+) -> tuple[int, int]:
+    """
+    Insert the cards at the end of the list, in order, from `position` (the rank of the first one),
+    stamped with `version`, by chunks of `BULK_INSERT_CHUNK_SIZE`. `tag_ids` gives the tags to attach
+    to a card. Returns the number of cards and of done cards inserted. Counters are not updated.
+    """
+    created = done = 0
+
+    for chunk in chunks(cards, settings.BULK_INSERT_CHUNK_SIZE):
+        rows = []
+        for card in chunk:
+            rows.append({
+                "name": card.name,
+                "text": card.text,
+                "is_done": card.is_done,
+                "position": position,
+                "due_date": card.due_date,
+                "list_id": list_id,
+                "change_seq": version,
+            })
+            position += 1
+
+        card_ids = insert_rows(db, Card.__table__, rows, key="position")
+        insert_rows(db, card_tags, [
+            {"card_id": card_ids[row["position"]], "tag_id": tag_id}
+            for row, card in zip(rows, chunk) for tag_id in dict.fromkeys(tag_ids(card))
+        ])
+
+        created += len(chunk)
+        done += sum(card.is_done for card in chunk)
+
+    return created, done
@@ -0,0 +1,502 @@
+"""
+Cache of the encoded responses of the board reads, invalidated by the writes.
+
+The board reads (`GET /boards`, `/boards/{id}`, `/boards/{id}/lists`, `/boards/{id}/tags` and `/inbox`)
+are polled far more often than the boards change. Their encoded body and headers (ETag, X-Next-Cursor)
+are cached by user and URL (path and query string):
+- A hit is answered without any query (a 304 when `If-None-Match` matches the cached ETag).
+- Every entry has the scopes it depends on: `board:{id}` (the reads of a board), `boards:{user id}`
+  (the boards of a user) and `user:{id}` (all the entries of a user).
+- The writes queue the scopes to invalidate in their session (`queue_invalidation`), invalidated once
+  committed (`after_commit` session event) and dropped on rollback, like the real-time events.
+  Every change of a board goes through `versioning.bump_board_version`, which queues the board and
+  the boards of its owner. Creating and deleting a board or registering a user queue them explicitly.
+- A response built from data read before an invalidation of one of its scopes is not stored
+  (see `ResponseCache.set`), so a read racing with a write can't cache the previous state.
+- With `RESPONSE_CACHE_STALE_SECONDS`, the invalidated entries are kept as stale: the first request
+  rebuilds the entry while the others get the stale response, for at most that many seconds.
+
+The backend is pluggable (`settings.RESPONSE_CACHE_BACKEND`, import path of a `ResponseCache` class):
+- `InMemoryResponseCache` (default): per process, bounded by entries (LRU) and bytes.
+- `SQLiteResponseCache`: shared by the workers of a host through a SQLite file
+  (`RESPONSE_CACHE_PATH`), so a write handled by one worker invalidates the entries of all of them.
+`RESPONSE_CACHE_MAX_ENTRIES = 0` disables the cache.
+"""
+import json
+import logging
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from importlib import import_module
+
+from fastapi import Request, Response, status
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from .core.config import settings
+from . import versioning
+from .serialization import encode_content, json_response
+
+logger = logging.getLogger(__name__)
+
+PENDING_INVALIDATIONS_KEY = "response_cache_pending_invalidations"
+
+
+def board_scope(board_id: int) -> str:
+    return f"board:{board_id}"
+
+
+def boards_scope(user_id: int) -> str:
+    return f"boards:{user_id}"
+
+
+def user_scope(user_id: int) -> str:
+    return f"user:{user_id}"
+
+
+@dataclass
+class CachedResponse:
+    body: bytes
+    headers: dict[str, str]
+    scopes: frozenset[str]
+    # Invalidated at (stale-while-revalidate), None when fresh
+    stale_since: float | None = None
+    # A request is rebuilding the stale entry since
+    revalidating_since: float | None = None
+    size: int = field(init=False)
+
+    def __post_init__(self):
+        self.size = len(self.body)
+
+
+class ResponseCache(ABC):
+    """
+    Interface of the cache backends.
+    """
+
+    @abstractmethod
+    def sequence(self) -> int:
+        """
+        Current invalidation sequence, increased by each `invalidate`.
+        """
+
+    @abstractmethod
+    def get(self, key: str) -> CachedResponse | None:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, entry: CachedResponse, since: int) -> bool:
+        """
+        Store an entry, unless one of its scopes was invalidated after the sequence `since`
+        (read before loading its data). Returns whether it was stored.
+        """
+
+    @abstractmethod
+    def invalidate(self, scopes: Iterable[str], keep_stale: bool = False) -> None:
+        """
+        Drop the entries with one of the scopes, or mark them stale with `keep_stale`.
+        """
+
+    @abstractmethod
+    def claim_revalidation(self, key: str, timeout: float) -> bool:
+        """
+        Mark a stale entry as being rebuilt. False if another request did it less than `timeout` ago.
+        """
+
+    @abstractmethod
+    def clear(self) -> None:
+        ...
+
+
+class InMemoryResponseCache(ResponseCache):
+    """
+    Per-process cache (default backend), LRU bounded by entries and bytes.
+    """
+
+    def __init__(self, max_entries: int = settings.RESPONSE_CACHE_MAX_ENTRIES,
+                 max_bytes: int = settings.RESPONSE_CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, CachedResponse] = OrderedDict()
+        self._bytes = 0
+        self._sequence = 0
+        # Last invalidation of each scope (bounded, the older ones are folded into the floor)
+        self._invalidated: OrderedDict[str, int] = OrderedDict()
+        self._invalidated_floor = 0
+        self._lock = threading.Lock()
+
+    def sequence(self) -> int:
+        with self._lock:
+            return self._sequence
+
+    def get(self, key: str) -> CachedResponse | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def set(self, key: str, entry: CachedResponse, since: int) -> bool:
+        if self.max_entries <= 0 or entry.size > self.max_bytes:
+            return False
+
+        with self._lock:
+            if since < self._invalidated_floor or any(
+                    self._invalidated.get(scope, 0) > since for scope in entry.scopes):
+                return False
+
+            self._pop(key)
+            self._entries[key] = entry
+            self._bytes += entry.size
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._pop(next(iter(self._entries)))
+
+        return True
+
+    def invalidate(self, scopes: Iterable[str], keep_stale: bool = False) -> None:
+        scopes = set(scopes)
+
+        with self._lock:
+            self._sequence += 1
+            for scope in scopes:
+                self._invalidated[scope] = self._sequence
+                self._invalidated.move_to_end(scope)
+
+            while len(self._invalidated) > max(self.max_entries, 1) * 10:
+                _, self._invalidated_floor = self._invalidated.popitem(last=False)
+
+            now = time.time()
+            for key, entry in list(self._entries.items()):
+                if entry.scopes & scopes:
+                    if keep_stale:
+                        entry.stale_since = entry.stale_since or now
+                    else:
+                        self._pop(key)
+
+    def claim_revalidation(self, key: str, timeout: float) -> bool:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return True
+
+            now = time.time()
+            if entry.revalidating_since is not None and now - entry.revalidating_since < timeout:
+                return False
+
+            entry.revalidating_since = now
+            return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self._invalidated.clear()
+            self._invalidated_floor = self._sequence
+
+    def _pop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+
+class SQLiteResponseCache(ResponseCache):
+    """
+    Cache shared by the worker processes of a host, in a SQLite file (WAL mode).
+    Bounded by entries and bytes, the least recently used entries are evicted first.
+    """
+
+    def __init__(self, path: str = settings.RESPONSE_CACHE_PATH,
+                 max_entries: int = settings.RESPONSE_CACHE_MAX_ENTRIES,
+                 max_bytes: int = settings.RESPONSE_CACHE_MAX_BYTES):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        # sqlite3 connections can't be shared between threads
+        self._local = threading.local()
+
+        self._connection().executescript("""
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                body BLOB NOT NULL,
+                headers TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                used_at REAL NOT NULL,
+                stale_since REAL,
+                revalidating_since REAL
+            );
+            CREATE INDEX IF NOT EXISTS ix_entries_used_at ON entries (used_at);
+            CREATE TABLE IF NOT EXISTS entry_scopes (
+                scope TEXT NOT NULL,
+                key TEXT NOT NULL REFERENCES entries (key) ON DELETE CASCADE,
+                PRIMARY KEY (scope, key)
+            );
+            CREATE INDEX IF NOT EXISTS ix_entry_scopes_key ON entry_scopes (key);
+            CREATE TABLE IF NOT EXISTS invalidations (
+                scope TEXT PRIMARY KEY,
+                sequence INTEGER NOT NULL
+            );
+        """)
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute("PRAGMA foreign_keys=ON")
+            self._local.connection = connection
+
+        return connection
+
+    def _transaction(self) -> "_Transaction":
+        return _Transaction(self._connection())
+
+    def sequence(self) -> int:
+        with self._transaction() as connection:
+            return connection.execute(
+                "SELECT coalesce(max(sequence), 0) FROM invalidations").fetchone()[0]
+
+    def get(self, key: str) -> CachedResponse | None:
+        with self._transaction() as connection:
+            row = connection.execute(
+                "SELECT body, headers, stale_since, revalidating_since FROM entries WHERE key = ?",
+                (key,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            connection.execute(
+                "UPDATE entries SET used_at = ? WHERE key = ?", (time.time(), key))
+            scopes = frozenset(scope for scope, in connection.execute(
+                "SELECT scope FROM entry_scopes WHERE key = ?", (key,)))
+
+        body, headers, stale_since, revalidating_since = row
+        return CachedResponse(body, json.loads(headers), scopes, stale_since, revalidating_since)
+
+    def set(self, key: str, entry: CachedResponse, since: int) -> bool:
+        if self.max_entries <= 0 or entry.size > self.max_bytes:
+            return False
+
+        scopes = sorted(entry.scopes)
+        with self._transaction() as connection:
+            invalidated = connection.execute(
+                f"SELECT 1 FROM invalidations WHERE sequence > ? AND scope IN ({', '.join('?' * len(scopes))})",
+                (since, *scopes)
+            ).fetchone()
+            if invalidated:
+                return False
+
+            connection.execute("DELETE FROM entries WHERE key = ?", (key,))
+            connection.execute(
+                "INSERT INTO entries (key, body, headers, size, used_at) VALUES (?, ?, ?, ?, ?)",
+                (key, entry.body, json.dumps(entry.headers), entry.size, time.time())
+            )
+            connection.executemany(
+                "INSERT INTO entry_scopes (scope, key) VALUES (?, ?)", [(scope, key) for scope in scopes])
+            self._evict(connection)
+
+        return True
+
+    def _evict(self, connection: sqlite3.Connection) -> None:
+        count, total_bytes = connection.execute(
+            "SELECT count(*), coalesce(sum(size), 0) FROM entries").fetchone()
+
+        for key, size in connection.execute("SELECT key, size FROM entries ORDER BY used_at").fetchall():
+            if count <= self.max_entries and total_bytes <= self.max_bytes:
+                break
+            connection.execute("DELETE FROM entries WHERE key = ?", (key,))
+            count -= 1
+            total_bytes -= size
+
+    def invalidate(self, scopes: Iterable[str], keep_stale: bool = False) -> None:
+        scopes = sorted(set(scopes))
+        if not scopes:
+            return
+
+        placeholders = ", ".join("?" * len(scopes))
+        with self._transaction() as connection:
+            sequence = connection.execute(
+                "SELECT coalesce(max(sequence), 0) + 1 FROM invalidations").fetchone()[0]
+            connection.executemany(
+                "INSERT INTO invalidations (scope, sequence) VALUES (?, ?) "
+                "ON CONFLICT (scope) DO UPDATE SET sequence = excluded.sequence",
+                [(scope, sequence) for scope in scopes]
+            )
+
+            keys = f"SELECT key FROM entry_scopes WHERE scope IN ({placeholders})"
+            if keep_stale:
+                connection.execute(
+                    f"UPDATE entries SET stale_since = coalesce(stale_since, ?) WHERE key IN ({keys})",
+                    (time.time(), *scopes))
+            else:
+                connection.execute(f"DELETE FROM entries WHERE key IN ({keys})", scopes)
+
+    def claim_revalidation(self, key: str, timeout: float) -> bool:
+        now = time.time()
+        with self._transaction() as connection:
+            claimed = connection.execute(
+                "UPDATE entries SET revalidating_since = ? WHERE key = ? "
+                "AND (revalidating_since IS NULL OR revalidating_since <= ?)",
+                (now, key, now - timeout)
+            ).rowcount
+            exists = connection.execute(
+                "SELECT 1 FROM entries WHERE key = ?", (key,)).fetchone()
+
+        return bool(claimed) or exists is None
+
+    def clear(self) -> None:
+        with self._transaction() as connection:
+            connection.execute("DELETE FROM entries")
+
+
+class _Transaction:
+    """
+    `with` block running its statements in one immediate transaction (the workers write concurrently).
+    """
+
+    def __init__(self, connection: sqlite3.Connection):
+        self.connection = connection
+
+    def __enter__(self) -> sqlite3.Connection:
+        self.connection.execute("BEGIN IMMEDIATE")
+        return self.connection
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.connection.execute("COMMIT" if exc_type is None else "ROLLBACK")
+
+
+_response_cache: ResponseCache | None = None
+
+
+def get_response_cache() -> ResponseCache:
+    """
+    Return the backend of `settings.RESPONSE_CACHE_BACKEND`, created on first use.
+    """
+    global _response_cache
+
+    if _response_cache is None:
+        module_name, class_name = settings.RESPONSE_CACHE_BACKEND.rsplit(".", 1)
+        _response_cache = getattr(import_module(module_name), class_name)()
+
+    return _response_cache
+
+
+def set_response_cache(cache: ResponseCache | None) -> None:
+    """
+    Replace the backend (e.g. in tests), `None` goes back to `settings.RESPONSE_CACHE_BACKEND`.
+    """
+    global _response_cache
+    _response_cache = cache
+
+
+# --- Routes ---
+def cache_key(request: Request, user_id: int) -> str:
+    """
+    Key of the response of the request: user and URL (query parameters sorted).
+    The responses encoded by the fast path (`FAST_SERIALIZATION`, see `app.serialization`) are
+    kept apart, so switching the setting never serves a body of the other encoder.
+    """
+    query = "&".join(sorted(request.url.query.split("&"))) if request.url.query else ""
+    key = f"{user_id}:{request.url.path}?{query}"
+    return f"{key}#fast" if settings.FAST_SERIALIZATION else key
+
+
+def cached_response(request: Request, user_id: int) -> Response | None:
+    """
+    Return the cached response of the request, or None when the route has to build it
+    (then pass it to `cache_response`). Call it before reading anything for the response.
+
+    Usage:
+        cached = cached_response(request, current_user.id)
+        if cached:
+            return cached
+    """
+    if settings.RESPONSE_CACHE_MAX_ENTRIES <= 0:
+        return None
+
+    cache = get_response_cache()
+    key = cache_key(request, user_id)
+    request.state.response_cache_sequence = cache.sequence()
+
+    entry = cache.get(key)
+    if entry is None:
+        return None
+
+    if entry.stale_since is not None:
+        stale_seconds = settings.RESPONSE_CACHE_STALE_SECONDS
+        if time.time() - entry.stale_since > stale_seconds or cache.claim_revalidation(key, stale_seconds):
+            return None
+
+    etag = entry.headers.get("etag")
+    if etag and versioning.etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+    return Response(entry.body, media_type="application/json", headers=entry.headers)
+
+
+def cache_response(request: Request, response: Response, content, user_id: int, *scopes: str) -> Response:
+    """
+    Encode `content` for the response model of the route (see `serialization.encode_content`)
+    and cache it with the headers set on `response`, under the given scopes and the user scope.
+
+    Usage:
+        return cache_response(request, response, board, current_user.id, board_scope(board.id))
+    """
+    body = encode_content(request, content)
+    json_body = json_response(response, body)
+
+    since = getattr(request.state, "response_cache_sequence", None)
+    if since is not None:
+        headers = {name: value for name, value in json_body.headers.items()
+                   if name not in ("content-length", "content-type")}
+        get_response_cache().set(
+            cache_key(request, user_id),
+            CachedResponse(body, headers, frozenset({user_scope(user_id), *scopes})),
+            since
+        )
+
+    return json_body
+
+
+# --- Invalidations of the transaction ---
+def queue_invalidation(db: Session, *scopes: str) -> None:
+    """
+    Queue scopes to invalidate once the transaction is committed.
+    """
+    db.info.setdefault(PENDING_INVALIDATIONS_KEY, set()).update(scopes)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_pending_scopes(db: Session):
+    if db.in_nested_transaction():
+        # Savepoint released: invalidated with the transaction
+        return
+
+    scopes = db.info.pop(PENDING_INVALIDATIONS_KEY, None)
+    if not scopes or settings.RESPONSE_CACHE_MAX_ENTRIES <= 0:
+        return
+
+    try:
+        get_response_cache().invalidate(
+            scopes, keep_stale=settings.RESPONSE_CACHE_STALE_SECONDS > 0)
+    except Exception:
+        # The change is committed: a failing backend must not fail the request
+        logger.exception("Could not invalidate the cached responses of %s", sorted(scopes))
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _drop_pending_invalidations(db: Session, transaction):
+    # Rolled back or closed without commit (the committed invalidations are already popped)
+    if transaction.parent is None:
+        db.info.pop(PENDING_INVALIDATIONS_KEY, None)
@@ -0,0 +1,194 @@
+"""
+Single-flight of identical concurrent reads.
+
+When a team opens the same board at once, or a client fires the same read twice, identical reads are
+in flight together, each one running the same queries and encoding the same response.
+The routes decorated with `single_flight` run once at a time per key (user, URL and `If-None-Match`):
+- The first request (the leader) runs the route and encodes its response in its own session
+  (see `serialization.encode_content`), so only the encoded response is shared.
+- The identical requests arriving meanwhile (the followers) wait for it and get a copy of its
+  response (or its error, e.g. a 404), without any query.
+- The followers of a key wait at most `COALESCING_TIMEOUT` seconds after its leader started, then
+  run the route themselves: a slow leader does not hold every later request.
+- Sync stack: the requests run on threadpool workers and wait on a `threading.Event`.
+  Async stack: they run in `AsyncSession.run_sync` on the event loop and wait with `await_only`,
+  so the loop keeps serving the leader.
+- `metrics` counts the leaders, the coalesced requests (also by route) and the timeouts.
+The flights are per process. `COALESCING_TIMEOUT = 0` disables the coalescing.
+"""
+import asyncio
+import functools
+import threading
+import time
+from collections import defaultdict
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+from fastapi import Response
+from sqlalchemy.util.concurrency import await_only, in_greenlet
+
+from .cache import cache_key
+from .core.config import settings
+from .serialization import encode_content, json_response
+
+
+@dataclass
+class CoalescingMetrics:
+    leaders: int = 0
+    coalesced: int = 0
+    timeouts: int = 0
+    # Followers waiting right now
+    waiting: int = 0
+    coalesced_by_route: dict[str, int] = field(default_factory=lambda: defaultdict(int))
+
+
+class _Flight:
+    """
+    A call in progress for a key, with its result once done.
+    """
+
+    def __init__(self, deadline: float):
+        self.deadline = deadline
+        self.done = threading.Event()
+        self.result = None
+        self.error: BaseException | None = None
+        # Followers of the async stack: (event loop, future)
+        self.async_waiters: list[tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+
+
+def _resolve(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class SingleFlight:
+    """
+    Run a function once at a time per key, the concurrent calls of the same key get its result.
+    """
+
+    def __init__(self, timeout: float = settings.COALESCING_TIMEOUT):
+        self.timeout = timeout
+        self.metrics = CoalescingMetrics()
+        self._flights: dict[str, _Flight] = {}
+        self._lock = threading.Lock()
+
+    def in_flight(self, key: str) -> bool:
+        with self._lock:
+            return key in self._flights
+
+    def run(self, key: str, function: Callable, name: str = ""):
+        """
+        Return `function()`, or the result (or error) of the call of the same key in progress.
+        `name` labels the coalesced calls in the metrics.
+        """
+        future = None
+
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is None:
+                flight = self._flights[key] = _Flight(time.monotonic() + self.timeout)
+                self.metrics.leaders += 1
+                leader = True
+            else:
+                leader = False
+                if in_greenlet():
+                    future = asyncio.get_running_loop().create_future()
+                    flight.async_waiters.append((asyncio.get_running_loop(), future))
+
+                self.metrics.waiting += 1
+
+        if leader:
+            return self._lead(key, flight, function)
+
+        done = self._wait(flight, future)
+        with self._lock:
+            self.metrics.waiting -= 1
+            if not done:
+                self.metrics.timeouts += 1
+
+        if not done:
+            return function()
+
+        with self._lock:
+            self.metrics.coalesced += 1
+            self.metrics.coalesced_by_route[name] += 1
+
+        if flight.error is not None:
+            raise flight.error
+        return flight.result
+
+    def _lead(self, key: str, flight: _Flight, function: Callable):
+        try:
+            flight.result = function()
+            return flight.result
+        except BaseException as error:
+            flight.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+                flight.done.set()
+                waiters, flight.async_waiters = flight.async_waiters, []
+
+            for loop, future in waiters:
+                loop.call_soon_threadsafe(_resolve, future)
+
+    def _wait(self, flight: _Flight, future: asyncio.Future | None) -> bool:
+        """
+        Wait for the flight until its deadline. Returns whether it is done.
+        """
+        remaining = flight.deadline - time.monotonic()
+        if flight.done.is_set():
+            return True
+        if remaining <= 0:
+            return False
+
+        if future is None:
+            return flight.done.wait(remaining)
+
+        try:
+            await_only(asyncio.wait_for(future, remaining))
+        except asyncio.TimeoutError:
+            return flight.done.is_set()
+
+        return True
+
+
+flights = SingleFlight()
+
+
+def _copy_response(response: Response) -> Response:
+    # Each request sends (and may add background tasks to) its own response
+    copy = Response(response.body, status_code=response.status_code)
+    copy.raw_headers = list(response.raw_headers)
+    return copy
+
+
+def single_flight(endpoint):
+    """
+    Decorator of the read routes to coalesce (see module docs). The route must take the
+    `request`, `response` and `current_user` keyword arguments. Its result is encoded
+    for its response model by the leader.
+
+    Usage:
+        @router.get("/{board_id}", response_model=schemas.Board)
+        @single_flight
+        def get_board(..., request: Request, response: Response, current_user: User = CurrentUserDep):
+    """
+    @functools.wraps(endpoint)
+    def coalesced_endpoint(*args, **kwargs):
+        if settings.COALESCING_TIMEOUT <= 0:
+            return endpoint(*args, **kwargs)
+
+        request, response = kwargs["request"], kwargs["response"]
+        key = f"{cache_key(request, kwargs['current_user'].id)}:{request.headers.get('if-none-match', '')}"
+
+        def run_endpoint() -> Response:
+            result = endpoint(*args, **kwargs)
+            if isinstance(result, Response):
+                return result
+            return json_response(response, encode_content(request, result))
+
+        return _copy_response(flights.run(key, run_endpoint, endpoint.__name__))
+
+    return coalesced_endpoint
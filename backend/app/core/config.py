@@ -1,12 +1,69 @@
+from typing import Literal
 from pydantic_settings import BaseSettings
 from pydantic import ConfigDict
 
 
 class Settings(BaseSettings):
     DATABASE_URL: str
+    # Serve the routes with an async engine/AsyncSession instead of the threadpool + Session.
+    # ASYNC_DATABASE_URL defaults to DATABASE_URL with the async driver (asyncpg / aiosqlite).
+    DATABASE_ASYNC: bool = False
+    ASYNC_DATABASE_URL: str | None = None
     SECRET_KEY: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24
     ALGORITHM: str = "HS256"
+    # Authenticated users cached by token (per process), see `security.PrincipalCache`. 0 disables it.
+    PRINCIPAL_CACHE_SIZE: int = 1024
+    PRINCIPAL_CACHE_TTL: int = 60
+    # Password hashing runs on a dedicated process pool, see `app.hashing`.
+    # Requests beyond workers + max queue are rejected with 503 + Retry-After (seconds).
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_QUEUE: int = 16
+    PASSWORD_HASH_RETRY_AFTER: int = 1
+    # Argon2 costs (memory in KiB), pick them with `python -m app.hashing --target-ms 250`.
+    # None keeps the passlib defaults.
+    ARGON2_TIME_COST: int | None = None
+    ARGON2_MEMORY_COST: int | None = None
+    # "integer": dense 1..n positions, moves shift the affected range.
+    # "fractional": moves write a rank between the neighbours (only the moved card).
+    CARD_POSITION_MODE: Literal["integer", "fractional"] = "integer"
+    # Attempts of the card moves/creations aborted by a concurrent change, see `db.locking`.
+    CONCURRENCY_RETRY_ATTEMPTS: int = 3
+    # "cascade": boards are deleted right away (ON DELETE CASCADE in the database).
+    # "purge": boards with more than BOARD_PURGE_MIN_CARDS cards are hidden right away and deleted
+    # in the background by batches of BOARD_PURGE_BATCH_SIZE cards, see `app.purge`.
+    BOARD_DELETE_MODE: Literal["cascade", "purge"] = "cascade"
+    BOARD_PURGE_MIN_CARDS: int = 1000
+    BOARD_PURGE_BATCH_SIZE: int = 1000
+    # Pages of the paginated collections (`limit` query parameter), see `app.pagination`.
+    PAGE_DEFAULT_LIMIT: int = 100
+    PAGE_MAX_LIMIT: int = 500
+    # Encoded responses of the board reads, cached by user and invalidated by the writes, see `app.cache`.
+    # The backend is the import path of a `ResponseCache` class: "app.cache.InMemoryResponseCache"
+    # (per process) or "app.cache.SQLiteResponseCache" (shared by the workers of a host, in
+    # RESPONSE_CACHE_PATH). RESPONSE_CACHE_MAX_ENTRIES = 0 disables the cache.
+    RESPONSE_CACHE_BACKEND: str = "app.cache.InMemoryResponseCache"
+    RESPONSE_CACHE_PATH: str = "response_cache.sqlite3"
+    RESPONSE_CACHE_MAX_ENTRIES: int = 1024
+    RESPONSE_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    # Seconds an invalidated entry is still served while a request rebuilds it. 0: never served.
+    RESPONSE_CACHE_STALE_SECONDS: float = 0
+    # Identical concurrent reads of a board or the inbox share one load, see `app.coalescing`.
+    # Seconds the followers wait for the first request at most. 0 disables the coalescing.
+    COALESCING_TIMEOUT: float = 5
+    # Serve the large reads (board, inbox, lists, cards) without validating the ORM data, encoded with
+    # orjson, see `app.serialization`.
+    FAST_SERIALIZATION: bool = False
+    # Rows inserted per statement (or COPY) by the bulk card creation and the board import, see `app.bulk`.
+    BULK_INSERT_CHUNK_SIZE: int = 5000
+    # Operations of a `POST /batch` request at most, see `routers.batch`.
+    BATCH_MAX_OPERATIONS: int = 100
+    # Per-request SQL stats (Server-Timing header + logs), see `db.instrumentation`.
+    SQL_INSTRUMENTATION: bool = False
+    SQL_REPEATED_STATEMENT_THRESHOLD: int = 5
+    # Real-time board events, see `app.realtime`. The broker is the import path of a `Broker` class.
+    REALTIME_BROKER: str = "app.realtime.InMemoryBroker"
+    REALTIME_QUEUE_SIZE: int = 100
     DEFAULT_TAGS_COLORS: list[str] = [
         "#d62828",
         "#f77f00",
@@ -0,0 +1,95 @@
+"""
+Counters of the lists and boards, maintained by the write routes in the same transaction as the change.
+
+- `List.cards_count` / `List.done_count`: cards of the list and how many of them are done.
+- `Board.lists_count` / `Board.cards_count`: lists and cards of the board.
+
+They are changed with relative UPDATEs (`cards_count = cards_count + 1`), so two concurrent
+transactions never lose an increment. The write routes read them instead of aggregating:
+the card positions of a list ("integer" mode) are 1..cards_count and the list positions of a board
+are 1..lists_count, so the slot at the bottom is `count + 1`.
+The cards and lists deleted by the database with their parent (ON DELETE CASCADE) don't need to be
+counted: the parent is gone too.
+"""
+from collections import defaultdict
+from collections.abc import Iterable
+
+from sqlalchemy import case, update
+from sqlalchemy.orm import Session
+
+from .models import Board, List
+
+Deltas = Iterable[tuple[int, int]]
+
+
+def _sum_deltas(deltas: Deltas) -> dict[int, int]:
+    totals = defaultdict(int)
+    for row_id, delta in deltas:
+        totals[row_id] += delta
+
+    return {row_id: total for row_id, total in totals.items() if total}
+
+
+def _apply_deltas(db: Session, model, deltas_by_column: dict) -> None:
+    deltas_by_column = {column: _sum_deltas(deltas)
+                        for column, deltas in deltas_by_column.items()}
+    row_ids = {row_id for deltas in deltas_by_column.values() for row_id in deltas}
+    if not row_ids:
+        return
+
+    db.execute(
+        update(model)
+        .where(model.id.in_(row_ids))
+        .values({
+            column: column + case(deltas, value=model.id, else_=0)
+            for column, deltas in deltas_by_column.items() if deltas
+        })
+        .execution_options(synchronize_session=False)
+    )
+
+
+def update_counters(
+    db: Session,
+    *,
+    list_cards: Deltas = (),
+    list_done: Deltas = (),
+    board_lists: Deltas = (),
+    board_cards: Deltas = ()
+) -> None:
+    """
+    Add the (id, delta) pairs to the counters of the lists and boards, with at most one UPDATE
+    for the lists and one for the boards. The deltas of the same id are summed (e.g. a card moved
+    inside its list) and the ones that end up at 0 are skipped. Does not commit.
+
+    Usage:
+        update_counters(db, list_cards=[(origin_list_id, -1), (list_id, 1)],
+                        board_cards=[(origin_board_id, -1), (board_id, 1)])
+    """
+    _apply_deltas(db, List, {List.cards_count: list_cards,
+                  List.done_count: list_done})
+    _apply_deltas(db, Board, {Board.lists_count: board_lists,
+                  Board.cards_count: board_cards})
+
+
+def count_card_moves(
+    db: Session,
+    origins: Iterable[tuple[int, int, bool]],
+    destination_list_id: int,
+    destination_board_id: int
+) -> None:
+    """
+    Update the counters for cards moved to a list. `origins` has the (list id, board id, is done)
+    of every moved card before the move. Does not commit.
+    """
+    origins = list(origins)
+    done_count = sum(1 for _, _, is_done in origins if is_done)
+
+    update_counters(
+        db,
+        list_cards=[(list_id, -1) for list_id, _, _ in origins] +
+        [(destination_list_id, len(origins))],
+        list_done=[(list_id, -1) for list_id, _, is_done in origins if is_done] +
+        [(destination_list_id, done_count)],
+        board_cards=[(board_id, -1) for _, board_id, _ in origins] +
+        [(destination_board_id, len(origins))]
+    )
@@ -0,0 +1,189 @@
+"""
+Many routes in one transaction (`POST /batch`, see `routers.batch`).
+
+A batch runs the write routes one after the other on the same session, so the operations share
+the authentication, the transaction and a single commit:
+- Within `BatchTransaction`, the `commit()` of the routes only flushes: their changes are committed
+  (and their deltas published, their cached reads invalidated) by `BatchTransaction.commit`.
+- Each operation runs in a savepoint (`BatchTransaction.operation`). A failing operation rolls back
+  its savepoint and its queued events and deltas (`Session.info`), the previous ones are kept.
+  A `db.rollback()` of a route (`retry_on_conflict`) only rolls back its own operation too.
+- The ownership checks of the routes (`get_board_or_404` and co.) are answered without query when
+  the board, list, tag or card was already checked by a previous operation (see `loaded_board`).
+  Objects changed by bulk UPDATEs are re-queried by the routes, and a deleted board is no longer in
+  the identity map (or has its `deleted_at` expired), so these fall back to the query as usual.
+
+On SQLite the write lock is taken when the batch starts: the sqlite3 driver only opens the transaction
+before a write, and a savepoint opened before would commit when released.
+"""
+from contextlib import contextmanager
+from copy import copy
+
+from sqlalchemy import false, inspect, update
+from sqlalchemy.orm import Session
+
+from ..models import Board, Card, List, Tag, User
+
+# The objects checked by the ownership lookups of the batch (the identity map only holds weak references)
+BATCH_KEY = "batch_checked_objects"
+
+
+def in_batch(db: Session) -> bool:
+    return BATCH_KEY in db.info
+
+
+class BatchTransaction:
+    """
+    Context manager running routes as the operations of one transaction (see module docs).
+
+    Usage:
+        with BatchTransaction(db) as batch:
+            with batch.operation():
+                update_card(..., db=db, current_user=current_user)
+            batch.commit()
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self._info = {}
+
+    def __enter__(self) -> "BatchTransaction":
+        db = self.db
+
+        if db.get_bind().dialect.name == "sqlite":
+            # An UPDATE takes the write lock of the database (see `db.locking`)
+            db.execute(
+                update(Board).where(false()).values({Board.id: Board.id})
+                .execution_options(synchronize_session=False)
+            )
+
+        db.info[BATCH_KEY] = set()
+        db.commit = db.flush
+        db.rollback = self._rollback_operation
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        db = self.db
+        del db.commit
+        del db.rollback
+
+        if db.info.pop(BATCH_KEY, None) is not None:
+            # Not committed
+            db.rollback()
+
+    @contextmanager
+    def operation(self):
+        """
+        Run the block in a savepoint. On error, the savepoint is rolled back and the error raised.
+        """
+        db = self.db
+        self._info = {key: copy(value) for key, value in db.info.items()}
+        db.begin_nested()
+
+        try:
+            yield
+        except BaseException:
+            self._undo_operation()
+            raise
+
+        db.get_nested_transaction().commit()
+
+    def _undo_operation(self) -> None:
+        # Back to the start of the operation, with its queued events and deltas
+        db = self.db
+        db.get_nested_transaction().rollback()
+        db.info.clear()
+        db.info.update({key: copy(value) for key, value in self._info.items()})
+
+    def _rollback_operation(self) -> None:
+        # `db.rollback()` of a route: the operation starts again in a new savepoint
+        self._undo_operation()
+        self.db.begin_nested()
+
+    def commit(self) -> None:
+        """
+        Commit the operations.
+        """
+        db = self.db
+        db.info.pop(BATCH_KEY, None)
+        Session.commit(db)
+
+
+# --- Ownership lookups without query ---
+def remember_checked(db: Session, *objects) -> None:
+    """
+    In a batch, keep the objects that passed an ownership check for the next operations.
+    """
+    if in_batch(db):
+        db.info[BATCH_KEY].update(objects)
+
+
+def _loaded(db: Session, model, object_id: int, *attributes: str):
+    """
+    The checked object of the identity map, if `attributes` are loaded and it is not deleted.
+    None otherwise.
+    """
+    found = db.identity_map.get(db.identity_key(model, object_id))
+    if found is None or found in db.deleted or found not in db.info[BATCH_KEY]:
+        return None
+
+    if inspect(found).unloaded.intersection(attributes):
+        return None
+
+    return found
+
+
+def loaded_board(db: Session, board_id: int, current_user: User) -> Board | None:
+    """
+    In a batch, the board of the user if already loaded in the session. None if unknown (query it).
+    """
+    if not in_batch(db):
+        return None
+
+    board = _loaded(db, Board, board_id, "user_id", "deleted_at")
+    if board is None or board.user_id != current_user.id or board.deleted_at is not None:
+        return None
+
+    return board
+
+
+def loaded_list(db: Session, board_id: int, list_id: int, current_user: User) -> List | None:
+    """
+    In a batch, the list of the board if already loaded in the session (see `loaded_board`).
+    """
+    if loaded_board(db, board_id, current_user) is None:
+        return None
+
+    found_list = _loaded(db, List, list_id, "board_id")
+    if found_list is None or found_list.board_id != board_id:
+        return None
+
+    return found_list
+
+
+def loaded_tag(db: Session, board_id: int, tag_id: int, current_user: User) -> Tag | None:
+    """
+    In a batch, the tag of the board if already loaded in the session (see `loaded_board`).
+    """
+    if loaded_board(db, board_id, current_user) is None:
+        return None
+
+    found_tag = _loaded(db, Tag, tag_id, "board_id")
+    if found_tag is None or found_tag.board_id != board_id:
+        return None
+
+    return found_tag
+
+
+def loaded_card(db: Session, board_id: int, list_id: int, card_id: int, current_user: User) -> Card | None:
+    """
+    In a batch, the card of the list if already loaded in the session (see `loaded_board`).
+    """
+    if loaded_list(db, board_id, list_id, current_user) is None:
+        return None
+
+    found_card = _loaded(db, Card, card_id, "list_id")
+    if found_card is None or found_card.list_id != list_id:
+        return None
+
+    return found_card
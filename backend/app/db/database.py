@@ -1,8 +1,32 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import sessionmaker, declarative_base
 from ..core.config import settings
+from . import instrumentation
+
+
+
+def enable_sqlite_foreign_keys(engine: Engine) -> None:
+    """
+    SQLite only enforces the foreign keys (and their ON DELETE CASCADE) when asked, on each connection.
+    No-op for the other databases.
+    """
+    if engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine, "connect")
+    def set_foreign_keys_pragma(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
 
 engine = create_engine(settings.DATABASE_URL)
+enable_sqlite_foreign_keys(engine)
+
+if settings.SQL_INSTRUMENTATION:
+    instrumentation.install(engine)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -15,3 +39,40 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# --- Async stack (settings.DATABASE_ASYNC) ---
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def to_async_url(database_url: str) -> str:
+    """
+    Return the same database URL using the async driver of its backend
+    (e.g. postgresql:// -> postgresql+asyncpg://).
+    """
+    url = make_url(database_url)
+    drivername = ASYNC_DRIVERS.get(url.get_backend_name(), url.drivername)
+
+    return url.set(drivername=drivername).render_as_string(hide_password=False)
+
+
+AsyncSessionLocal = async_sessionmaker(autoflush=False)
+
+# The async engine (and its driver) is only created when the async stack is enabled
+async_engine = None
+if settings.DATABASE_ASYNC:
+    async_engine = create_async_engine(
+        settings.ASYNC_DATABASE_URL or to_async_url(settings.DATABASE_URL))
+    AsyncSessionLocal.configure(bind=async_engine)
+    enable_sqlite_foreign_keys(async_engine.sync_engine)
+
+    if settings.SQL_INSTRUMENTATION:
+        instrumentation.install(async_engine.sync_engine)
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
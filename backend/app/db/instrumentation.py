@@ -0,0 +1,133 @@
+"""
+Opt-in per-request SQL instrumentation (enabled with `settings.SQL_INSTRUMENTATION`).
+
+`install(engine)` hooks the SQLAlchemy cursor events and records every statement in the `QueryStats`
+of the current request. `SQLInstrumentationMiddleware` creates those stats for each request and:
+- Adds the `Server-Timing` and `X-DB-Query-Count` headers to the response.
+- Logs (debug) a summary of the request, and a warning for statements repeated too many times,
+  which usually means a lazy load inside a loop (N+1).
+"""
+import logging
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from sqlalchemy import event
+from starlette.datastructures import MutableHeaders
+
+logger = logging.getLogger(__name__)
+
+# Groups of placeholders like "(?, ?, ?)" or "(%(id_1)s, %(id_2)s)" are the same statement shape.
+_PLACEHOLDERS_GROUP = re.compile(r"\((?:\s*(?:\?|%\(\w+\)s|:\w+)\s*,?)+\)")
+_WHITESPACES = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """
+    Normalize a statement so the executions of the same query (whatever the number of bound values) match.
+    """
+    shape = _PLACEHOLDERS_GROUP.sub("(?)", statement)
+    return _WHITESPACES.sub(" ", shape).strip()
+
+
+@dataclass
+class QueryStats:
+    count: int = 0
+    duration: float = 0.0
+    shapes: Counter = field(default_factory=Counter)
+
+    def record(self, statement: str, duration: float) -> None:
+        self.count += 1
+        self.duration += duration
+        self.shapes[statement_shape(statement)] += 1
+
+    def repeated(self, threshold: int) -> dict[str, int]:
+        """
+        Return the statement shapes executed at least `threshold` times.
+        """
+        return {shape: times for shape, times in self.shapes.items() if times >= threshold}
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.duration * 1000:.2f};desc="{self.count} queries"'
+
+
+_current_stats: ContextVar[QueryStats | None] = ContextVar(
+    "sql_query_stats", default=None)
+
+
+def current_stats() -> QueryStats | None:
+    """
+    Return the stats of the request being processed (None outside of an instrumented request).
+    """
+    return _current_stats.get()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start_time = conn.info["query_start_time"].pop()
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.record(statement, time.perf_counter() - start_time)
+
+
+def install(engine) -> None:
+    """
+    Listen to the cursor events of `engine`. Can be called more than once.
+    """
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def uninstall(engine) -> None:
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.remove(engine, "before_cursor_execute", _before_cursor_execute)
+        event.remove(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class SQLInstrumentationMiddleware:
+    """
+    ASGI middleware that collects the `QueryStats` of each HTTP request.
+
+    The stats object is shared through a context variable, which is copied into the threadpool
+    where the sync routes and dependencies run.
+    """
+
+    def __init__(self, app, repeated_threshold: int = 5):
+        self.app = app
+        self.repeated_threshold = repeated_threshold
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _current_stats.set(stats)
+
+        async def send_with_stats(message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", stats.server_timing())
+                headers.append("X-DB-Query-Count", str(stats.count))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_stats)
+        finally:
+            _current_stats.reset(token)
+            self.log(scope, stats)
+
+    def log(self, scope, stats: QueryStats) -> None:
+        route = f'{scope["method"]} {scope["path"]}'
+        logger.debug("%s: %d queries in %.2f ms", route,
+                     stats.count, stats.duration * 1000)
+
+        for shape, times in stats.repeated(self.repeated_threshold).items():
+            logger.warning(
+                "%s: possible N+1, statement executed %d times: %s", route, times, shape)
@@ -0,0 +1,137 @@
+"""
+Eager loading planner driven by the response schemas.
+
+The response models are built with `from_attributes`, so Pydantic walks every relationship that
+appears in the schema. Left alone, each lazy relationship costs one query per parent object (N+1).
+`eager_load_options` reads the schema fields and returns the matching loader options:
+- `selectinload` for collections (one extra query per relationship, whatever the number of rows).
+- `joinedload` for many-to-one relationships (loaded in the same query).
+
+The relationships of the schemas marked `expandable` (see `schemas.common.ExpandableSchema`) are
+only loaded when the request asks for them with `?expand=`.
+"""
+import types
+from functools import lru_cache
+from typing import Union, get_args, get_origin
+
+from fastapi import Depends, HTTPException, Query, Request, status
+from pydantic import BaseModel
+from sqlalchemy import inspect
+from sqlalchemy.orm import joinedload, selectinload
+
+from ..schemas.common import requested_expansion
+
+# Accepted values of `?expand=`
+EXPANSIONS = frozenset({"cards", "tags", "list"})
+
+
+def _unwrap_schema(annotation) -> type[BaseModel] | None:
+    """
+    Return the Pydantic model behind an annotation like `X`, `list[X]` or `X | None`.
+    """
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation
+
+    origin = get_origin(annotation)
+    if origin in (list, tuple, set, Union, types.UnionType):
+        for arg in get_args(annotation):
+            schema = _unwrap_schema(arg)
+            if schema is not None:
+                return schema
+
+    return None
+
+
+@lru_cache(maxsize=None)
+def eager_load_options(
+    model,
+    schema: type[BaseModel],
+    skip: tuple[str, ...] = (),
+    expansion: frozenset[str] = frozenset()
+) -> tuple:
+    """
+    Build the loader options needed to serialize `model` instances with `schema` without lazy loads.
+    `skip` are dotted relationship paths (e.g. `"lists.cards"`) left unloaded, for the collections
+    the route loads itself (e.g. a page of them, see `app.pagination`).
+    `expansion` are the expandable relationships asked by the request, the other ones are not loaded.
+    The result only depends on the arguments, so it is computed once.
+    """
+    schema = _unwrap_schema(schema)
+    if schema is None:
+        return ()
+
+    # Resolve forward references (e.g. `list[TagSubschema]` declared before `TagSubschema`)
+    if not schema.__pydantic_complete__:
+        schema.model_rebuild()
+
+    relationships = inspect(model).relationships
+    unexpanded = getattr(schema, "expandable", frozenset()) - expansion
+    options = []
+
+    for name, field in schema.model_fields.items():
+        if name not in relationships or name in skip or name in unexpanded:
+            continue
+
+        field_schema = _unwrap_schema(field.annotation)
+        if field_schema is None:
+            continue
+
+        relationship = relationships[name]
+        attribute = getattr(model, name)
+        loader = selectinload(attribute) if relationship.uselist else joinedload(attribute)
+
+        nested_skip = tuple(path.removeprefix(f"{name}.")
+                            for path in skip if path.startswith(f"{name}."))
+        nested = eager_load_options(
+            relationship.mapper.class_, field_schema, nested_skip, expansion)
+        options.append(loader.options(*nested) if nested else loader)
+
+    return tuple(options)
+
+
+def parse_expansion(expand: str | None) -> frozenset[str]:
+    """
+    Parse `?expand=cards,tags`. Unknown names are rejected with 400.
+    """
+    expansion = frozenset(name.strip() for name in (expand or "").split(",") if name.strip())
+
+    if not expansion <= EXPANSIONS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown expansion: {', '.join(sorted(expansion - EXPANSIONS))}"
+        )
+
+    return expansion
+
+
+def ResponseLoadDep(model):
+    """
+    Dependency that returns the loader options for the `response_model` of the current route,
+    following the `?expand=` query parameter of the request.
+
+    Usage:
+        load_options: tuple = ResponseLoadDep(Board)
+        db.query(Board).options(*load_options)
+
+    `list[Schema]` response models are unwrapped, so the options apply to each item.
+    The expansion is also given to the serialization of the response (`schemas.common.requested_expansion`):
+    the dependency is async so it runs in the context of the request, like the serialization.
+    """
+    async def get_load_options(
+        request: Request,
+        expand: str | None = Query(
+            None, description=f"Relationships to add to the response, comma separated: {', '.join(sorted(EXPANSIONS))}")
+    ) -> tuple:
+        expansion = parse_expansion(expand)
+        requested_expansion.set(expansion)
+
+        route = request.scope.get("route")
+        response_model = getattr(route, "response_model", None)
+        if response_model is None:
+            return ()
+
+        return eager_load_options(model, response_model, expansion=expansion)
+
+    # For the routes called without request (see `routers.batch`)
+    get_load_options.load_model = model
+    return Depends(get_load_options)
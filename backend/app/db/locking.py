@@ -0,0 +1,136 @@
+"""
+Concurrency control of the writes that renumber the cards of a list.
+
+A move (or a card creation) reads the state of the lists (card count, max position, neighbours) and
+then shifts the positions with range UPDATEs. Two of them running at the same time on the same list
+would interleave and leave duplicate or missing positions, so:
+- `lock_lists` locks the affected lists before they are read, always in the same order (sorted ids)
+  so two moves can't deadlock on them. On Postgres these are row locks (`SELECT ... FOR UPDATE`)
+  held until the end of the transaction. SQLite has no row locks: the database write lock is taken
+  instead (SQLite serializes the writers anyway).
+  `lock_boards` does the same for the list positions of the boards. Lists are always locked before
+  boards (the version bump of `app.versioning` locks the boards too).
+- `retry_on_conflict` runs the route again, in a new transaction, when the database aborts it for a
+  conflict (deadlock, serialization failure, locked SQLite database, position constraint) or when the
+  data read before taking the locks changed in between (`ConcurrentChange`).
+  The request fails with 409 after `settings.CONCURRENCY_RETRY_ATTEMPTS` attempts.
+- The unique constraint on (list_id, position) (Postgres, deferred to the commit so the shifts can go
+  through transient duplicates) is the last safety net.
+"""
+import functools
+
+from fastapi import HTTPException, status
+from sqlalchemy import false, select, update
+from sqlalchemy.exc import DBAPIError, OperationalError
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..models import Board, Card, List
+
+CARD_POSITION_CONSTRAINT = "uq_cards_list_id_position"
+
+# serialization_failure, deadlock_detected
+CONFLICT_SQLSTATES = {"40001", "40P01"}
+UNIQUE_VIOLATION_SQLSTATE = "23505"
+
+
+class ConcurrentChange(Exception):
+    """The data read before taking the locks was changed by another transaction."""
+
+
+def _lock_rows(db: Session, model, ids) -> None:
+    ids = sorted({row_id for row_id in ids if row_id is not None})
+    if not ids:
+        return
+
+    if db.get_bind().dialect.name == "sqlite":
+        # An UPDATE takes the write lock of the database, even without matching rows
+        db.execute(
+            update(model).where(false()).values({model.id: model.id})
+            .execution_options(synchronize_session=False)
+        )
+        return
+
+    db.execute(
+        select(model.id).where(model.id.in_(ids)).order_by(model.id).with_for_update()
+    ).all()
+
+
+def lock_lists(db: Session, *list_ids: int) -> None:
+    """
+    Lock the given lists until the end of the transaction (see module docs).
+    """
+    _lock_rows(db, List, list_ids)
+
+
+def lock_boards(db: Session, *board_ids: int) -> None:
+    """
+    Lock the given boards until the end of the transaction (see module docs).
+    """
+    _lock_rows(db, Board, board_ids)
+
+
+def lock_card_lists(db: Session, card_lists: dict[int, int], *list_ids: int) -> None:
+    """
+    Lock the lists of the cards (`card_lists`: the list id of each card id, as read before) and
+    `list_ids`, then check that the cards are still in these lists.
+    Raise `ConcurrentChange` if a card was moved or deleted in between.
+    """
+    lock_lists(db, *card_lists.values(), *list_ids)
+
+    current_lists = dict(db.execute(
+        select(Card.id, Card.list_id).where(Card.id.in_(card_lists))
+    ).all())
+
+    if current_lists != card_lists:
+        raise ConcurrentChange()
+
+
+def is_conflict(error: DBAPIError) -> bool:
+    """
+    Tell if a database error is a transient conflict with another transaction (worth a retry).
+    """
+    code = getattr(error.orig, "pgcode", None) or getattr(error.orig, "sqlstate", None)
+
+    if code in CONFLICT_SQLSTATES:
+        return True
+    if code == UNIQUE_VIOLATION_SQLSTATE:
+        return CARD_POSITION_CONSTRAINT in str(error.orig)
+
+    return isinstance(error, OperationalError) and "database is locked" in str(error.orig)
+
+
+def retry_on_conflict(endpoint):
+    """
+    Decorator of the routes that lock lists: run the route again when it hits a conflict (see module docs).
+    The route must take its session as the `db` keyword argument and must not have side effects
+    outside of the transaction before its commit.
+
+    Usage:
+        @router.post("/{card_id}/move", ...)
+        @retry_on_conflict
+        def move_card(..., db: Session = Depends(get_db)):
+
+    There is no backoff: the retry waits on the locks of the database, and sleeping here would
+    block the event loop on the async stack.
+    """
+    @functools.wraps(endpoint)
+    def endpoint_with_retry(*args, **kwargs):
+        db: Session = kwargs["db"]
+
+        for attempt in range(1, settings.CONCURRENCY_RETRY_ATTEMPTS + 1):
+            try:
+                return endpoint(*args, **kwargs)
+            except (DBAPIError, ConcurrentChange) as error:
+                if isinstance(error, DBAPIError) and not is_conflict(error):
+                    raise
+
+                db.rollback()
+
+                if attempt == settings.CONCURRENCY_RETRY_ATTEMPTS:
+                    raise HTTPException(
+                        status_code=status.HTTP_409_CONFLICT,
+                        detail="The board was changed by another request, try again."
+                    )
+
+    return endpoint_with_retry
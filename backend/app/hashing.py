@@ -0,0 +1,235 @@
+"""
+Password hashing on a dedicated, size-limited process pool.
+
+Argon2 is CPU (and memory) bound on purpose, so running it inline takes a worker thread and the CPU of
+the API process for each register/login, and a login burst starves every other endpoint.
+Here the hashes run on `settings.PASSWORD_HASH_WORKERS` processes with a bounded queue:
+- At most `PASSWORD_HASH_WORKERS + PASSWORD_HASH_MAX_QUEUE` hashes are pending (running or queued).
+  Over that, the request fails fast with 503 and `Retry-After` instead of waiting in line.
+- `metrics` records the queue depth and the hash latency (queue wait included).
+- `PASSWORD_HASH_WORKERS = 0` runs the hashes inline (no pool), still with the metrics.
+
+The Argon2 costs are picked for the current hardware with the calibration command:
+    python -m app.hashing --target-ms 250
+"""
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import statistics
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+
+from fastapi import HTTPException, status
+from passlib.hash import argon2
+
+from .core.config import settings
+from . import security
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class HashMetrics:
+    pending: int = 0
+    max_pending: int = 0
+    completed: int = 0
+    rejected: int = 0
+    total_latency: float = 0.0
+    max_latency: float = 0.0
+
+    @property
+    def average_latency(self) -> float:
+        return self.total_latency / self.completed if self.completed else 0.0
+
+
+metrics = HashMetrics()
+
+_lock = threading.Lock()
+_executor: ProcessPoolExecutor | None = None
+# Slots for the running + queued hashes
+_slots = threading.BoundedSemaphore(
+    max(settings.PASSWORD_HASH_WORKERS, 1) + settings.PASSWORD_HASH_MAX_QUEUE)
+
+
+def get_executor() -> ProcessPoolExecutor:
+    """
+    Return the process pool, created on the first hash.
+    Workers are spawned (not forked) so they don't inherit the connections and threads of the API process.
+    """
+    global _executor
+
+    with _lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=settings.PASSWORD_HASH_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+
+    return _executor
+
+
+def shutdown() -> None:
+    """
+    Stop the process pool (app shutdown), without waiting for the queued hashes.
+    The next hash creates a new one.
+    """
+    global _executor
+
+    with _lock:
+        executor, _executor = _executor, None
+
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def busy_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many authentication requests, try again later.",
+        headers={"Retry-After": str(settings.PASSWORD_HASH_RETRY_AFTER)}
+    )
+
+
+# --- HELPER FUNCTIONS ---
+def _record_done(started_at: float) -> None:
+    latency = time.perf_counter() - started_at
+
+    with _lock:
+        metrics.pending -= 1
+        metrics.completed += 1
+        metrics.total_latency += latency
+        metrics.max_latency = max(metrics.max_latency, latency)
+
+    _slots.release()
+    logger.debug("Password hash done in %.1fms", latency * 1000)
+
+
+def submit(fn, *args) -> Future:
+    """
+    Run `fn(*args)` on the pool and return its future.
+    Raise 503 (without queuing) when all the slots are taken.
+    """
+    if not _slots.acquire(blocking=False):
+        with _lock:
+            metrics.rejected += 1
+        logger.warning("Password hashing queue is full (%s pending)", metrics.pending)
+        raise busy_exception()
+
+    with _lock:
+        metrics.pending += 1
+        metrics.max_pending = max(metrics.max_pending, metrics.pending)
+
+    started_at = time.perf_counter()
+
+    if settings.PASSWORD_HASH_WORKERS <= 0:
+        future = Future()
+        try:
+            future.set_result(fn(*args))
+        except Exception as exc:
+            future.set_exception(exc)
+        _record_done(started_at)
+        return future
+
+    try:
+        future = get_executor().submit(fn, *args)
+    except Exception:
+        _record_done(started_at)
+        raise
+
+    future.add_done_callback(lambda _: _record_done(started_at))
+    return future
+
+
+# --- API ---
+def hash_password(password: str) -> str:
+    """Hash a password on the pool (blocking, for the sync routes)."""
+    return submit(security.get_password_hash, password).result()
+
+
+def verify_password(password: str, password_hash: str) -> bool:
+    """Verify a password on the pool (blocking, for the sync routes)."""
+    return submit(security.verify_password, password, password_hash).result()
+
+
+async def hash_password_async(password: str) -> str:
+    """Hash a password on the pool without blocking the event loop."""
+    return await asyncio.wrap_future(submit(security.get_password_hash, password))
+
+
+async def verify_password_async(password: str, password_hash: str) -> bool:
+    """Verify a password on the pool without blocking the event loop."""
+    return await asyncio.wrap_future(submit(security.verify_password, password, password_hash))
+
+
+# --- CALIBRATION ---
+def measure(time_cost: int, memory_cost: int, rounds: int = 3) -> float:
+    """
+    Return the median time (seconds) of an Argon2 hash with these costs.
+    """
+    hasher = argon2.using(time_cost=time_cost, memory_cost=memory_cost)
+    durations = []
+
+    for _ in range(rounds):
+        started_at = time.perf_counter()
+        hasher.hash("calibration password")
+        durations.append(time.perf_counter() - started_at)
+
+    return statistics.median(durations)
+
+
+def calibrate(target: float, max_memory_cost: int, min_memory_cost: int, rounds: int = 3) -> tuple[int, int, float]:
+    """
+    Pick the Argon2 costs whose hash takes at most `target` seconds on this machine.
+
+    The memory cost goes first (it is what makes GPU attacks expensive): it starts at `max_memory_cost`
+    and is halved until a single pass fits the target (never under `min_memory_cost`).
+    Then the time cost is raised while the hash stays under the target.
+    Returns (time_cost, memory_cost, measured seconds).
+    """
+    memory_cost = max_memory_cost
+    duration = measure(1, memory_cost, rounds)
+
+    while duration > target and memory_cost > min_memory_cost:
+        memory_cost = max(memory_cost // 2, min_memory_cost)
+        duration = measure(1, memory_cost, rounds)
+
+    time_cost = 1
+    while True:
+        next_duration = measure(time_cost + 1, memory_cost, rounds)
+        if next_duration > target:
+            break
+        time_cost, duration = time_cost + 1, next_duration
+
+    return time_cost, memory_cost, duration
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Pick the Argon2 costs that hit a target latency on this hardware.")
+    parser.add_argument("--target-ms", type=float, default=250,
+                        help="Max duration of one hash (default: 250)")
+    parser.add_argument("--max-memory-mib", type=int, default=64,
+                        help="Memory cost to start from (default: 64)")
+    parser.add_argument("--min-memory-mib", type=int, default=19,
+                        help="Lowest memory cost allowed (default: 19, OWASP minimum)")
+    parser.add_argument("--rounds", type=int, default=3,
+                        help="Hashes measured per candidate (default: 3)")
+    args = parser.parse_args(argv)
+
+    time_cost, memory_cost, duration = calibrate(
+        args.target_ms / 1000,
+        args.max_memory_mib * 1024,
+        args.min_memory_mib * 1024,
+        args.rounds
+    )
+
+    print(f"# One hash takes {duration * 1000:.0f}ms on this machine")
+    print(f"ARGON2_TIME_COST={time_cost}")
+    print(f"ARGON2_MEMORY_COST={memory_cost}")
+
+
+if __name__ == "__main__":
+    main()
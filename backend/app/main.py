@@ -1,13 +1,27 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from .routers import auth, boards, inbox, cards, users
+from . import hashing
+from .routers import auth, boards, inbox, cards, users, realtime, batch
+from .routers.async_adapter import to_async_router
 from .schemas import HTTPError
+from .core.config import settings
+from .db.instrumentation import SQLInstrumentationMiddleware
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Stop the password hashing processes (see `app.hashing`)
+    hashing.shutdown()
 
 
 app = FastAPI(
     title="VisualTask API",
     description="API for manage Kanban-like projects",
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -16,15 +30,41 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor"] + (
+        ["Server-Timing", "X-DB-Query-Count"] if settings.SQL_INSTRUMENTATION else []),
 )
 
+if settings.SQL_INSTRUMENTATION:
+    app.add_middleware(
+        SQLInstrumentationMiddleware,
+        repeated_threshold=settings.SQL_REPEATED_STATEMENT_THRESHOLD
+    )
+
 unauthorized_response = {
     "model": HTTPError,
     "description": "Authentication credentials are invalid or missing.",
 }
 
-app.include_router(auth.router)
-app.include_router(boards.router, responses={401: unauthorized_response})
-app.include_router(inbox.router, responses={401: unauthorized_response})
-app.include_router(cards.router, responses={401: unauthorized_response})
-app.include_router(users.router, responses={401: unauthorized_response})
+if settings.DATABASE_ASYNC:
+    # Same routes served with async handlers on an AsyncSession (see `routers.async_adapter`)
+    app.include_router(auth.async_router)
+    app.include_router(to_async_router(boards.router),
+                       responses={401: unauthorized_response})
+    app.include_router(to_async_router(inbox.router),
+                       responses={401: unauthorized_response})
+    app.include_router(to_async_router(cards.router),
+                       responses={401: unauthorized_response})
+    app.include_router(to_async_router(users.router),
+                       responses={401: unauthorized_response})
+    app.include_router(to_async_router(batch.router),
+                       responses={401: unauthorized_response})
+else:
+    app.include_router(auth.router)
+    app.include_router(boards.router, responses={401: unauthorized_response})
+    app.include_router(inbox.router, responses={401: unauthorized_response})
+    app.include_router(cards.router, responses={401: unauthorized_response})
+    app.include_router(users.router, responses={401: unauthorized_response})
+    app.include_router(batch.router, responses={401: unauthorized_response})
+
+# WebSocket subscriptions, served the same way on both stacks
+app.include_router(realtime.router)
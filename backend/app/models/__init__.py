@@ -7,3 +7,5 @@ from .list import List
 from .card import Card
 
 from .tag import Tag, card_tags
+
+from .tombstone import Tombstone
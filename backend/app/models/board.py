@@ -1,5 +1,5 @@
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, Index, event, text, func
+from sqlalchemy.orm import Session, relationship, with_loader_criteria
 
 from ..db.database import Base
 from ..models.list import List
@@ -8,21 +8,61 @@ from ..models.list import List
 class Board(Base):
     __tablename__ = "boards"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     name = Column(String(100), nullable=False)
     description = Column(String(255), nullable=True)
     image_url = Column(String(255), nullable=True)
     is_inbox = Column(Boolean, nullable=False, default=False)
+    # Increased on every change of the board or its lists, cards and tags (see `app.versioning`)
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    # Counters maintained by the write routes (see `app.counters`)
+    lists_count = Column(Integer, nullable=False, default=0, server_default="0")
+    cards_count = Column(Integer, nullable=False, default=0, server_default="0")
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
+    updated_at = Column(DateTime, nullable=False, server_default=func.now(), onupdate=func.now())
+    # Soft deleted, waiting to be purged (see `app.purge`)
+    deleted_at = Column(DateTime, nullable=True)
 
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey(
+        "users.id", ondelete="CASCADE"), nullable=False)
     user = relationship("User", back_populates="boards")
 
+    # The children are deleted by the database (ON DELETE CASCADE), without loading them
     lists = relationship("List", back_populates="board",
-                         cascade="all, delete-orphan",
+                         cascade="all, delete-orphan", passive_deletes=True,
                          order_by=[List.position.asc(), List.name.asc()])
 
     tags = relationship("Tag", back_populates="board",
-                        cascade="all, delete-orphan")
+                        cascade="all, delete-orphan", passive_deletes=True)
+
+    tombstones = relationship("Tombstone", back_populates="board",
+                              cascade="all, delete-orphan", passive_deletes=True)
+
+    __table_args__ = (
+        # Inbox of a user and boards of a user without the inbox, by id (pages of `GET /boards`)
+        Index("ix_boards_user_id_is_inbox_id", "user_id", "is_inbox", "id"),
+        # Only one inbox per user
+        Index("ux_boards_user_id_inbox", "user_id", unique=True,
+              postgresql_where=text("is_inbox"), sqlite_where=text("is_inbox")),
+        # Soft deleted boards left to purge
+        Index("ix_boards_deleted_at", "deleted_at",
+              postgresql_where=text("deleted_at IS NOT NULL"), sqlite_where=text("deleted_at IS NOT NULL")),
+    )
 
     def __str__(self):
         return f'<{self.__class__.__name__}: {self.name}>'
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _hide_deleted_boards(execute_state):
+    # Soft deleted boards are invisible to every query (and to the joins on boards),
+    # unless the statement has the `include_deleted` execution option (see `app.purge`)
+    if (
+        execute_state.is_select
+        and not execute_state.is_column_load
+        and not execute_state.is_relationship_load
+        and not execute_state.execution_options.get("include_deleted", False)
+    ):
+        execute_state.statement = execute_state.statement.options(
+            with_loader_criteria(Board, Board.deleted_at.is_(None), include_aliases=True)
+        )
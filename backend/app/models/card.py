@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, Float, String, Boolean, ForeignKey, DateTime, Index, UniqueConstraint, func
 from sqlalchemy.orm import relationship
 
 from ..db.database import Base
@@ -7,18 +7,39 @@ from ..db.database import Base
 class Card(Base):
     __tablename__ = "cards"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
 
     name = Column(String(100), nullable=False)
     text = Column(String(255), nullable=True)
-    is_done = Column(Boolean, nullable=False, index=True, default=False)
-    position = Column(Integer, nullable=False, index=True, default=1)
+    is_done = Column(Boolean, nullable=False, default=False)
+    # Dense 1..n in "integer" mode, fractional ranks in "fractional" mode (see `app.ranking`)
+    position = Column(Float, nullable=False, default=1)
     due_date = Column(DateTime, nullable=True)
 
-    list_id = Column(Integer, ForeignKey("lists.id"), nullable=False)
+    list_id = Column(Integer, ForeignKey(
+        "lists.id", ondelete="CASCADE"), nullable=False)
     list = relationship("List", back_populates="cards")
 
-    tags = relationship("Tag", secondary="card_tags", back_populates="cards")
+    tags = relationship("Tag", secondary="card_tags",
+                        back_populates="cards", passive_deletes=True)
+
+    # Sync (see `app.versioning`): board version of the last change and timestamps
+    change_seq = Column(Integer, nullable=False, default=1, server_default="1")
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
+    updated_at = Column(DateTime, nullable=False, server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        # Cards of a list in order, max(position) of a list and the position range shifts
+        Index("ix_cards_list_id_position", "list_id", "position"),
+        # Cards changed since a cursor (see `app.versioning`)
+        Index("ix_cards_list_id_change_seq", "list_id", "change_seq"),
+        # No two cards at the same place (see `db.locking`). Checked at commit so the shifts can go
+        # through transient duplicates: only Postgres has deferrable unique constraints.
+        UniqueConstraint(
+            "list_id", "position", name="uq_cards_list_id_position",
+            deferrable=True, initially="DEFERRED"
+        ).ddl_if(dialect="postgresql"),
+    )
 
     def __str__(self):
         return f'<{self.__class__.__name__}: {self.name}>'
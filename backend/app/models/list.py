@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, ForeignKey
+from sqlalchemy import Column, String, Integer, ForeignKey, DateTime, Index, func
 from sqlalchemy.orm import relationship
 
 from ..db.database import Base
@@ -8,16 +8,31 @@ from ..models.card import Card
 class List(Base):
     __tablename__ = "lists"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     name = Column(String(100), nullable=False)
-    position = Column(Integer, nullable=False, index=True, default=1)
+    position = Column(Integer, nullable=False, default=1)
 
-    board_id = Column(Integer, ForeignKey("boards.id"), nullable=False)
+    board_id = Column(Integer, ForeignKey(
+        "boards.id", ondelete="CASCADE"), nullable=False)
     board = relationship("Board", back_populates="lists")
 
     cards = relationship("Card", back_populates="list",
-                         cascade="all, delete-orphan",
-                         order_by=[Card.position.asc(), Card.name.asc()])
+                         cascade="all, delete-orphan", passive_deletes=True,
+                         order_by=[Card.position.asc(), Card.name.asc(), Card.id.asc()])
+
+    # Counters maintained by the write routes (see `app.counters`)
+    cards_count = Column(Integer, nullable=False, default=0, server_default="0")
+    done_count = Column(Integer, nullable=False, default=0, server_default="0")
+
+    # Sync (see `app.versioning`): board version of the last change and timestamps
+    change_seq = Column(Integer, nullable=False, default=1, server_default="1")
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
+    updated_at = Column(DateTime, nullable=False, server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        # Lists of a board in order and max(position) of a board
+        Index("ix_lists_board_id_position", "board_id", "position"),
+    )
 
     def __str__(self):
         return f'<{self.__class__.__name__}: {self.name}>'
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Table
+from sqlalchemy import Column, Integer, String, ForeignKey, Table, DateTime, Index, func
 from sqlalchemy.orm import relationship
 
 from ..db.database import Base
@@ -9,21 +9,33 @@ card_tags = Table(
     Column('card_id', Integer, ForeignKey(
         "cards.id", ondelete="CASCADE"), primary_key=True),
     Column('tag_id', Integer, ForeignKey(
-        "tags.id", ondelete="CASCADE"), primary_key=True)
+        "tags.id", ondelete="CASCADE"), primary_key=True),
+    # Attach/detach are reported as a change of the card (see `app.versioning`)
+    Column('created_at', DateTime, nullable=False, server_default=func.now()),
+    # The primary key already covers the lookups by card_id.
+    # Cards of a tag by id (pages of `Tag.cards`)
+    Index('ix_card_tags_tag_id_card_id', 'tag_id', 'card_id')
 )
 
 
 class Tag(Base):
     __tablename__ = "tags"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     name = Column(String(50), nullable=True)
     color = Column(String(7), nullable=False)
 
-    board_id = Column(Integer, ForeignKey("boards.id"), nullable=False)
+    board_id = Column(Integer, ForeignKey(
+        "boards.id", ondelete="CASCADE"), nullable=False, index=True)
     board = relationship("Board", back_populates="tags")
 
-    cards = relationship("Card", secondary=card_tags, back_populates="tags")
+    cards = relationship("Card", secondary=card_tags,
+                         back_populates="tags", passive_deletes=True)
+
+    # Sync (see `app.versioning`): board version of the last change and timestamps
+    change_seq = Column(Integer, nullable=False, default=1, server_default="1")
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
+    updated_at = Column(DateTime, nullable=False, server_default=func.now(), onupdate=func.now())
 
     def __str__(self):
         return f'<{self.__class__}: {self.name if self.name else self.color}>'
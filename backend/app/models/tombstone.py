@@ -0,0 +1,30 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Index, func
+from sqlalchemy.orm import relationship
+
+from ..db.database import Base
+
+
+class Tombstone(Base):
+    """
+    Record of a deleted list, card or tag, so the sync clients can drop it (see `app.versioning`).
+    A card moved to another board leaves a tombstone in its previous board.
+    """
+    __tablename__ = "tombstones"
+
+    id = Column(Integer, primary_key=True)
+    entity = Column(String(16), nullable=False)
+    entity_id = Column(Integer, nullable=False)
+    change_seq = Column(Integer, nullable=False)
+    deleted_at = Column(DateTime, nullable=False, server_default=func.now())
+
+    board_id = Column(Integer, ForeignKey(
+        "boards.id", ondelete="CASCADE"), nullable=False)
+    board = relationship("Board", back_populates="tombstones")
+
+    __table_args__ = (
+        # Deletions of a board since a cursor
+        Index("ix_tombstones_board_id_change_seq", "board_id", "change_seq"),
+    )
+
+    def __str__(self):
+        return f'<{self.__class__.__name__}: {self.entity} {self.entity_id}>'
@@ -0,0 +1,140 @@
+"""
+Keyset (cursor) pagination of the collections that can grow without bound.
+
+A paginated route takes `limit` and `cursor` query parameters (see `get_page`) and orders its rows by
+a unique key (e.g. `(position, name, id)` for the cards of a list). A page is read as
+`WHERE key > cursor ORDER BY key LIMIT limit + 1`: the extra row tells if there is a next page, and
+the key of the last row of the page is sent back, encoded, in the `X-Next-Cursor` header.
+Unlike OFFSET, reading a page never scans the rows of the pages before it: the key is the order of
+an index, so the database seeks to the cursor.
+
+Without `limit` nor `cursor` the routes return the whole collection, as before.
+"""
+import base64
+import binascii
+import json
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+
+from fastapi import Depends, HTTPException, Query, Response, status
+from sqlalchemy import and_, or_
+
+from .core.config import settings
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+@dataclass(frozen=True)
+class Page:
+    # None: the whole collection
+    limit: int | None = None
+    # Key of the last row of the previous page
+    cursor: tuple | None = None
+
+
+def encode_cursor(key: Sequence) -> str:
+    return base64.urlsafe_b64encode(json.dumps(list(key)).encode()).decode()
+
+
+def _invalid_cursor() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Invalid cursor"
+    )
+
+
+def decode_cursor(cursor: str) -> tuple:
+    """
+    Key of an encoded cursor: a non-empty list of strings and numbers. Raise 400 otherwise.
+    """
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, UnicodeError, ValueError):
+        key = None
+
+    if not isinstance(key, list) or not key or not all(
+            isinstance(value, (str, int, float)) and not isinstance(value, bool) for value in key):
+        raise _invalid_cursor()
+
+    return tuple(key)
+
+
+def get_page(
+    limit: int | None = Query(
+        None, ge=1, le=settings.PAGE_MAX_LIMIT, description="Size of the page (the whole collection if not specified)"),
+    cursor: str | None = Query(
+        None, description="`X-Next-Cursor` header of the previous page")
+) -> Page:
+    """
+    Dependency of the paginated routes. A cursor without limit reads pages of `PAGE_DEFAULT_LIMIT` rows.
+    """
+    if cursor is None:
+        return Page(limit=limit)
+
+    return Page(limit=limit or settings.PAGE_DEFAULT_LIMIT, cursor=decode_cursor(cursor))
+
+
+PageDep = Depends(get_page)
+
+
+def after_key(columns: Sequence, key: Sequence):
+    """
+    `(c1, c2, ...) > (k1, k2, ...)`, written so the first column bounds an index range scan.
+    """
+    condition = columns[-1] > key[-1]
+    for column, value in zip(reversed(columns[:-1]), reversed(key[:-1])):
+        condition = or_(column > value, and_(column == value, condition))
+
+    if len(columns) == 1:
+        return condition
+
+    return and_(columns[0] >= key[0], condition)
+
+
+def key_value(column, value):
+    """
+    Value of the cursor for a key column, as its Python type (an int is a valid float).
+    Raise 400 if it has another type: the database would fail on it.
+    """
+    python_type = column.type.python_type
+    if python_type is float and isinstance(value, int):
+        value = float(value)
+
+    if type(value) is not python_type:
+        raise _invalid_cursor()
+
+    return value
+
+
+def paginate(statement, columns: Sequence, page: Page):
+    """
+    Order a `select()` (or ORM query) by the key `columns` and keep the rows of the page, plus one
+    to know if there is a next one (see `take_page`).
+    """
+    statement = statement.order_by(*[column.asc() for column in columns])
+
+    if page.cursor is not None:
+        if len(page.cursor) != len(columns):
+            raise _invalid_cursor()
+        key = [key_value(column, value) for column, value in zip(columns, page.cursor)]
+        statement = statement.where(after_key(columns, key))
+
+    if page.limit:
+        statement = statement.limit(page.limit + 1)
+
+    return statement
+
+
+def take_page(response: Response, rows: Sequence, page: Page, key: Callable[[object], Sequence]) -> list:
+    """
+    Drop the extra row read by `paginate` and set the `X-Next-Cursor` header when there is a next page.
+    `key` returns the key of a row, in the order of the columns given to `paginate`.
+    """
+    rows = list(rows)
+    if not page.limit or len(rows) <= page.limit:
+        return rows
+
+    rows = rows[:page.limit]
+    response.headers[NEXT_CURSOR_HEADER] = encode_cursor(key(rows[-1]))
+
+    return rows
@@ -0,0 +1,119 @@
+"""
+Deletion of large boards in the background (`settings.BOARD_DELETE_MODE = "purge"`).
+
+The lists, cards, tags and tombstones of a board are deleted by the database (ON DELETE CASCADE),
+so deleting a board is a single DELETE. On a very large board it is still one long transaction that
+holds the locks of every row, so the boards with more than `BOARD_PURGE_MIN_CARDS` cards are:
+1. Soft deleted by the request (`Board.deleted_at`): they disappear from every query at once
+   (see `models.board`) and the route answers right away.
+2. Purged by a background task: the cards are deleted by batches of `BOARD_PURGE_BATCH_SIZE`,
+   each batch in its own short transaction, then the board (and what is left of it).
+
+The purge can be resumed: boards left soft deleted (e.g. the process stopped during a purge) are
+purged with `python -m app.purge`.
+"""
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.orm import Session
+
+from .core.config import settings
+from .models import Board, List, Card
+
+# Soft deleted boards are hidden from the queries, unless this execution option is set
+INCLUDE_DELETED = {"include_deleted": True}
+
+
+def should_purge(db: Session, board: Board) -> bool:
+    """
+    Tell if the board is deleted in the background (see module docs).
+    """
+    return (
+        settings.BOARD_DELETE_MODE == "purge"
+        and board.cards_count > settings.BOARD_PURGE_MIN_CARDS
+    )
+
+
+def soft_delete_board(db: Session, board: Board) -> None:
+    """
+    Hide the board until it is purged. Does not commit.
+    """
+    board.deleted_at = func.now()
+
+
+def purge_board(db: Session, board_id: int, batch_size: int | None = None) -> int:
+    """
+    Delete a soft deleted board by batches of cards, committing after each batch.
+    Returns the number of deleted cards.
+    """
+    batch_size = batch_size or settings.BOARD_PURGE_BATCH_SIZE
+    deleted_cards = 0
+
+    while True:
+        # card_tags rows go with their cards (ON DELETE CASCADE)
+        batch = select(Card.id).join(Card.list).where(
+            List.board_id == board_id
+        ).limit(batch_size).scalar_subquery()
+
+        deleted = db.execute(
+            delete(Card).where(Card.id.in_(batch))
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.commit()
+
+        deleted_cards += deleted
+        if deleted < batch_size:
+            break
+
+    # The lists, tags and tombstones left are deleted with the board
+    db.execute(
+        delete(Board).where(Board.id == board_id, Board.deleted_at.is_not(None))
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+    return deleted_cards
+
+
+async def purge_board_task(board_id: int, bind) -> None:
+    """
+    Background version of `purge_board`, on its own session (see `ranking.rebalance_list_task`).
+    """
+    if bind.dialect.is_async:
+        async with AsyncSession(bind=AsyncEngine(bind)) as db:
+            await db.run_sync(purge_board, board_id)
+    else:
+        await run_in_threadpool(_purge_board_sync, board_id, bind)
+
+
+def _purge_board_sync(board_id: int, bind) -> None:
+    with Session(bind=bind) as db:
+        purge_board(db, board_id)
+
+
+def purge_deleted_boards(db: Session) -> list[int]:
+    """
+    Purge every board left soft deleted. Returns their ids.
+    """
+    board_ids = db.execute(
+        select(Board.id).where(Board.deleted_at.is_not(None)).order_by(Board.id),
+        execution_options=INCLUDE_DELETED
+    ).scalars().all()
+
+    for board_id in board_ids:
+        purge_board(db, board_id)
+
+    return board_ids
+
+
+def main() -> None:
+    from .db.database import SessionLocal
+
+    with SessionLocal() as db:
+        board_ids = purge_deleted_boards(db)
+
+    print(f"Purged {len(board_ids)} boards: {board_ids}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""
+Helpers for the card ranking scheme used when `settings.CARD_POSITION_MODE` is "fractional".
+
+Cards are ordered inside a list by `Card.position`. A moved card takes a rank between its new
+neighbours, so a move only writes the moved card. When two neighbours get too close the list is
+renumbered back to 1..n (rebalanced), which is also the layout used by the "integer" mode.
+"""
+from collections.abc import Collection
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func, update, select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.orm import Session
+
+from .core.config import settings
+from .models import Card, List
+from .versioning import bump_list_board_version, record_reorder
+
+# Gap under which the list is rebalanced in the background once the move is committed.
+REBALANCE_GAP = 1e-6
+
+# Gap under which the midpoint is not reliable anymore: the list is rebalanced before the move.
+MIN_GAP = 1e-9
+
+# Same order as `List.cards`, with the id as last tie breaker (also the pagination key).
+CARD_KEY = (Card.position, Card.name, Card.id)
+CARD_ORDER = tuple(column.asc() for column in CARD_KEY)
+
+
+def next_rank(db: Session, board_list: List) -> float:
+    """
+    Return the rank for a card appended at the bottom of the list (with an up to date `cards_count`).
+    The "integer" positions are 1..n, the bottom is given by the counter (see `app.counters`).
+    """
+    if settings.CARD_POSITION_MODE == "integer":
+        return board_list.cards_count + 1
+
+    max_position = db.query(func.max(Card.position)).filter(
+        Card.list_id == board_list.id
+    ).scalar()
+
+    return int(max_position or 0) + 1
+
+
+def neighbour_ranks(
+    db: Session,
+    list_id: int,
+    slot: int,
+    exclude_card_ids: Collection[int] = ()
+) -> tuple[float | None, float | None]:
+    """
+    Return the ranks of the cards that would surround a card placed at `slot` (1-based).
+    `exclude_card_ids` are the cards being moved, so they are not counted as their own neighbours.
+    Only the (up to) two neighbour rows are read.
+    """
+    query = db.query(Card.position).filter(Card.list_id == list_id)
+    if exclude_card_ids:
+        query = query.filter(Card.id.not_in(exclude_card_ids))
+
+    if slot <= 1:
+        row = query.order_by(*CARD_ORDER).first()
+        return None, row.position if row else None
+
+    rows = query.order_by(*CARD_ORDER).offset(slot - 2).limit(2).all()
+    before = rows[0].position if rows else None
+    after = rows[1].position if len(rows) > 1 else None
+
+    return before, after
+
+
+def rank_between(before: float | None, after: float | None) -> float:
+    """
+    Return a rank strictly between `before` and `after` (any of them can be missing).
+    """
+    if before is None and after is None:
+        return 1
+    if before is None:
+        return after - 1
+    if after is None:
+        return int(before) + 1
+
+    return (before + after) / 2
+
+
+def ranks_between(before: float | None, after: float | None, count: int) -> list[float]:
+    """
+    Return `count` increasing ranks strictly between `before` and `after`, evenly spread
+    (same edges as `rank_between`).
+    """
+    if count == 1:
+        return [rank_between(before, after)]
+    if before is None and after is None:
+        return [1 + index for index in range(count)]
+    if before is None:
+        return [after - count + index for index in range(count)]
+    if after is None:
+        return [int(before) + 1 + index for index in range(count)]
+
+    step = (after - before) / (count + 1)
+    return [before + step * (index + 1) for index in range(count)]
+
+
+def gap(before: float | None, after: float | None) -> float | None:
+    """
+    Return the distance between two neighbours, or None if the slot is at an edge of the list.
+    """
+    if before is None or after is None:
+        return None
+
+    return after - before
+
+
+def rank_for_slot(
+    db: Session,
+    list_id: int,
+    slot: int,
+    exclude_card_ids: Collection[int] = ()
+) -> tuple[float, bool]:
+    """
+    Compute the rank of a card placed at `slot` of the list.
+
+    Returns the rank and a flag telling if the list should be rebalanced once the change is committed.
+    If the neighbours are already too close to split, the list is rebalanced right away (in the
+    current transaction) before computing the rank.
+    """
+    ranks, dense = ranks_for_slot(db, list_id, slot, 1, exclude_card_ids)
+
+    return ranks[0], dense
+
+
+def ranks_for_slot(
+    db: Session,
+    list_id: int,
+    slot: int,
+    count: int,
+    exclude_card_ids: Collection[int] = ()
+) -> tuple[list[float], bool]:
+    """
+    Compute the ranks of `count` cards placed together at `slot` of the list (see `rank_for_slot`).
+    The gap between the neighbours has to fit all of them.
+    """
+    before, after = neighbour_ranks(db, list_id, slot, exclude_card_ids)
+
+    current_gap = gap(before, after)
+    if current_gap is not None and current_gap < MIN_GAP * count:
+        rebalance_list(db, list_id)
+        before, after = neighbour_ranks(
+            db, list_id, slot, exclude_card_ids)
+        current_gap = gap(before, after)
+
+    dense = current_gap is not None and current_gap < REBALANCE_GAP * count
+
+    return ranks_between(before, after, count), dense
+
+
+def rebalance_list(db: Session, list_id: int) -> None:
+    """
+    Renumber the cards of the list to 1..n keeping their current order.
+    Runs as a single UPDATE (plus the board version bump, see `app.versioning`) and does not commit.
+    """
+    board_id, version = bump_list_board_version(db, list_id)
+
+    ranked = select(
+        Card.id,
+        func.row_number().over(order_by=CARD_ORDER).label("rank")
+    ).where(Card.list_id == list_id).subquery()
+
+    db.execute(
+        update(Card)
+        .where(Card.id == ranked.c.id)
+        .values({Card.position: ranked.c.rank, Card.change_seq: version})
+        .execution_options(synchronize_session=False)
+    )
+    record_reorder(db, board_id, version, list_id)
+    db.expire_all()
+
+
+async def rebalance_list_task(list_id: int, bind) -> None:
+    """
+    Background version of `rebalance_list`. Uses its own session on `bind` since the request
+    session is already closed when background tasks run.
+    With the async stack, `bind` is the sync facade of the async engine, so it is wrapped back.
+    """
+    if bind.dialect.is_async:
+        async with AsyncSession(bind=AsyncEngine(bind)) as db:
+            await db.run_sync(rebalance_list, list_id)
+            await db.commit()
+    else:
+        await run_in_threadpool(_rebalance_list_sync, list_id, bind)
+
+
+def _rebalance_list_sync(list_id: int, bind) -> None:
+    with Session(bind=bind) as db:
+        rebalance_list(db, list_id)
+        db.commit()
@@ -0,0 +1,225 @@
+"""
+Real-time board updates: committed changes are published to the subscribers of the board.
+
+- The write routes record their changes with `app.versioning` (`record_change`, `record_deletion`, ...),
+  which also queues a small delta here (`queue_change`) in the session.
+- Once the transaction is committed (`after_commit` session event), one event per changed board is
+  published on the broker. A rollback drops the queued deltas.
+- Subscribers (`routers.realtime`, WebSocket) receive:
+    {"type": "changes", "board_id": 1, "cursor": 12, "changes": [{"entity": "card", "id": 5, "op": "upsert"}]}
+  `cursor` is the board version (see `GET /boards/{id}/changes`), `op` is "upsert", "delete" or "reorder"
+  (the positions of the cards of the list changed).
+
+The broker is pluggable (`settings.REALTIME_BROKER`, import path of a `Broker` class).
+`InMemoryBroker` (default) fans the events out inside the process: each subscriber has a bounded
+queue, and a subscriber that falls `REALTIME_QUEUE_SIZE` events behind is evicted (it has to resync
+with `/changes` instead of slowing down the publishers or growing the memory).
+A multi-worker deployment needs a cross-process broker (e.g. on Redis pub/sub or Postgres NOTIFY)
+implementing the same interface.
+"""
+import asyncio
+import logging
+import threading
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from importlib import import_module
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from .core.config import settings
+
+logger = logging.getLogger(__name__)
+
+PENDING_CHANGES_KEY = "realtime_pending_changes"
+
+
+class SubscriberEvicted(Exception):
+    """The subscriber was too slow to consume its events and was dropped."""
+
+
+class Broker(ABC):
+    """
+    Interface of the pub/sub transport.
+    """
+
+    @abstractmethod
+    def publish(self, board_id: int, event: dict) -> None:
+        """
+        Send an event to the subscribers of the board.
+        Must not block: it is called from the request worker right after the commit.
+        """
+
+    @abstractmethod
+    def subscribe(self, board_id: int):
+        """
+        Async context manager yielding an async iterator of the events of the board.
+        The iteration raises `SubscriberEvicted` if the subscriber is dropped.
+        """
+
+
+class Subscription:
+    """
+    Events of a board for one subscriber of the `InMemoryBroker`, buffered in a bounded queue.
+    """
+    _EVICTED = object()
+
+    def __init__(self, board_id: int, max_queue: int):
+        self.board_id = board_id
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=max_queue)
+        self.evicted = False
+
+    def push(self, event: dict) -> None:
+        """
+        Queue an event (runs on the loop of the subscriber).
+        A full queue evicts the subscriber: the pending events are dropped.
+        """
+        if self.evicted:
+            return
+
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.evicted = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(self._EVICTED)
+            logger.warning(
+                "Slow subscriber of board %s evicted", self.board_id)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> dict:
+        event = await self.queue.get()
+        if event is self._EVICTED:
+            raise SubscriberEvicted()
+        return event
+
+
+class InMemoryBroker(Broker):
+    """
+    In-process fan-out (default broker). Only reaches the subscribers of the same process.
+    """
+
+    def __init__(self, max_queue: int = settings.REALTIME_QUEUE_SIZE):
+        self.max_queue = max_queue
+        self._subscriptions: dict[int, set[Subscription]] = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def publish(self, board_id: int, event: dict) -> None:
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(board_id, ()))
+
+        # Publishers run on worker threads, the subscribers on the event loop
+        for subscription in subscriptions:
+            subscription.loop.call_soon_threadsafe(subscription.push, event)
+
+    def subscribers_count(self, board_id: int) -> int:
+        with self._lock:
+            return len(self._subscriptions.get(board_id, ()))
+
+    @asynccontextmanager
+    async def subscribe(self, board_id: int):
+        subscription = Subscription(board_id, self.max_queue)
+
+        with self._lock:
+            self._subscriptions[board_id].add(subscription)
+        try:
+            yield subscription
+        finally:
+            with self._lock:
+                self._subscriptions[board_id].discard(subscription)
+                if not self._subscriptions[board_id]:
+                    del self._subscriptions[board_id]
+
+
+_broker: Broker | None = None
+
+
+def get_broker() -> Broker:
+    """
+    Return the broker of `settings.REALTIME_BROKER`, created on first use.
+    """
+    global _broker
+
+    if _broker is None:
+        module_name, class_name = settings.REALTIME_BROKER.rsplit(".", 1)
+        _broker = getattr(import_module(module_name), class_name)()
+
+    return _broker
+
+
+def set_broker(broker: Broker | None) -> None:
+    """
+    Replace the broker (e.g. in tests), `None` goes back to `settings.REALTIME_BROKER`.
+    """
+    global _broker
+    _broker = broker
+
+
+# --- Changes of the transaction ---
+def queue_change(db: Session, board_id: int, version: int, entity: str, target, op: str = "upsert") -> None:
+    """
+    Queue a delta to publish once the transaction is committed.
+    `target` is the changed object or its id (new objects get their id on flush).
+    """
+    db.info.setdefault(PENDING_CHANGES_KEY, []).append(
+        (board_id, version, entity, target, op))
+
+
+def _target_id(target) -> int:
+    return target if isinstance(target, int) else target.id
+
+
+@event.listens_for(Session, "after_flush_postexec")
+def _resolve_pending_ids(db: Session, flush_context):
+    # The ids of the new objects are known now and the objects are expired after the commit
+    pending = db.info.get(PENDING_CHANGES_KEY)
+    if pending:
+        db.info[PENDING_CHANGES_KEY] = [
+            (board_id, version, entity, _target_id(target), op)
+            for board_id, version, entity, target, op in pending
+        ]
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_pending_changes(db: Session):
+    if db.in_nested_transaction():
+        # Savepoint released: published with the transaction
+        return
+
+    pending = db.info.pop(PENDING_CHANGES_KEY, None)
+    if not pending:
+        return
+
+    events = {}
+    # Changes of each board, deduplicated and in order: bulk changes queue one delta per row
+    changes = defaultdict(dict)
+    for board_id, version, entity, target, op in pending:
+        board_event = events.setdefault(board_id, {
+            "type": "changes", "board_id": board_id, "cursor": version, "changes": []
+        })
+        board_event["cursor"] = max(board_event["cursor"], version)
+
+        target_id = _target_id(target)
+        changes[board_id].setdefault(
+            (entity, target_id, op), {"entity": entity, "id": target_id, "op": op})
+
+    broker = get_broker()
+    for board_id, board_event in events.items():
+        board_event["changes"] = list(changes[board_id].values())
+        try:
+            broker.publish(board_id, board_event)
+        except Exception:
+            # The change is committed: a failing broker must not fail the request
+            logger.exception("Could not publish the changes of board %s", board_id)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _drop_pending_changes(db: Session, transaction):
+    # Rolled back or closed without commit (the committed changes are already popped)
+    if transaction.parent is None:
+        db.info.pop(PENDING_CHANGES_KEY, None)
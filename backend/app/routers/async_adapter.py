@@ -0,0 +1,110 @@
+"""
+Async versions of the sync routers, used when `settings.DATABASE_ASYNC` is enabled.
+
+Each endpoint of a sync router is wrapped in an `async def` endpoint with the same path, parameters
+and response model, where:
+- `Depends(get_db)` is replaced by `Depends(get_async_db)` (an `AsyncSession`).
+- `CurrentUserDep` is replaced by `AsyncCurrentUserDep`.
+- The original function runs inside `AsyncSession.run_sync`, so its ORM code (including lazy loads)
+  awaits the async driver on the event loop instead of blocking a threadpool worker.
+- The result is converted to the response model inside `run_sync` too, because relationships can't be
+  lazy loaded once we are back in the async context.
+
+The routes are written once (in the sync routers) and both stacks stay in sync.
+"""
+import inspect
+
+from fastapi import APIRouter, Depends, Response
+from fastapi.routing import APIRoute
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..db.database import get_db, get_async_db
+from ..security import get_current_user, AsyncCurrentUserDep
+
+
+def _depends_on(parameter: inspect.Parameter, dependency) -> bool:
+    return getattr(parameter.default, "dependency", None) is dependency
+
+
+def to_async_endpoint(endpoint, response_model=None):
+    """
+    Wrap a sync endpoint into an async endpoint running on an `AsyncSession` (see module docs).
+    """
+    signature = inspect.signature(endpoint)
+    parameters = []
+    db_parameter = None
+
+    for parameter in signature.parameters.values():
+        if _depends_on(parameter, get_db):
+            db_parameter = parameter.name
+            parameter = parameter.replace(
+                default=Depends(get_async_db), annotation=AsyncSession)
+        elif _depends_on(parameter, get_current_user):
+            parameter = parameter.replace(default=AsyncCurrentUserDep)
+        parameters.append(parameter)
+
+    # Endpoints without session (e.g. only the current user) still need one to run in `run_sync`
+    pass_db = db_parameter is not None
+    if not pass_db:
+        db_parameter = "async_db"
+        parameters.append(inspect.Parameter(
+            db_parameter, inspect.Parameter.KEYWORD_ONLY,
+            default=Depends(get_async_db), annotation=AsyncSession
+        ))
+
+    adapter = TypeAdapter(response_model) if response_model else None
+
+    async def async_endpoint(**kwargs):
+        async_db: AsyncSession = kwargs[db_parameter] if pass_db else kwargs.pop(
+            db_parameter)
+
+        def call_endpoint(session):
+            if pass_db:
+                kwargs[db_parameter] = session
+
+            result = endpoint(**kwargs)
+            if adapter is None or result is None or isinstance(result, Response):
+                return result
+
+            return adapter.validate_python(result, from_attributes=True)
+
+        return await async_db.run_sync(call_endpoint)
+
+    async_endpoint.__signature__ = signature.replace(parameters=parameters)
+    async_endpoint.__name__ = endpoint.__name__
+    async_endpoint.__qualname__ = endpoint.__qualname__
+    async_endpoint.__doc__ = endpoint.__doc__
+
+    return async_endpoint
+
+
+def to_async_router(router: APIRouter) -> APIRouter:
+    """
+    Build a router with the async version of every route of `router` (same paths, tags and responses).
+    """
+    async_router = APIRouter()
+
+    for route in router.routes:
+        if not isinstance(route, APIRoute):
+            continue
+
+        async_router.add_api_route(
+            route.path,
+            to_async_endpoint(route.endpoint, route.response_model),
+            methods=list(route.methods),
+            response_model=route.response_model,
+            status_code=route.status_code,
+            tags=route.tags,
+            responses=route.responses,
+            name=route.name,
+            summary=route.summary,
+            description=route.description,
+            response_description=route.response_description,
+            deprecated=route.deprecated,
+            operation_id=route.operation_id,
+            include_in_schema=route.include_in_schema,
+            response_class=route.response_class,
+        )
+
+    return async_router
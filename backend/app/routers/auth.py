@@ -1,11 +1,15 @@
 from fastapi import APIRouter, status, Depends, HTTPException
 from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from ..schemas.user import User as user_schema, UserCreate as user_create_schema
 from ..schemas.token import Token as token_schema
 from ..schemas import HTTPError
-from ..db.database import get_db
-from .. import security
+from ..db.database import get_db, get_async_db
+from ..db.loading import eager_load_options
+from .. import security, hashing
+from ..cache import queue_invalidation, user_scope
 from ..models.user import User
 from ..models.board import Board
 from ..models.list import List
@@ -15,12 +19,70 @@ router = APIRouter(
     tags=["Auth"]
 )
 
+# Used instead of `router` with the async stack (settings.DATABASE_ASYNC)
+async_router = APIRouter(
+    prefix="/auth",
+    tags=["Auth"]
+)
+
+busy_response = {
+    "model": HTTPError,
+    "description": "Too many password hashes pending, retry after `Retry-After` seconds"
+}
+
+register_responses = {400: {
+    "model": HTTPError,
+    "description": "Username or email are already registered"},
+    503: busy_response
+}
+
+login_responses = {401: {
+    "model": HTTPError,
+    "description": "Unauthorized: Incorrect username or password"},
+    503: busy_response
+}
+
+
+# --- HELPER FUNCTIONS ---
+def build_user_with_inbox(user_data: user_create_schema, password_hash: str) -> list:
+    """
+    Build a new user with its Inbox board and the "Incoming" list.
+    Returns the objects to be added to the session (the user first).
+    """
+    user = User(
+        username=user_data.username,
+        email=user_data.email,
+        password_hash=password_hash,
+    )
+
+    inbox_board = Board(
+        name="Inbox",
+        description="Your deafult inbox board.",
+        is_inbox=True,
+        lists_count=1,
+        user=user
+    )
+
+    incoming_list = List(
+        name="Incoming",
+        board=inbox_board
+    )
+
+    return [user, inbox_board, incoming_list]
+
+
+def invalid_login_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="incorrect username or password",
+        # standard of OAuth2
+        headers={"WWW-Authenticate": "Bearer"},
+    )
 
+
+# --- SYNC ROUTES ---
 @router.post("/register", response_model=user_schema, status_code=status.HTTP_201_CREATED,
-             responses={400: {
-                 "model": HTTPError,
-                 "description": "Username or email are already registered"}
-             })
+             responses=register_responses)
 def register_user(user_data: user_create_schema, db: Session = Depends(get_db)):
     """Create a new user in the database.
     - Validates that the email does not exist.
@@ -47,39 +109,23 @@ def register_user(user_data: user_create_schema, db: Session = Depends(get_db)):
         )
 
     # Hash password
-    pasword_hash = security.get_password_hash(user_data.password)
+    pasword_hash = hashing.hash_password(user_data.password)
 
     # Create user
-    user = User(
-        username=user_data.username,
-        email=user_data.email,
-        password_hash=pasword_hash,
-    )
+    new_objects = build_user_with_inbox(user_data, pasword_hash)
+    user = new_objects[0]
 
-    inbox_board = Board(
-        name="Inbox",
-        description="Your deafult inbox board.",
-        is_inbox=True,
-        user=user
-    )
-
-    incoming_list = List(
-        name="Incoming",
-        board=inbox_board
-    )
-
-    db.add_all([user, inbox_board, incoming_list])
+    db.add_all(new_objects)
+    db.flush()
+    # Responses cached for a previous user with the same id
+    queue_invalidation(db, user_scope(user.id))
     db.commit()
     db.refresh(user)
 
     return user
 
 
-@router.post("/login", response_model=token_schema,
-             responses={401: {
-                 "model": HTTPError,
-                 "description": "Unauthorized: Incorrect username or password"}
-             })
+@router.post("/login", response_model=token_schema, responses=login_responses)
 def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
     """
     Authenticates the user and returns a JWT.
@@ -91,15 +137,79 @@ def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depend
     user = db.query(User).filter(User.username == form_data.username).first(
     ) or db.query(User).filter(User.email == form_data.username).first()
 
-    if user is None or not security.verify_password(form_data.password, user.password_hash):
+    if user is None or not hashing.verify_password(form_data.password, user.password_hash):
+        raise invalid_login_exception()
+
+    token_data = {"sub": user.username, "uid": user.id}
+    access_token = security.create_access_token(token_data)
+
+    return {"access_token": access_token, "token_type": "bearer"}
+
+
+# --- ASYNC ROUTES ---
+@async_router.post("/register", response_model=user_schema, status_code=status.HTTP_201_CREATED,
+                   responses=register_responses)
+async def register_user_async(user_data: user_create_schema, db: AsyncSession = Depends(get_async_db)):
+    """Create a new user in the database.
+    Async version of `register_user`: the hashing runs on the process pool without blocking the event loop.
+    """
+
+    # Verify username & email
+    email_exists = (await db.execute(
+        select(User.id).where(User.email == user_data.email))).first()
+    if email_exists:
         raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="incorrect username or password",
-            # standard of OAuth2
-            headers={"WWW-Authenticate": "Bearer"},
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="The email is already registered."
         )
 
-    token_data = {"sub": user.username}
+    username_exists = (await db.execute(
+        select(User.id).where(User.username == user_data.username))).first()
+    if username_exists:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="The username is already used."
+        )
+
+    # Hash password
+    password_hash = await hashing.hash_password_async(user_data.password)
+
+    # Create user
+    new_objects = build_user_with_inbox(user_data, password_hash)
+    db.add_all(new_objects)
+    await db.flush()
+    user_id = new_objects[0].id
+    queue_invalidation(db, user_scope(user_id))
+    await db.commit()
+
+    # Load what the response needs, lazy loads are not available in async
+    result = await db.execute(
+        select(User)
+        .options(*eager_load_options(User, user_schema))
+        .where(User.id == user_id)
+    )
+
+    return result.scalar_one()
+
+
+@async_router.post("/login", response_model=token_schema, responses=login_responses)
+async def login_async(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
+    """
+    Authenticates the user and returns a JWT.
+    Async version of `login`: the password verification runs on the process pool.
+    """
+
+    user = (await db.execute(
+        select(User).where(User.username == form_data.username))).scalars().first()
+    if user is None:
+        user = (await db.execute(
+            select(User).where(User.email == form_data.username))).scalars().first()
+
+    if user is None or not await hashing.verify_password_async(
+            form_data.password, user.password_hash):
+        raise invalid_login_exception()
+
+    token_data = {"sub": user.username, "uid": user.id}
     access_token = security.create_access_token(token_data)
 
     return {"access_token": access_token, "token_type": "bearer"}
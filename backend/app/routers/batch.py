@@ -0,0 +1,190 @@
+"""
+`POST /batch`: many writes of the board, list, card and tag routes in one request.
+
+Clients send bursts of small writes (rename a card, toggle `is_done`, set a due date, attach tags),
+each one paying for its own request, authentication and commit. A batch runs them in order with:
+- One authentication: every operation runs as the user of the batch.
+- One session and one commit (see `db.batching`): each operation runs in a savepoint, a failing one
+  is rolled back alone and the batch goes on, unless `atomic` is set (all or nothing).
+- The ownership checks of an operation reuse the objects loaded by the previous ones.
+
+The operations are the write routes of `routers.boards` and `routers.cards` (`method` and `path` as
+in the API, the JSON `body` of the route), called as they are: same validation, same errors, same
+events. Each one gets its status code and response body (or error detail) in `results`.
+The background tasks of the operations (e.g. the purge of a large board) run once committed.
+"""
+import inspect
+from functools import lru_cache
+from urllib.parse import urlsplit
+
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.routing import APIRoute
+from pydantic import BaseModel, TypeAdapter, ValidationError
+from sqlalchemy.orm import Session
+from starlette.routing import Match
+
+from ..db.database import get_db
+from ..db.batching import BatchTransaction
+from ..db.loading import eager_load_options
+from ..security import CurrentUserDep, get_current_user
+from ..models import User
+from .. import schemas
+from . import boards, cards
+
+router = APIRouter(
+    prefix="/batch",
+    tags=["Batch"]
+)
+
+
+def _takes_request(route: APIRoute) -> bool:
+    return any(parameter.annotation is Request
+               for parameter in inspect.signature(route.endpoint).parameters.values())
+
+
+# The write routes that can run in a batch (not the ones reading their body as a stream, see `app.bulk`)
+OPERATION_ROUTES = [
+    route for route in (*boards.router.routes, *cards.router.routes)
+    if isinstance(route, APIRoute) and "GET" not in route.methods and not _takes_request(route)
+]
+
+
+# --- HELPER FUNCTIONS ---
+@lru_cache(maxsize=None)
+def _adapter(annotation) -> TypeAdapter:
+    return TypeAdapter(annotation)
+
+
+def resolve_operation(operation: schemas.BatchOperation) -> tuple[APIRoute, dict]:
+    """
+    Return the route of the operation and its path parameters.
+    Raise 404 if no route has its path, 405 if none has its method too.
+    """
+    path = urlsplit(operation.path).path
+    scope = {"type": "http", "path": path, "method": operation.method}
+    method_not_allowed = False
+
+    for route in OPERATION_ROUTES:
+        match, child_scope = route.matches(scope)
+        if match == Match.FULL:
+            return route, child_scope["path_params"]
+        if match == Match.PARTIAL:
+            method_not_allowed = True
+
+    if method_not_allowed:
+        raise HTTPException(
+            status_code=status.HTTP_405_METHOD_NOT_ALLOWED,
+            detail=f"Method {operation.method} not allowed for {path}."
+        )
+
+    raise HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail=f"No route for {operation.method} {path}."
+    )
+
+
+def operation_arguments(
+    route: APIRoute,
+    path_params: dict,
+    operation: schemas.BatchOperation,
+    background_tasks: BackgroundTasks,
+    db: Session,
+    current_user: User
+) -> dict:
+    """
+    Build the arguments of the route for the operation, as FastAPI would for a request.
+    Raise `ValidationError` if the path parameters or the body are not valid.
+    """
+    arguments = {}
+
+    for parameter in inspect.signature(route.endpoint).parameters.values():
+        dependency = getattr(parameter.default, "dependency", None)
+        annotation = parameter.annotation
+
+        if parameter.name in path_params:
+            arguments[parameter.name] = _adapter(annotation).validate_python(
+                path_params[parameter.name])
+        elif dependency is get_db:
+            arguments[parameter.name] = db
+        elif dependency is get_current_user:
+            arguments[parameter.name] = current_user
+        elif hasattr(dependency, "load_model"):
+            # Responses of the operations are not expanded
+            arguments[parameter.name] = eager_load_options(
+                dependency.load_model, route.response_model)
+        elif annotation is BackgroundTasks:
+            arguments[parameter.name] = background_tasks
+        elif isinstance(annotation, type) and issubclass(annotation, BaseModel):
+            arguments[parameter.name] = annotation.model_validate(operation.body or {})
+        else:
+            raise RuntimeError(
+                f"Parameter {parameter.name} of {route.name} is not supported in a batch.")
+
+    return arguments
+
+
+def operation_body(route: APIRoute, result):
+    """
+    Encode the result of the route as JSON data of its response model.
+    """
+    if route.response_model is None or result is None:
+        return None
+
+    adapter = _adapter(route.response_model)
+    return adapter.dump_python(adapter.validate_python(result, from_attributes=True), mode="json")
+
+
+# --- ROUTES ---
+@router.post("", response_model=schemas.BatchResult, responses={
+    422: {"description": "Invalid batch (e.g. no operations or too many)"},
+})
+def run_batch(
+    batch_data: schemas.BatchRequest,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_user: User = CurrentUserDep
+):
+    """
+    Run the operations in order, in one transaction, and return the result of each one.
+    A failing operation is rolled back and the next ones still run.
+    With `atomic=true` the first failing operation rolls back the whole batch: the others get 424.
+    """
+    results = []
+    operations_tasks = BackgroundTasks()
+    failed = None
+
+    with BatchTransaction(db) as batch:
+        for index, operation in enumerate(batch_data.operations):
+            operation_tasks = BackgroundTasks()
+            try:
+                with batch.operation():
+                    route, path_params = resolve_operation(operation)
+                    result = route.endpoint(**operation_arguments(
+                        route, path_params, operation, operation_tasks, db, current_user))
+                    body = operation_body(route, result)
+            except HTTPException as error:
+                results.append({"status": error.status_code, "body": {"detail": error.detail}})
+            except ValidationError as error:
+                results.append({"status": status.HTTP_422_UNPROCESSABLE_CONTENT, "body": {
+                    "detail": jsonable_encoder(error.errors(include_url=False))}})
+            else:
+                results.append({"status": route.status_code or status.HTTP_200_OK, "body": body})
+                operations_tasks.tasks.extend(operation_tasks.tasks)
+                continue
+
+            if batch_data.atomic:
+                failed = index
+                break
+
+        if failed is None:
+            batch.commit()
+            background_tasks.tasks.extend(operations_tasks.tasks)
+            return {"committed": True, "results": results}
+
+    skipped = {"status": status.HTTP_424_FAILED_DEPENDENCY,
+               "body": {"detail": f"Rolled back: operation {failed} failed."}}
+    results = [skipped] * failed + [results[failed]] + \
+        [skipped] * (len(batch_data.operations) - failed - 1)
+
+    return {"committed": False, "results": results}
@@ -1,58 +1,131 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import func
-from sqlalchemy.orm import Session
+from collections import defaultdict
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, Response, status
+from fastapi.exceptions import RequestValidationError
+from sqlalchemy import and_, case, exists, func, literal, select, update
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy.orm.attributes import set_committed_value
 
 from ..db.database import get_db
+from ..db.batching import loaded_board, loaded_card, loaded_list, loaded_tag, remember_checked
+from ..db.loading import ResponseLoadDep, eager_load_options
+from ..db.locking import ConcurrentChange, lock_boards, lock_card_lists, lock_lists, retry_on_conflict
 from .. import schemas
 from ..schemas import common as common_schemas
+from ..schemas.common import requested_expansion
 from ..security import CurrentUserDep
-from ..models import User, Board, List, Card, Tag
+from ..models import User, Board, List, Card, Tag, Tombstone, card_tags
 from ..core.config import settings
+from .. import ranking
+from .. import purge
+from .. import bulk
+from ..pagination import Page, PageDep, paginate, take_page
+from ..counters import update_counters
+from ..serialization import serialize_response
+from ..coalescing import single_flight
+from ..cache import board_scope, boards_scope, cache_response, cached_response, queue_invalidation
+from ..versioning import (
+    record_change, record_deletion, record_list_move, record_bulk_change, record_reorder,
+    board_etag, boards_etag, conditional_response
+)
 
 router = APIRouter(
     prefix="/boards",
     tags=["Boards"]
 )
 
+# Same order as `Board.lists`, with the id as last tie breaker.
+LIST_ORDER = (List.position.asc(), List.name.asc(), List.id.asc())
+
 
 # --- HELPER FUNCTIONS ---
 def get_board_or_404(
     board_id: int,
     db: Session,
-    current_user: User
+    current_user: User,
+    options: tuple = ()
 ) -> Board:
     """
     Search for the board of the given id and verifies if the current user is the owner of the board.
     Raise 404 if not found or not the owner.
+    `options` are loader options applied to the board (see `db.loading`).
+    In a batch, a board already loaded by a previous operation is returned without query (see `db.batching`).
     """
-    board = db.query(Board).filter(Board.id == board_id).first()
-    if not board or board.user_id != current_user.id:
+    board = loaded_board(db, board_id, current_user)
+    if board is not None:
+        return board
+
+    board = db.query(Board).options(*options).filter(
+        Board.id == board_id,
+        Board.user_id == current_user.id
+    ).first()
+
+    if not board:
         raise HTTPException(
             status.HTTP_404_NOT_FOUND,
             detail=f"Board with id {board_id} not found."
         )
 
+    remember_checked(db, board)
     return board
 
 
+def get_board_version_or_404(board_id: int, db: Session, current_user: User) -> int:
+    """
+    Return the version of the board (see `app.versioning`) without loading it.
+    Raise 404 if not found or not the owner (same as `get_board_or_404`).
+    """
+    version = db.query(Board.version).filter(
+        Board.id == board_id,
+        Board.user_id == current_user.id
+    ).scalar()
+
+    if version is None:
+        raise HTTPException(
+            status.HTTP_404_NOT_FOUND,
+            detail=f"Board with id {board_id} not found."
+        )
+
+    return version
+
+
 def get_list_or_404(
     board_id: int,
     list_id: int,
     db: Session,
-    current_user: User
+    current_user: User,
+    options: tuple = ()
 ) -> List:
     """
     Search for the list of the given `list_id` and verifies:
-    - If the board with `board_id` exists and have permission to modify it (using `get_board_or_404`).
+    - If the board with `board_id` exists and have permission to modify it.
     - If exists a list with the given `list_id`.
     - If the list belongs to the board.
 
+    Board and list are resolved with a single query (the list is outer joined by id,
+    so a missing list can still be told apart from a list of another board).
+
     Raise 404 if list or board is not found or if does not belong to the board.
+    `options` are loader options applied to the list.
     Check `get_board_or_404` for more details.
     """
-    board = get_board_or_404(board_id, db, current_user)
+    found_list = loaded_list(db, board_id, list_id, current_user)
+    if found_list is not None:
+        return found_list
+
+    row = db.query(Board, List).select_from(Board).outerjoin(
+        List, List.id == list_id
+    ).options(*options).filter(
+        Board.id == board_id,
+        Board.user_id == current_user.id
+    ).first()
+
+    if not row:
+        raise HTTPException(
+            status.HTTP_404_NOT_FOUND,
+            detail=f"Board with id {board_id} not found."
+        )
 
-    found_list = db.query(List).filter(List.id == list_id).first()
+    board, found_list = row
     if not found_list:
         raise HTTPException(
             status.HTTP_404_NOT_FOUND,
@@ -65,6 +138,7 @@ def get_list_or_404(
             detail=f"List with id {list_id} does not belong to board with id {board_id}."
         )
 
+    remember_checked(db, board, found_list)
     return found_list
 
 
@@ -72,20 +146,39 @@ def get_tag_or_404(
     board_id: int,
     tag_id: int,
     db: Session,
-    current_user: User
+    current_user: User,
+    options: tuple = ()
 ) -> Tag:
     """
     Search for the tag of the given `tag_id` and verifies:
-    - If the board with `board_id` exists and have permission to modify it (using `get_board_or_404`).
+    - If the board with `board_id` exists and have permission to modify it.
     - If exists a tag with the given `tag_id`.
     - If the tag belongs to the board.
 
+    Board and tag are resolved with a single query (see `get_list_or_404`).
+
     Raise 404 if tag or board is not found or if does not belong to the board.
+    `options` are loader options applied to the tag.
     Check `get_board_or_404` for more details.
     """
-    board = get_board_or_404(board_id, db, current_user)
+    found_tag = loaded_tag(db, board_id, tag_id, current_user)
+    if found_tag is not None:
+        return found_tag
+
+    row = db.query(Board, Tag).select_from(Board).outerjoin(
+        Tag, Tag.id == tag_id
+    ).options(*options).filter(
+        Board.id == board_id,
+        Board.user_id == current_user.id
+    ).first()
+
+    if not row:
+        raise HTTPException(
+            status.HTTP_404_NOT_FOUND,
+            detail=f"Board with id {board_id} not found."
+        )
 
-    found_tag = db.query(Tag).filter(Tag.id == tag_id).first()
+    board, found_tag = row
     if not found_tag:
         raise HTTPException(
             status.HTTP_404_NOT_FOUND,
@@ -98,6 +191,7 @@ def get_tag_or_404(
             detail=f"Tag with id {tag_id} does not belong to board with id {board_id}."
         )
 
+    remember_checked(db, board, found_tag)
     return found_tag
 
 
@@ -106,20 +200,53 @@ def get_card_or_404(
     list_id: int,
     card_id: int,
     db: Session,
-    current_user: User
+    current_user: User,
+    options: tuple = ()
 ) -> Card:
     """
     Search for the card of the given `card_id` and verifies:
-    - If exists a list with the given `list_id` and belongs to the board (using `get_list_or_404`).
-    - If the board with `board_id` exists and have permission to modify it (using `get_board_or_404` that is implicity included in `get_list_or_404` call).
+    - If exists a list with the given `list_id` and belongs to the board.
+    - If the board with `board_id` exists and have permission to modify it.
     - If exists a card with the given `card_id` and belongs to the list.
 
+    Board, list and card are resolved with a single query (see `get_list_or_404`).
+
     Raise 404 if any (card, list or board) is not found or if does not belong to the list and board respectively.
+    `options` are loader options applied to the card.
     Check `get_list_or_404` and `get_board_or_404` for more details.
     """
-    found_list = get_list_or_404(board_id, list_id, db, current_user)
+    found_card = loaded_card(db, board_id, list_id, card_id, current_user)
+    if found_card is not None:
+        return found_card
+
+    row = db.query(Board, List, Card).select_from(Board).outerjoin(
+        List, List.id == list_id
+    ).outerjoin(
+        Card, Card.id == card_id
+    ).options(*options).filter(
+        Board.id == board_id,
+        Board.user_id == current_user.id
+    ).first()
+
+    if not row:
+        raise HTTPException(
+            status.HTTP_404_NOT_FOUND,
+            detail=f"Board with id {board_id} not found."
+        )
+
+    board, found_list, found_card = row
+    if not found_list:
+        raise HTTPException(
+            status.HTTP_404_NOT_FOUND,
+            detail=f"List with id {list_id} not found."
+        )
+
+    if board.id != found_list.board_id:
+        raise HTTPException(
+            status.HTTP_404_NOT_FOUND,
+            detail=f"List with id {list_id} does not belong to board with id {board_id}."
+        )
 
-    found_card = db.query(Card).filter(Card.id == card_id).first()
     if not found_card:
         raise HTTPException(
             status.HTTP_404_NOT_FOUND,
@@ -132,22 +259,361 @@ def get_card_or_404(
             detail=f"Card with id {card_id} does not belong to list with id {list_id}."
         )
 
+    remember_checked(db, board, found_list, found_card)
     return found_card
 
 
+def load_board_snapshot(db: Session, board: Board) -> dict:
+    """
+    Build the whole tree of the board (lists -> cards -> tags) with one set-based query per table.
+    The rows are read as plain mappings and assembled in memory, so no ORM object is loaded or traversed.
+    Lists and cards keep the same order as `Board.lists` and `List.cards`.
+    """
+    lists = db.execute(
+        select(List.id, List.name, List.position)
+        .where(List.board_id == board.id)
+        .order_by(List.position.asc(), List.name.asc())
+    ).mappings().all()
+
+    cards = db.execute(
+        select(Card.id, Card.list_id, Card.name, Card.text, Card.is_done,
+               Card.position, Card.due_date)
+        .join(List, List.id == Card.list_id)
+        .where(List.board_id == board.id)
+        .order_by(*ranking.CARD_ORDER)
+    ).mappings().all()
+
+    tags = db.execute(
+        select(Tag.id, Tag.name, Tag.color)
+        .where(Tag.board_id == board.id)
+        .order_by(Tag.id.asc())
+    ).mappings().all()
+
+    card_tag_rows = db.execute(
+        select(card_tags.c.card_id, card_tags.c.tag_id)
+        .join(Tag, Tag.id == card_tags.c.tag_id)
+        .where(Tag.board_id == board.id)
+        .order_by(card_tags.c.card_id, card_tags.c.tag_id)
+    ).all()
+
+    # Assemble the tree
+    tags_by_id = {tag["id"]: dict(tag) for tag in tags}
+
+    tags_by_card = defaultdict(list)
+    for card_id, tag_id in card_tag_rows:
+        tags_by_card[card_id].append(tags_by_id[tag_id])
+
+    cards_by_list = defaultdict(list)
+    for card in cards:
+        card = dict(card)
+        card["tags"] = tags_by_card.get(card["id"], [])
+        cards_by_list[card.pop("list_id")].append(card)
+
+    return {
+        "id": board.id,
+        "name": board.name,
+        "description": board.description,
+        "image_url": board.image_url,
+        "is_inbox": board.is_inbox,
+        "user_id": board.user_id,
+        "cursor": board.version,
+        "tags": list(tags_by_id.values()),
+        "lists": [
+            {**board_list, "cards": cards_by_list.get(board_list["id"], [])}
+            for board_list in lists
+        ],
+    }
+
+
+def load_boards_stats(db: Session, user_id: int, page: Page = Page()) -> list[dict]:
+    """
+    Build the dashboard of the user: every non-inbox board with its card, done and overdue counts
+    and the number of cards of each of its tags.
+    Runs as one query: the cards are grouped by board and the tagged cards by tag in the database,
+    and the rows (one per tag of a board) are read as plain mappings, so no ORM object is loaded.
+    With a `page`, only the boards of the page are read (plus one, see `pagination.take_page`).
+    """
+    user_boards = paginate(select(Board.id).where(
+        Board.user_id == user_id, Board.is_inbox == False), (Board.id,), page)
+
+    card_stats = select(
+        List.board_id,
+        func.count(Card.id).label("cards_count"),
+        func.count(Card.id).filter(Card.is_done == True).label("done_count"),
+        func.count(Card.id).filter(
+            Card.is_done == False, Card.due_date < func.now()).label("overdue_count")
+    ).join(Card, Card.list_id == List.id).where(
+        List.board_id.in_(user_boards)
+    ).group_by(List.board_id).subquery()
+
+    tag_usage = select(
+        Tag.board_id, Tag.id, Tag.name, Tag.color,
+        func.count(card_tags.c.card_id).label("cards_count")
+    ).outerjoin(card_tags, card_tags.c.tag_id == Tag.id).where(
+        Tag.board_id.in_(user_boards)
+    ).group_by(Tag.id).subquery()
+
+    rows = db.execute(
+        select(
+            Board.id, Board.name, Board.description, Board.image_url,
+            func.coalesce(card_stats.c.cards_count, 0).label("cards_count"),
+            func.coalesce(card_stats.c.done_count, 0).label("done_count"),
+            func.coalesce(card_stats.c.overdue_count, 0).label("overdue_count"),
+            tag_usage.c.id.label("tag_id"),
+            tag_usage.c.name.label("tag_name"),
+            tag_usage.c.color.label("tag_color"),
+            tag_usage.c.cards_count.label("tag_cards_count")
+        )
+        .outerjoin(card_stats, card_stats.c.board_id == Board.id)
+        .outerjoin(tag_usage, tag_usage.c.board_id == Board.id)
+        .where(Board.id.in_(user_boards))
+        .order_by(Board.id.asc(), tag_usage.c.id.asc())
+    ).mappings().all()
+
+    # One row per tag of the board (a single one without tags)
+    boards = {}
+    for row in rows:
+        board = boards.setdefault(row["id"], {
+            "id": row["id"],
+            "name": row["name"],
+            "description": row["description"],
+            "image_url": row["image_url"],
+            "cards_count": row["cards_count"],
+            "done_count": row["done_count"],
+            "overdue_count": row["overdue_count"],
+            "tags": [],
+        })
+        if row["tag_id"] is not None:
+            board["tags"].append({
+                "id": row["tag_id"],
+                "name": row["tag_name"],
+                "color": row["tag_color"],
+                "cards_count": row["tag_cards_count"],
+            })
+
+    return list(boards.values())
+
+
+def load_board_changes(db: Session, board: Board, since: int) -> dict:
+    """
+    Build what changed in the board after the `since` version (see `app.versioning`).
+    Only the rows stamped after `since` are read (through the `change_seq` indexes), so the cost
+    follows the size of the changes and not the size of the board.
+    The cursor is the board version read before the rows: a change committed in between is sent
+    again on the next call, which is harmless since applying a change is idempotent.
+    """
+    lists = db.execute(
+        select(List.id, List.name, List.position, List.board_id)
+        .where(List.board_id == board.id, List.change_seq > since)
+        .order_by(List.position.asc(), List.name.asc())
+    ).mappings().all()
+
+    cards = db.execute(
+        select(Card.id, Card.list_id, Card.name, Card.text, Card.is_done,
+               Card.position, Card.due_date)
+        .join(List, List.id == Card.list_id)
+        .where(List.board_id == board.id, Card.change_seq > since)
+        .order_by(*ranking.CARD_ORDER)
+    ).mappings().all()
+
+    tags = db.execute(
+        select(Tag.id, Tag.name, Tag.color)
+        .where(Tag.board_id == board.id, Tag.change_seq > since)
+        .order_by(Tag.id.asc())
+    ).mappings().all()
+
+    # Tags of the changed cards (attach/detach stamp the card)
+    card_tag_rows = db.execute(
+        select(card_tags.c.card_id, Tag.id, Tag.name, Tag.color)
+        .join(Tag, Tag.id == card_tags.c.tag_id)
+        .join(Card, Card.id == card_tags.c.card_id)
+        .join(List, List.id == Card.list_id)
+        .where(List.board_id == board.id, Card.change_seq > since)
+        .order_by(card_tags.c.card_id, Tag.id)
+    ).all()
+
+    tombstones = db.execute(
+        select(Tombstone.entity, Tombstone.entity_id)
+        .where(Tombstone.board_id == board.id, Tombstone.change_seq > since)
+        .order_by(Tombstone.change_seq.asc())
+    ).all()
+
+    # Assemble the changes
+    tags_by_card = defaultdict(list)
+    for card_id, tag_id, tag_name, tag_color in card_tag_rows:
+        tags_by_card[card_id].append(
+            {"id": tag_id, "name": tag_name, "color": tag_color})
+
+    changed_ids = {
+        "list": {board_list["id"] for board_list in lists},
+        "card": {card["id"] for card in cards},
+        "tag": {tag["id"] for tag in tags},
+    }
+
+    # Items deleted from the board and back since the cursor (e.g. a card moved away and back) are not deleted
+    deleted = []
+    for entity, entity_id in tombstones:
+        if entity_id not in changed_ids[entity]:
+            changed_ids[entity].add(entity_id)
+            deleted.append({"entity": entity, "id": entity_id})
+
+    return {
+        "cursor": board.version,
+        "board": board if board.version > since else None,
+        "lists": lists,
+        "cards": [
+            {**card, "tags": tags_by_card.get(card["id"], [])} for card in cards
+        ],
+        "tags": tags,
+        "deleted": deleted,
+    }
+
+
+def remap_list_tags(
+    db: Session,
+    list_id: int,
+    destination_board_id: int,
+    version: int
+) -> list[int]:
+    """
+    Replace the tags of the cards of a list moved to another board by the tags of the destination
+    board with the same name and color. The missing tags are created in the destination board
+    (stamped with `version`).
+    Runs as three set-based statements whatever the number of cards, returns the ids of the created tags.
+    """
+    source_tag = aliased(Tag)
+    destination_tag = aliased(Tag)
+    same_tag = and_(
+        destination_tag.board_id == destination_board_id,
+        destination_tag.name.is_not_distinct_from(source_tag.name),
+        destination_tag.color == source_tag.color
+    )
+    list_card_ids = select(Card.id).where(Card.list_id == list_id)
+
+    # 1. Create the tags missing in the destination board
+    missing_tags = select(
+        source_tag.name, source_tag.color, literal(destination_board_id), literal(version)
+    ).where(
+        source_tag.id.in_(
+            select(card_tags.c.tag_id).where(card_tags.c.card_id.in_(list_card_ids))),
+        source_tag.board_id != destination_board_id,
+        ~exists(select(destination_tag.id).where(same_tag))
+    ).distinct()
+
+    created_tag_ids = db.execute(
+        Tag.__table__.insert()
+        .from_select(["name", "color", "board_id", "change_seq"], missing_tags)
+        .returning(Tag.__table__.c.id)
+    ).scalars().all()
+
+    # 2. Attach the matching tags of the destination board
+    matching_tags = select(
+        card_tags.c.card_id, func.min(destination_tag.id).label("tag_id")
+    ).join(
+        source_tag, source_tag.id == card_tags.c.tag_id
+    ).join(
+        destination_tag, same_tag
+    ).where(
+        card_tags.c.card_id.in_(list_card_ids),
+        source_tag.board_id != destination_board_id
+    ).group_by(card_tags.c.card_id, source_tag.id).subquery()
+
+    db.execute(card_tags.insert().from_select(
+        ["card_id", "tag_id"],
+        select(matching_tags.c.card_id, matching_tags.c.tag_id).distinct()
+    ))
+
+    # 3. Detach the tags of the other boards
+    db.execute(card_tags.delete().where(
+        card_tags.c.card_id.in_(list_card_ids),
+        card_tags.c.tag_id.in_(
+            select(Tag.id).where(Tag.board_id != destination_board_id))
+    ))
+
+    return created_tag_ids
+
+
 # --- CRUD ROUTES FOR BOARDS ---
 @router.get("/{board_id}", response_model=schemas.Board, responses={
     404: {"model": schemas.HTTPError, "description": "Board not found"},
 })
+@single_flight
 def get_board(
     board_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
-    current_user: User = CurrentUserDep
+    current_user: User = CurrentUserDep,
+    load_options: tuple = ResponseLoadDep(Board)
 ):
     """
     Get a board from a given id.
+    Answers `If-None-Match` with 304 when the board did not change (see `app.versioning`).
+    The response is cached until the board changes (see `app.cache`), and identical concurrent
+    requests share one load (see `app.coalescing`).
+    """
+    cached = cached_response(request, current_user.id)
+    if cached:
+        return cached
+
+    version = get_board_version_or_404(board_id, db, current_user)
+    not_modified = conditional_response(
+        request, response, board_etag(board_id, version))
+    if not_modified:
+        return not_modified
+
+    board = get_board_or_404(board_id, db, current_user, load_options)
+    return cache_response(request, response, board, current_user.id, board_scope(board.id))
+
+
+@router.get("/{board_id}/snapshot", response_model=schemas.BoardSnapshot, responses={
+    404: {"model": schemas.HTTPError, "description": "Board not found"},
+})
+def get_board_snapshot(
+    board_id: int,
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db),
+    current_user: User = CurrentUserDep
+):
+    """
+    Get the whole board in a single response: the board, its tags and its ordered lists with their ordered cards (and their tags).
+    Runs a fixed number of queries whatever the size of the board (see `load_board_snapshot`).
+    Answers `If-None-Match` with 304 when the board did not change.
+    """
+    board = get_board_or_404(board_id, db, current_user)
+    not_modified = conditional_response(
+        request, response, board_etag(board.id, board.version))
+    if not_modified:
+        return not_modified
+
+    return load_board_snapshot(db, board)
+
+
+@router.get("/{board_id}/changes", response_model=schemas.BoardChanges, responses={
+    400: {"model": schemas.HTTPError, "description": "Cursor ahead of the board"},
+    404: {"model": schemas.HTTPError, "description": "Board not found"},
+})
+def get_board_changes(
+    board_id: int,
+    since: int = Query(0, ge=0, description="Cursor of the last sync (snapshot or changes)"),
+    db: Session = Depends(get_db),
+    current_user: User = CurrentUserDep
+):
+    """
+    Get what changed in the board after the `since` cursor, and the new cursor to use on the next call.
+    `since=0` returns the whole board (lists, cards and tags).
+    Reads only the changed rows (see `load_board_changes`).
     """
-    return get_board_or_404(board_id, db, current_user)
+    board = get_board_or_404(board_id, db, current_user)
+
+    if since > board.version:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Cursor {since} is ahead of the board."
+        )
+
+    return load_board_changes(db, board, since)
 
 
 @router.post("", response_model=schemas.Board, status_code=status.HTTP_201_CREATED)
@@ -170,25 +636,121 @@ def create_board(
     tags = [Tag(color=color, board=board) for color in colors]
 
     db.add_all([board, *tags])
+    queue_invalidation(db, boards_scope(current_user.id))
+    db.commit()
+    db.refresh(board)
+    return board
+
+
+@router.post(":import", response_model=schemas.Board, status_code=status.HTTP_201_CREATED, responses={
+    400: {"model": schemas.HTTPError, "description": "A card has a tag not in the import"},
+    422: {"description": "Invalid line"},
+})
+def import_board(
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = CurrentUserDep
+):
+    """
+    Create a board with its tags, lists and cards from an NDJSON body (`application/x-ndjson`):
+    - First line: the board with its tags (`BoardImport`). Each tag has a `ref`.
+    - Next lines: one list per line, in order, with its cards in order (`ListImport`).
+      The cards attach tags by their `ref`.
+    The body is parsed as it is received and the cards inserted by chunks (see `app.bulk`).
+    """
+    lines = bulk.iter_ndjson(request, schemas.BoardImport, schemas.ListImport)
+    board_data = next(lines, None)
+    if board_data is None:
+        raise RequestValidationError([{
+            "type": "missing", "loc": ("body", 1), "msg": "The board is missing", "input": None}])
+
+    board = Board(**board_data.model_dump(exclude={"tags"}), user=current_user)
+    tags = {tag_data.ref: Tag(**tag_data.model_dump(exclude={"ref"}), board=board)
+            for tag_data in board_data.tags}
+    db.add_all([board, *tags.values()])
+    db.flush()
+    tag_ids = {ref: tag.id for ref, tag in tags.items()}
+
+    def card_tag_ids(card: schemas.CardImport) -> list[int]:
+        unknown = [ref for ref in card.tags if ref not in tag_ids]
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown tag ref: {', '.join(unknown)}"
+            )
+        return [tag_ids[ref] for ref in card.tags]
+
+    lists_count = cards_count = 0
+    for list_data in lines:
+        lists_count += 1
+        new_list = List(
+            name=list_data.name,
+            position=lists_count,
+            board=board,
+            cards_count=len(list_data.cards),
+            done_count=sum(card.is_done for card in list_data.cards),
+        )
+        db.add(new_list)
+        db.flush()
+
+        bulk.insert_cards(db, new_list.id, list_data.cards, 1, board.version, card_tag_ids)
+        cards_count += new_list.cards_count
+
+    # New board: the counters are set, not incremented (see `app.counters`)
+    board.lists_count, board.cards_count = lists_count, cards_count
+    queue_invalidation(db, boards_scope(current_user.id))
     db.commit()
     db.refresh(board)
     return board
 
 
-@router.get("", response_model=list[common_schemas.BoardSubschema])
+@router.get("", response_model=list[common_schemas.BoardSubschema] | list[schemas.BoardStats])
 def get_user_boards(
+    request: Request,
+    response: Response,
+    stats: bool = Query(
+        False, description="Add the card, done and overdue counts and the tag usage of each board"),
+    page: Page = PageDep,
     db: Session = Depends(get_db),
     current_user: User = CurrentUserDep
 ):
     """
-    Get all the boards of the authenticated user.
+    Get all the boards of the authenticated user, by id.
+    Answers `If-None-Match` with 304 when none of the boards changed (and none was added or removed).
+    Paginated with `limit` and `cursor` (see `app.pagination`).
+
+    The response is cached until one of the boards changes (or one is added or removed, see `app.cache`).
+
+    With `stats=true` every board comes with the statistics of its cards, computed in a single
+    query (see `load_boards_stats`). These are not cached (neither with an ETag nor in the response
+    cache): the overdue count changes with the time, without any change of the boards.
     """
-    boards = db.query(Board).filter(
+    if stats:
+        return take_page(response, load_boards_stats(db, current_user.id, page),
+                         page, lambda board: (board["id"],))
+
+    cached = cached_response(request, current_user.id)
+    if cached:
+        return cached
+
+    versions = db.query(Board.id, Board.version).filter(
         Board.user_id == current_user.id,
         Board.is_inbox == False
-    ).all()
+    ).order_by(Board.id.asc()).all()
+    not_modified = conditional_response(
+        request, response, boards_etag(versions))
+    if not_modified:
+        return not_modified
+
+    # Plain rows: the response has only the columns of the boards
+    boards = db.execute(paginate(
+        select(Board.id, Board.name, Board.description, Board.image_url)
+        .where(Board.user_id == current_user.id, Board.is_inbox == False),
+        (Board.id,), page
+    )).mappings().all()
 
-    return boards
+    boards = take_page(response, boards, page, lambda board: (board["id"],))
+    return cache_response(request, response, boards, current_user.id, boards_scope(current_user.id))
 
 
 @router.patch("/{board_id}", response_model=schemas.Board, responses={
@@ -219,6 +781,7 @@ def update_board(
     for key, value in update_data.items():
         setattr(board, key, value)
 
+    record_change(db, board.id, board)
     db.add(board)
     db.commit()
     db.refresh(board)
@@ -232,12 +795,17 @@ def update_board(
 })
 def delete_board(
     board_id: int,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = CurrentUserDep
 ):
     """
     Deletes an existing board.
     Only the owner of the board can delete it.
+
+    Its lists, cards and tags are deleted by the database (ON DELETE CASCADE), without loading them.
+    With `BOARD_DELETE_MODE="purge"` very large boards are hidden right away and deleted
+    in the background (see `app.purge`).
     """
 
     board = get_board_or_404(board_id, db, current_user)
@@ -248,6 +816,15 @@ def delete_board(
             detail="The inbox cannot be deleted."
         )
 
+    queue_invalidation(db, board_scope(board.id), boards_scope(current_user.id))
+
+    if purge.should_purge(db, board):
+        purge.soft_delete_board(db, board)
+        db.commit()
+        background_tasks.add_task(
+            purge.purge_board_task, board.id, db.get_bind())
+        return
+
     db.delete(board)
     db.commit()
 
@@ -261,20 +838,33 @@ def delete_board(
 def get_list(
     board_id: int,
     list_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
-    current_user: User = CurrentUserDep
+    current_user: User = CurrentUserDep,
+    load_options: tuple = ResponseLoadDep(List)
 ):
     """
     Get a list from a given id.
     Only the owner of the board with the given `board_id` can get it.
+    Answers `If-None-Match` with 304 when the board did not change.
     """
-    return get_list_or_404(board_id, list_id, db, current_user)
+    version = get_board_version_or_404(board_id, db, current_user)
+    not_modified = conditional_response(
+        request, response, board_etag(board_id, version))
+    if not_modified:
+        return not_modified
+
+    board_list = get_list_or_404(board_id, list_id, db, current_user, load_options)
+    return serialize_response(request, response, board_list)
 
 
 @router.post("/{board_id}/lists", response_model=schemas.List, status_code=status.HTTP_201_CREATED, responses={
     404: {"model": schemas.HTTPError, "description": "Board not found"},
     403: {"model": schemas.HTTPError, "description": "Tryed to create list in the Inbox"},
+    409: {"model": schemas.HTTPError, "description": "Conflicting concurrent changes, try again"},
 })
+@retry_on_conflict
 def create_list(
     board_id: int,
     list_data: schemas.ListCreate,
@@ -294,18 +884,18 @@ def create_list(
             detail="You cannot create a new list in the Inbox."
         )
 
-    max_position = db.query(func.max(List.position)).filter(
-        List.board_id == board_id
-    ).scalar()
-
-    position = (max_position or 0) + 1
+    # The bottom of the board is read once the board is locked (see `db.locking`)
+    lock_boards(db, board_id)
+    db.refresh(board, ["lists_count"])
 
     new_list = List(
         **list_data.model_dump(),
         board=board,
-        position=position
+        position=board.lists_count + 1
     )
 
+    update_counters(db, board_lists=[(board.id, 1)])
+    record_change(db, board.id, new_list)
     db.add(new_list)
     db.commit()
     db.refresh(new_list)
@@ -315,17 +905,37 @@ def create_list(
 @router.get("/{board_id}/lists", response_model=list[schemas.List], responses={
     404: {"model": schemas.HTTPError, "description": "Board not found"},
 })
+@single_flight
 def get_board_lists(
     board_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
-    current_user: User = CurrentUserDep
+    current_user: User = CurrentUserDep,
+    load_options: tuple = ResponseLoadDep(List)
 ):
     """
     Get all the lists of the board.
-    Only the owner of the board with the given `board_id` can get it
+    Only the owner of the board with the given `board_id` can get it.
+    Answers `If-None-Match` with 304 when the board did not change.
+    The response is cached until the board changes (see `app.cache`), and identical concurrent
+    requests share one load (see `app.coalescing`).
     """
+    cached = cached_response(request, current_user.id)
+    if cached:
+        return cached
+
     board = get_board_or_404(board_id, db, current_user)
-    return board.lists
+    not_modified = conditional_response(
+        request, response, board_etag(board.id, board.version))
+    if not_modified:
+        return not_modified
+
+    lists = db.query(List).options(*load_options).filter(
+        List.board_id == board.id
+    ).order_by(List.position.asc(), List.name.asc()).all()
+
+    return cache_response(request, response, lists, current_user.id, board_scope(board.id))
 
 
 @router.patch("/{board_id}/lists/{list_id}", response_model=schemas.List, responses={
@@ -358,6 +968,7 @@ def update_list(
     for key, value in update_data.items():
         setattr(list_to_update, key, value)
 
+    record_change(db, board.id, list_to_update)
     db.add(list_to_update)
     db.commit()
     db.refresh(list_to_update)
@@ -365,10 +976,143 @@ def update_list(
     return list_to_update
 
 
+@router.post("/{board_id}/lists/{list_id}/move", response_model=schemas.List, responses={
+    400: {"model": schemas.HTTPError, "description": "Position out of the range"},
+    403: {"model": schemas.HTTPError, "description": "Tryed to move the inbox list or to the Inbox"},
+    404: {"model": schemas.HTTPError, "description": "List or destination Board not found"},
+    409: {"model": schemas.HTTPError, "description": "Conflicting concurrent changes, try again"},
+})
+@retry_on_conflict
+def move_list(
+    board_id: int,
+    list_id: int,
+    move_data: schemas.ListMove,
+    db: Session = Depends(get_db),
+    current_user: User = CurrentUserDep,
+    load_options: tuple = ResponseLoadDep(List)
+):
+    """
+    Move a list to another position of its board, or to another board of the user with its cards.
+    The list is placed at `destination_list_position` (at the end of the board if not specified).
+    Only the owner of both boards can move it.
+
+    The other lists are renumbered with a single set-based UPDATE. When the list changes of board, the
+    tags of its cards are replaced by the tags of the destination board with the same name and color
+    (the missing ones are created), in bulk (see `remap_list_tags`).
+    """
+    board_list = get_list_or_404(board_id, list_id, db, current_user)
+
+    if board_list.board.is_inbox:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="The inbox list cannot be moved."
+        )
+
+    destination_board_id = move_data.destination_board_id or board_id
+    if destination_board_id != board_id:
+        destination_board = get_board_or_404(
+            destination_board_id, db, current_user)
+
+        if destination_board.is_inbox:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="You cannot move a list to the Inbox."
+            )
+
+    # Positions are read once the list and the boards are locked (see `db.locking`)
+    lock_lists(db, list_id)
+    lock_boards(db, board_id, destination_board_id)
+    db.refresh(board_list, ["board_id", "cards_count"])
+    if board_list.board_id != board_id:
+        raise ConcurrentChange()
+
+    # Lists of the destination board that stay in it
+    remaining_count = db.scalar(
+        select(Board.lists_count).where(Board.id == destination_board_id)
+    ) - (destination_board_id == board_id)
+
+    new_position = move_data.destination_list_position or remaining_count + 1
+
+    if new_position < 1 or new_position > remaining_count + 1:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Position out of the range"
+        )
+
+    versions = record_list_move(
+        db, board_list, board_id, destination_board_id)
+
+    # 1. Renumber the lists left in the board and leave space in the destination board
+    ranked = select(
+        List.id,
+        List.board_id,
+        func.row_number().over(partition_by=List.board_id,
+                               order_by=LIST_ORDER).label("rank")
+    ).where(
+        List.board_id.in_(versions), List.id != list_id
+    ).subquery()
+
+    renumbered_position = case(
+        (and_(ranked.c.board_id == destination_board_id, ranked.c.rank >= new_position),
+         ranked.c.rank + 1),
+        else_=ranked.c.rank
+    )
+    shifted_lists = db.execute(
+        update(List)
+        .where(List.id == ranked.c.id, List.position != renumbered_position)
+        .values({
+            List.position: renumbered_position,
+            List.change_seq: case(versions, value=ranked.c.board_id)
+        })
+        .returning(List.id, List.board_id)
+        .execution_options(synchronize_session=False)
+    ).all()
+
+    for shifted_board_id, version in versions.items():
+        record_bulk_change(db, shifted_board_id, version, "list", [
+            shifted_id for shifted_id, list_board_id in shifted_lists if list_board_id == shifted_board_id
+        ])
+
+    # 2. Move the cards along with the list
+    if destination_board_id != board_id:
+        destination_version = versions[destination_board_id]
+
+        created_tag_ids = remap_list_tags(
+            db, list_id, destination_board_id, destination_version)
+        record_bulk_change(db, destination_board_id,
+                           destination_version, "tag", created_tag_ids)
+
+        card_ids = db.execute(
+            update(Card)
+            .where(Card.list_id == list_id)
+            .values({Card.change_seq: destination_version})
+            .returning(Card.id)
+            .execution_options(synchronize_session=False)
+        ).scalars().all()
+        record_bulk_change(db, destination_board_id,
+                           destination_version, "card", card_ids)
+
+        update_counters(
+            db,
+            board_lists=[(board_id, -1), (destination_board_id, 1)],
+            board_cards=[(board_id, -board_list.cards_count),
+                         (destination_board_id, board_list.cards_count)]
+        )
+
+    board_list.board_id = destination_board_id
+    board_list.position = new_position
+
+    db.commit()
+
+    return get_list_or_404(destination_board_id, list_id, db, current_user, load_options)
+
+
 @router.delete("/{board_id}/lists/{list_id}", status_code=status.HTTP_204_NO_CONTENT, responses={
     404: {"model": schemas.HTTPError, "description": "List not found"},
     403: {"model": schemas.HTTPError, "description": "Tryed to delete inbox list"},
+    409: {"model": schemas.HTTPError, "description": "Conflicting concurrent changes, try again"},
 })
+@retry_on_conflict
 def delete_list(
     board_id: int,
     list_id: int,
@@ -376,8 +1120,9 @@ def delete_list(
     current_user: User = CurrentUserDep
 ):
     """
-    Deletes an existing list.
+    Deletes an existing list, with its cards.
     Only the owner of the board with the given `board_id` can delete it.
+    The next lists of the board move up one position.
     """
 
     list_to_delete = get_list_or_404(board_id, list_id, db, current_user)
@@ -389,6 +1134,27 @@ def delete_list(
             detail="The inbox list cannot be deleted."
         )
 
+    # Positions are read once the list and the board are locked (see `db.locking`)
+    lock_lists(db, list_id)
+    lock_boards(db, board_id)
+    db.refresh(list_to_delete, ["board_id", "position", "cards_count"])
+    if list_to_delete.board_id != board_id:
+        raise ConcurrentChange()
+
+    version = record_deletion(db, board.id, "list", list_to_delete.id)
+
+    # Close the gap left by the list
+    shifted_list_ids = db.execute(
+        update(List)
+        .where(List.board_id == board_id, List.position > list_to_delete.position)
+        .values({List.position: List.position - 1, List.change_seq: version})
+        .returning(List.id)
+        .execution_options(synchronize_session=False)
+    ).scalars().all()
+    record_bulk_change(db, board_id, version, "list", shifted_list_ids)
+
+    update_counters(db, board_lists=[(board_id, -1)],
+                    board_cards=[(board_id, -list_to_delete.cards_count)])
     db.delete(list_to_delete)
     db.commit()
 
@@ -403,20 +1169,26 @@ def get_card(
     board_id: int,
     list_id: int,
     card_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
-    current_user: User = CurrentUserDep
+    current_user: User = CurrentUserDep,
+    load_options: tuple = ResponseLoadDep(Card)
 ):
     """
     Get a card from a given id.
     Only the owner of the board with the given `board_id` can get it.
     """
-    return get_card_or_404(board_id, list_id, card_id, db, current_user)
+    card = get_card_or_404(board_id, list_id, card_id, db, current_user, load_options)
+    return serialize_response(request, response, card)
 
 
 @router.post("/{board_id}/lists/{list_id}/cards", response_model=schemas.Card,
              status_code=status.HTTP_201_CREATED, responses={
-                 404: {"model": schemas.HTTPError, "description": "List not found"}
+                 404: {"model": schemas.HTTPError, "description": "List not found"},
+                 409: {"model": schemas.HTTPError, "description": "Conflicting concurrent changes, try again"}
              })
+@retry_on_conflict
 def create_card(
     board_id: int,
     list_id: int,
@@ -430,45 +1202,111 @@ def create_card(
     Only the owner of the board with the given `board_id` can add a new card.
     """
     board_list = get_list_or_404(board_id, list_id, db, current_user)
-
-    max_position = db.query(func.max(Card.position)).filter(
-        Card.list_id == list_id
-    ).scalar()
-
-    position = (max_position or 0) + 1
+    # The bottom of the list is read once the list is locked (see `db.locking`)
+    lock_lists(db, list_id)
+    db.refresh(board_list, ["cards_count"])
 
     new_card = Card(
         **card_data.model_dump(),
         list=board_list,
-        position=position,
+        position=ranking.next_rank(db, board_list),
     )
 
+    update_counters(db, list_cards=[(list_id, 1)],
+                    board_cards=[(board_list.board_id, 1)])
+    record_change(db, board_list.board_id, new_card)
     db.add(new_card)
     db.commit()
     db.refresh(new_card)
     return new_card
 
 
+@router.post("/{board_id}/lists/{list_id}/cards:bulk", response_model=schemas.CardsBulkResult,
+             status_code=status.HTTP_201_CREATED, responses={
+                 404: {"model": schemas.HTTPError, "description": "List or tag not found"},
+                 422: {"description": "Invalid line"},
+             })
+def bulk_create_cards(
+    board_id: int,
+    list_id: int,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = CurrentUserDep
+):
+    """
+    Create many cards at the bottom of the list, in order, from an NDJSON body (`application/x-ndjson`,
+    one `CardBulkCreate` per line). Only the owner of the board with the given `board_id` can add them.
+    The body is parsed as it is received and the cards inserted by chunks (see `app.bulk`), in one
+    transaction: an invalid line creates no card.
+    The list is locked for the whole request, so the route is not retried on conflicts.
+    """
+    board_list = get_list_or_404(board_id, list_id, db, current_user)
+    # The bottom of the list is read once the list is locked (see `db.locking`)
+    lock_lists(db, list_id)
+    db.refresh(board_list, ["cards_count"])
+    board_tag_ids = set(db.scalars(select(Tag.id).where(Tag.board_id == board_list.board_id)))
+
+    def card_tag_ids(card: schemas.CardBulkCreate) -> list[int]:
+        for tag_id in card.tag_ids:
+            if tag_id not in board_tag_ids:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Tag with id {tag_id} not found."
+                )
+        return card.tag_ids
+
+    # The list is changed too (counters), the new cards are sent by `GET /boards/{id}/changes`
+    version = record_change(db, board_list.board_id, board_list)
+    created, done = bulk.insert_cards(
+        db, list_id, bulk.iter_ndjson(request, schemas.CardBulkCreate),
+        ranking.next_rank(db, board_list), version, card_tag_ids)
+
+    update_counters(db, list_cards=[(list_id, created)], list_done=[(list_id, done)],
+                    board_cards=[(board_list.board_id, created)])
+    cards_count = board_list.cards_count + created
+    db.commit()
+
+    return {"list_id": list_id, "created": created, "cards_count": cards_count}
+
+
 @router.get("/{board_id}/lists/{list_id}/cards", response_model=list[schemas.Card], responses={
     404: {"model": schemas.HTTPError, "description": "List not found"},
 })
 def get_list_cards(
     board_id: int,
     list_id: int,
+    request: Request,
+    response: Response,
+    page: Page = PageDep,
     db: Session = Depends(get_db),
-    current_user: User = CurrentUserDep
+    current_user: User = CurrentUserDep,
+    load_options: tuple = ResponseLoadDep(Card)
 ):
     """
-    Get all the cards of the list.
-    Only the owner of the board with the given `board_id` can get it
+    Get all the cards of the list, in order.
+    Only the owner of the board with the given `board_id` can get it.
+    Answers `If-None-Match` with 304 when the board did not change.
+    Paginated with `limit` and `cursor` (see `app.pagination`), keyed on the position.
     """
     board_list = get_list_or_404(board_id, list_id, db, current_user)
-    return board_list.cards
+    not_modified = conditional_response(
+        request, response, board_etag(board_id, board_list.board.version))
+    if not_modified:
+        return not_modified
+
+    cards = paginate(db.query(Card).options(*load_options).filter(
+        Card.list_id == board_list.id
+    ), ranking.CARD_KEY, page).all()
+
+    cards = take_page(response, cards, page, lambda card: (card.position, card.name, card.id))
+    return serialize_response(request, response, cards)
 
 
 @router.patch("/{board_id}/lists/{list_id}/cards/{card_id}", response_model=schemas.Card, responses={
     404: {"model": schemas.HTTPError, "description": "Card not found"},
+    409: {"model": schemas.HTTPError, "description": "Conflicting concurrent changes, try again"},
 })
+@retry_on_conflict
 def update_card(
     board_id: int,
     list_id: int,
@@ -487,9 +1325,19 @@ def update_card(
 
     update_data = card_data.model_dump(exclude_unset=True)
 
+    if "is_done" in update_data:
+        # The done counter of the list follows the flag (see `app.counters`)
+        lock_card_lists(db, {card_id: list_id})
+        db.refresh(card_to_update, ["is_done"])
+
+        if update_data["is_done"] != card_to_update.is_done:
+            update_counters(db, list_done=[
+                (list_id, 1 if update_data["is_done"] else -1)])
+
     for key, value in update_data.items():
         setattr(card_to_update, key, value)
 
+    record_change(db, board_id, card_to_update)
     db.add(card_to_update)
     db.commit()
     db.refresh(card_to_update)
@@ -499,7 +1347,9 @@ def update_card(
 
 @router.delete("/{board_id}/lists/{list_id}/cards/{card_id}", status_code=status.HTTP_204_NO_CONTENT, responses={
     404: {"model": schemas.HTTPError, "description": "Card not found"},
+    409: {"model": schemas.HTTPError, "description": "Conflicting concurrent changes, try again"},
 })
+@retry_on_conflict
 def delete_card(
     board_id: int,
     list_id: int,
@@ -510,11 +1360,35 @@ def delete_card(
     """
     Deletes an existing card.
     Only the owner of the board with the given `board_id` can delete it.
+    In "integer" mode the next cards of the list move up one position.
     """
 
     card_to_delete = get_card_or_404(
         board_id, list_id, card_id, db, current_user)
 
+    # Positions are read once the list is locked (see `db.locking`)
+    lock_card_lists(db, {card_id: list_id})
+    db.refresh(card_to_delete, ["position", "is_done"])
+
+    version = record_deletion(db, board_id, "card", card_to_delete.id)
+
+    if settings.CARD_POSITION_MODE == "integer":
+        # Close the gap left by the card
+        shifted_cards = db.execute(
+            update(Card)
+            .where(Card.list_id == list_id, Card.position > card_to_delete.position)
+            .values({Card.position: Card.position - 1, Card.change_seq: version})
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if shifted_cards:
+            record_reorder(db, board_id, version, list_id)
+
+    update_counters(
+        db,
+        list_cards=[(list_id, -1)],
+        list_done=[(list_id, -1)] if card_to_delete.is_done else [],
+        board_cards=[(board_id, -1)]
+    )
     db.delete(card_to_delete)
     db.commit()
 
@@ -528,14 +1402,38 @@ def delete_card(
 def get_tag(
     board_id: int,
     tag_id: int,
+    response: Response,
+    page: Page = PageDep,
     db: Session = Depends(get_db),
-    current_user: User = CurrentUserDep
+    current_user: User = CurrentUserDep,
+    load_options: tuple = ResponseLoadDep(Tag)
 ):
     """
-    Get a tag from a given id.
+    Get a tag from a given id (with its cards with `?expand=cards`).
     Only the owner of the board with the given `board_id` can get it.
+    The cards are paginated with `limit` and `cursor` (see `app.pagination`), by id.
     """
-    return get_tag_or_404(board_id, tag_id, db, current_user)
+    expansion = requested_expansion.get()
+    if page == Page() or "cards" not in expansion:
+        return get_tag_or_404(board_id, tag_id, db, current_user, load_options)
+
+    tag = get_tag_or_404(board_id, tag_id, db, current_user, eager_load_options(
+        Tag, schemas.Tag, skip=("cards",), expansion=expansion))
+
+    # The page is read from the (tag_id, card_id) index of the association table
+    cards = paginate(
+        db.query(Card).options(*eager_load_options(
+            Card, common_schemas.CardSubschema, expansion=expansion))
+        .join(card_tags, card_tags.c.card_id == Card.id)
+        .filter(card_tags.c.tag_id == tag.id),
+        (card_tags.c.card_id,), page
+    ).all()
+
+    # Loaded as is, the collection is not seen as changed
+    set_committed_value(tag, "cards", take_page(
+        response, cards, page, lambda card: (card.id,)))
+
+    return tag
 
 
 @router.post("/{board_id}/tags", response_model=schemas.Tag, status_code=status.HTTP_201_CREATED, responses={
@@ -566,6 +1464,7 @@ def create_tag(
         board=board
     )
 
+    record_change(db, board.id, new_tag)
     db.add(new_tag)
     db.commit()
     db.refresh(new_tag)
@@ -577,15 +1476,28 @@ def create_tag(
 })
 def get_board_tags(
     board_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
-    current_user: User = CurrentUserDep
+    current_user: User = CurrentUserDep,
+    load_options: tuple = ResponseLoadDep(Tag)
 ):
     """
     Get all the tags of the board.
-    Only the owner of the board with the given `board_id` can get it
+    Only the owner of the board with the given `board_id` can get it.
+    The response is cached until the board changes (see `app.cache`).
     """
+    cached = cached_response(request, current_user.id)
+    if cached:
+        return cached
+
     board = get_board_or_404(board_id, db, current_user)
-    return board.tags
+
+    tags = db.query(Tag).options(*load_options).filter(
+        Tag.board_id == board.id
+    ).order_by(Tag.id.asc()).all()
+
+    return cache_response(request, response, tags, current_user.id, board_scope(board.id))
 
 
 @router.patch("/{board_id}/tags/{tag_id}", response_model=schemas.Tag, responses={
@@ -609,6 +1521,7 @@ def update_tag(
     for key, value in update_data.items():
         setattr(tag_to_update, key, value or None)
 
+    record_change(db, board_id, tag_to_update)
     db.add(tag_to_update)
     db.commit()
     db.refresh(tag_to_update)
@@ -632,6 +1545,7 @@ def delete_tag(
 
     tag_to_delete = get_tag_or_404(board_id, tag_id, db, current_user)
 
+    record_deletion(db, board_id, "tag", tag_to_delete.id)
     db.delete(tag_to_delete)
     db.commit()
 
@@ -1,11 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import update, and_, func
-from sqlalchemy.orm import Session, joinedload
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
+from sqlalchemy import update, and_, case, func, select
+from sqlalchemy.orm import Session, joinedload, contains_eager, aliased
 
 from ..security import CurrentUserDep
 from ..models import User, Card, List, Board, Tag
 from ..db.database import get_db
+from ..db.loading import ResponseLoadDep
+from ..db.locking import lock_card_lists, retry_on_conflict
+from ..core.config import settings
 from .. import schemas
+from .. import ranking
+from ..counters import count_card_moves
+from ..versioning import record_change, record_move, record_bulk_move, record_reorder
 
 router = APIRouter(
     prefix="/cards",
@@ -13,57 +19,78 @@ router = APIRouter(
 )
 
 
+# --- HELPER FUNCTIONS ---
+def load_card(db: Session, card_id: int, options: tuple = ()) -> Card:
+    """
+    Reload a card after a commit, applying the loader options of the response (see `db.loading`).
+    """
+    return db.query(Card).options(*options).populate_existing().filter(
+        Card.id == card_id
+    ).one()
+
+
+# --- ROUTES ---
 @router.post("/{card_id}/move", response_model=schemas.Card, responses={
     400: {"model": schemas.HTTPError, "description": "Position out of the range"},
     403: {"model": schemas.HTTPError, "description": "Trying to move a card without owning the card or list"},
     404: {"model": schemas.HTTPError, "description": "Card or List not found"},
+    409: {"model": schemas.HTTPError, "description": "Conflicting concurrent moves, try again"},
 })
+@retry_on_conflict
 def move_card(
     card_id: int,
     move_data: schemas.CardMove,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
-    current_user: User = CurrentUserDep
+    current_user: User = CurrentUserDep,
+    load_options: tuple = ResponseLoadDep(Card)
 ):
     """
     Move a card between lists (or the same list, within the same board or to another).
     Also change the position of the card with (place the card at the bottom of the list if not specified).
     Verify that the current user owns both the source and destination lists.
+
+    With `CARD_POSITION_MODE="fractional"` only the moved card is written (see `app.ranking`).
+    Concurrent moves on the same lists are serialized (see `db.locking`).
     """
-    card = db.query(Card).options(
-        joinedload(Card.list)
-        .joinedload(List.board)
-        .joinedload(Board.user)
+    # Card, destination list and their owners are resolved with a single query
+    destination_list_alias = aliased(List)
+    destination_board_alias = aliased(Board)
+
+    row = db.query(
+        Card, Board.user_id, destination_list_alias, destination_board_alias.user_id
+    ).join(Card.list).join(List.board).outerjoin(
+        destination_list_alias,
+        destination_list_alias.id == move_data.destination_list_id
+    ).outerjoin(
+        destination_board_alias,
+        destination_board_alias.id == destination_list_alias.board_id
+    ).options(
+        contains_eager(Card.list)
     ).filter(Card.id == card_id).first()
 
     # Check card and list
-    if not card:
+    if not row:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Card not found"
         )
 
-    card_owner: User = card.list.board.user
+    card, card_owner_id, destination_list, destination_list_owner_id = row
 
-    if card_owner.id != current_user.id:
+    if card_owner_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You cannot move this card."
         )
 
-    destination_list = db.query(List).options(
-        joinedload(List.board)
-        .joinedload(Board.user)
-    ).filter(List.id == move_data.destination_list_id).first()
-
     if not destination_list:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="List not found"
         )
 
-    destination_list_owner = destination_list.board.user
-
-    if destination_list_owner.id != current_user.id:
+    if destination_list_owner_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You cannot move the card to the destination list."
@@ -71,12 +98,51 @@ def move_card(
 
     # === Move the card & Fix position ===
     origin_list_id = card.list_id
+    origin_board_id = card.list.board_id
     dest_list_id = destination_list.id
+
+    # Positions are read once the lists are locked
+    lock_card_lists(db, {card.id: origin_list_id}, dest_list_id)
+    db.refresh(card, ["position"])
+
+    db.refresh(destination_list, ["cards_count"])
+
     actual_card_position = card.position
     new_card_position = move_data.destination_list_position
+    dest_list_count = destination_list.cards_count
+
+    # --- Fractional ranking: take a rank between the new neighbours ---
+    if settings.CARD_POSITION_MODE == "fractional":
+        last_slot = dest_list_count if origin_list_id == dest_list_id else dest_list_count + 1
+
+        if not new_card_position:
+            new_card_position = last_slot
+
+        if new_card_position < 1 or new_card_position > last_slot:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Position out of the range"
+            )
 
-    dest_list_count = db.query(func.count(Card.id)).filter(
-        Card.list_id == dest_list_id).scalar() or 0
+        rank, dense = ranking.rank_for_slot(
+            db, dest_list_id, new_card_position, exclude_card_ids=(card.id,))
+
+        card.list_id = dest_list_id
+        card.position = rank
+
+        record_move(db, card, origin_board_id, destination_list.board_id)
+        count_card_moves(db, [(origin_list_id, origin_board_id, card.is_done)],
+                         dest_list_id, destination_list.board_id)
+        db.add(card)
+        db.commit()
+        card = load_card(db, card.id, load_options)
+
+        # The neighbours are getting too close, spread the list again once the move is done
+        if dense:
+            background_tasks.add_task(
+                ranking.rebalance_list_task, dest_list_id, db.get_bind())
+
+        return card
 
     # --- Case 1: Reorder in the same list ---
     if origin_list_id == dest_list_id:
@@ -92,6 +158,9 @@ def move_card(
                 detail="Position out of the range"
             )
 
+        _, version = record_move(
+            db, card, origin_board_id, destination_list.board_id)
+
         # 1. Add or substract one to the range affected by the ordering according to the destination of the new position
         db.execute(
             update(Card)
@@ -100,8 +169,12 @@ def move_card(
                 Card.position >= min(actual_card_position, new_card_position),
                 Card.position <= max(actual_card_position, new_card_position)
             ))
-            .values({Card.position: Card.position - 1 if new_card_position > actual_card_position else Card.position + 1})
+            .values({
+                Card.position: Card.position - 1 if new_card_position > actual_card_position else Card.position + 1,
+                Card.change_seq: version
+            })
         )
+        record_reorder(db, destination_list.board_id, version, dest_list_id)
 
     # --- Case 2: Reorder in other list ---
     else:
@@ -114,6 +187,9 @@ def move_card(
                 detail="Position out of the range"
             )
 
+        origin_version, destination_version = record_move(
+            db, card, origin_board_id, destination_list.board_id)
+
         # 1. Fill in the space left by the card
         db.execute(
             update(Card)
@@ -121,7 +197,7 @@ def move_card(
                 Card.list_id == origin_list_id,
                 Card.position > actual_card_position
             ))
-            .values({Card.position: Card.position - 1})
+            .values({Card.position: Card.position - 1, Card.change_seq: origin_version})
         )
         # 2. Leave space for the new card
         db.execute(
@@ -130,20 +206,186 @@ def move_card(
                 Card.list_id == dest_list_id,
                 Card.position >= new_card_position
             ))
-            .values({Card.position: Card.position + 1})
+            .values({Card.position: Card.position + 1, Card.change_seq: destination_version})
         )
+        record_reorder(db, origin_board_id, origin_version, origin_list_id)
+        record_reorder(db, destination_list.board_id,
+                       destination_version, dest_list_id)
         # 3. Assign the new list_id
         card.list_id = dest_list_id
+        count_card_moves(db, [(origin_list_id, origin_board_id, card.is_done)],
+                         dest_list_id, destination_list.board_id)
 
     card.position = new_card_position
 
     db.add(card)
     db.commit()
-    db.refresh(card)
+    card = load_card(db, card.id, load_options)
 
     return card
 
 
+@router.post("/move", response_model=list[schemas.Card], responses={
+    400: {"model": schemas.HTTPError, "description": "Position out of the range"},
+    403: {"model": schemas.HTTPError, "description": "Trying to move cards without owning the cards or list"},
+    404: {"model": schemas.HTTPError, "description": "Cards or List not found"},
+    409: {"model": schemas.HTTPError, "description": "Conflicting concurrent moves, try again"},
+})
+@retry_on_conflict
+def move_cards(
+    move_data: schemas.CardsMove,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_user: User = CurrentUserDep,
+    load_options: tuple = ResponseLoadDep(Card)
+):
+    """
+    Move several cards at once (multi-card drag & drop), from any lists of the user.
+    The cards are placed together at `destination_list_position` of the destination list (at the bottom if
+    not specified), in the order of `card_ids`. The position counts the cards of the list that are not moved.
+    Returns the moved cards in their new order.
+
+    The move is one transaction with set-based statements, whatever the number of cards:
+    - "integer" mode: one UPDATE renumbers the cards left in the source lists and shifts the destination
+      list, one UPDATE places the moved cards.
+    - "fractional" mode: only the moved cards are written, with ranks spread between their new neighbours.
+    Concurrent moves on the same lists are serialized (see `db.locking`).
+    """
+    card_ids = list(dict.fromkeys(move_data.card_ids))
+
+    # Cards, destination list and their owners are resolved with a single query
+    destination_list_alias = aliased(List)
+    destination_board_alias = aliased(Board)
+
+    rows = db.query(
+        Card.id, Card.list_id, List.board_id, Board.user_id,
+        destination_list_alias.board_id, destination_board_alias.user_id, Card.is_done
+    ).join(Card.list).join(List.board).outerjoin(
+        destination_list_alias,
+        destination_list_alias.id == move_data.destination_list_id
+    ).outerjoin(
+        destination_board_alias,
+        destination_board_alias.id == destination_list_alias.board_id
+    ).filter(Card.id.in_(card_ids)).all()
+
+    # Check cards and list
+    if len(rows) != len(card_ids):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Card not found"
+        )
+
+    if any(card_owner_id != current_user.id for _, _, _, card_owner_id, _, _, _ in rows):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You cannot move these cards."
+        )
+
+    _, _, _, _, destination_board_id, destination_list_owner_id, _ = rows[0]
+
+    if destination_board_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="List not found"
+        )
+
+    if destination_list_owner_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You cannot move the cards to the destination list."
+        )
+
+    # === Move the cards & Fix positions ===
+    dest_list_id = move_data.destination_list_id
+    board_id_by_list = {list_id: board_id for _, list_id, board_id, _, _, _, _ in rows}
+    board_id_by_list[dest_list_id] = destination_board_id
+
+    # Positions are read once the lists are locked
+    lock_card_lists(
+        db, {card_id: list_id for card_id, list_id, _, _, _, _, _ in rows}, dest_list_id)
+
+    # Cards of the destination list that stay in it
+    remaining_count = db.scalar(
+        select(List.cards_count).where(List.id == dest_list_id)
+    ) - sum(1 for _, list_id, _, _, _, _, _ in rows if list_id == dest_list_id)
+
+    new_position = move_data.destination_list_position or remaining_count + 1
+
+    if new_position < 1 or new_position > remaining_count + 1:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Position out of the range"
+        )
+
+    dense = False
+    if settings.CARD_POSITION_MODE == "fractional":
+        ranks, dense = ranking.ranks_for_slot(
+            db, dest_list_id, new_position, len(card_ids), exclude_card_ids=card_ids)
+    else:
+        ranks = [new_position + index for index in range(len(card_ids))]
+
+    versions = record_bulk_move(
+        db, {card_id: board_id for card_id, _, board_id, _, _, _, _ in rows}, destination_board_id)
+
+    if settings.CARD_POSITION_MODE == "integer":
+        # 1. Renumber the cards left in the source lists and leave space in the destination list
+        ranked = select(
+            Card.id,
+            Card.list_id,
+            func.row_number().over(partition_by=Card.list_id,
+                                   order_by=ranking.CARD_ORDER).label("rank")
+        ).where(
+            Card.list_id.in_(board_id_by_list), Card.id.not_in(card_ids)
+        ).subquery()
+
+        renumbered_position = case(
+            (and_(ranked.c.list_id == dest_list_id, ranked.c.rank >= new_position),
+             ranked.c.rank + len(card_ids)),
+            else_=ranked.c.rank
+        )
+        db.execute(
+            update(Card)
+            .where(Card.id == ranked.c.id, Card.position != renumbered_position)
+            .values({
+                Card.position: renumbered_position,
+                Card.change_seq: case(
+                    {list_id: versions[board_id]
+                     for list_id, board_id in board_id_by_list.items()},
+                    value=ranked.c.list_id
+                )
+            })
+            .execution_options(synchronize_session=False)
+        )
+        for list_id, board_id in board_id_by_list.items():
+            record_reorder(db, board_id, versions[board_id], list_id)
+
+    # 2. Place the moved cards
+    count_card_moves(db, [(list_id, board_id, is_done) for _, list_id, board_id, _, _, _, is_done in rows],
+                     dest_list_id, destination_board_id)
+    db.execute(
+        update(Card)
+        .where(Card.id.in_(card_ids))
+        .values({
+            Card.list_id: dest_list_id,
+            Card.position: case(dict(zip(card_ids, ranks)), value=Card.id),
+            Card.change_seq: versions[destination_board_id]
+        })
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+    cards = db.query(Card).options(*load_options).populate_existing().filter(
+        Card.id.in_(card_ids)
+    ).order_by(*ranking.CARD_ORDER).all()
+
+    # The neighbours are getting too close, spread the list again once the move is done
+    if dense:
+        background_tasks.add_task(
+            ranking.rebalance_list_task, dest_list_id, db.get_bind())
+
+    return cards
+
+
 @router.post("/{card_id}/tags/{tag_id}", response_model=schemas.Card, status_code=status.HTTP_201_CREATED, responses={
     404: {"model": schemas.HTTPError, "description": "Card or Tag not found"},
 })
@@ -151,29 +393,30 @@ def attach_tag(
     card_id: int,
     tag_id: int,
     db: Session = Depends(get_db),
-    current_user: User = CurrentUserDep
+    current_user: User = CurrentUserDep,
+    load_options: tuple = ResponseLoadDep(Card)
 ):
     """
     Associate an existing tag with a card.
     """
-    card = db.query(Card).options(
-        joinedload(Card.list), joinedload(Card.tags)
-    ).join(Card.list).join(List.board).filter(
+    # Card (with its owner check) and tag of the same board in a single query
+    row = db.query(Card, Tag).join(Card.list).join(List.board).outerjoin(
+        Tag, and_(Tag.id == tag_id, Tag.board_id == List.board_id)
+    ).options(
+        contains_eager(Card.list), joinedload(Card.tags)
+    ).filter(
         Card.id == card_id,
         Board.user_id == current_user.id,
         Board.is_inbox == False
     ).first()
 
-    if not card:
+    if not row:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Card not found"
         )
 
-    tag = db.query(Tag).filter(
-        Tag.id == tag_id,
-        Tag.board_id == card.list.board_id
-    ).first()
+    card, tag = row
 
     if not tag:
         raise HTTPException(
@@ -183,8 +426,9 @@ def attach_tag(
 
     if tag not in card.tags:
         card.tags.append(tag)
+        record_change(db, tag.board_id, card)
         db.commit()
-        db.refresh(card)
+        card = load_card(db, card.id, load_options)
 
     return card
 
@@ -196,29 +440,30 @@ def detach_tag(
     card_id: int,
     tag_id: int,
     db: Session = Depends(get_db),
-    current_user: User = CurrentUserDep
+    current_user: User = CurrentUserDep,
+    load_options: tuple = ResponseLoadDep(Card)
 ):
     """
     Removes an existing tag from a card.
     """
-    card = db.query(Card).options(
-        joinedload(Card.list), joinedload(Card.tags)
-    ).join(Card.list).join(List.board).filter(
+    # Card (with its owner check) and tag of the same board in a single query
+    row = db.query(Card, Tag).join(Card.list).join(List.board).outerjoin(
+        Tag, and_(Tag.id == tag_id, Tag.board_id == List.board_id)
+    ).options(
+        contains_eager(Card.list), joinedload(Card.tags)
+    ).filter(
         Card.id == card_id,
         Board.user_id == current_user.id,
         Board.is_inbox == False
     ).first()
 
-    if not card:
+    if not row:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Card not found"
         )
 
-    tag = db.query(Tag).filter(
-        Tag.id == tag_id,
-        Tag.board_id == card.list.board_id
-    ).first()
+    card, tag = row
 
     if not tag or not tag in card.tags:
         raise HTTPException(
@@ -227,7 +472,8 @@ def detach_tag(
         )
 
     card.tags.remove(tag)
+    record_change(db, tag.board_id, card)
     db.commit()
-    db.refresh(card)
+    card = load_card(db, card.id, load_options)
 
     return card
@@ -1,10 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
 
 from ..db.database import get_db
+from ..db.loading import ResponseLoadDep, eager_load_options
 from ..security import CurrentUserDep
-from ..models import User, Board
+from ..models import User, Board, Card
 from .. import schemas
+from ..schemas import common as common_schemas
+from ..schemas.common import requested_expansion
+from ..pagination import Page, PageDep, paginate, take_page
+from ..ranking import CARD_KEY
+from ..cache import board_scope, cache_response, cached_response
+from ..coalescing import single_flight
+from ..versioning import board_etag, conditional_response
 
 router = APIRouter(
     prefix="/inbox",
@@ -13,19 +22,66 @@ router = APIRouter(
 
 
 @router.get("", response_model=schemas.Inbox, responses={404: {"model": schemas.HTTPError}})
+@single_flight
 def get_inbox(
+    request: Request,
+    response: Response,
+    page: Page = PageDep,
     db: Session = Depends(get_db),
-    current_user: User = CurrentUserDep
+    current_user: User = CurrentUserDep,
+    load_options: tuple = ResponseLoadDep(Board)
 ):
-    inbox = db.query(Board).filter(
+    """
+    Get the inbox of the current user.
+    Answers `If-None-Match` with 304 when the inbox did not change (see `app.versioning`).
+    The cards are paginated with `limit` and `cursor` (see `app.pagination`), keyed on their list
+    and position: auto-filled inboxes can hold a lot of them.
+    The response is cached until the inbox changes (see `app.cache`), and identical concurrent
+    requests share one load (see `app.coalescing`).
+    """
+    cached = cached_response(request, current_user.id)
+    if cached:
+        return cached
+
+    inbox_version = db.query(Board.id, Board.version).filter(
         Board.user_id == current_user.id,
         Board.is_inbox == True
     ).first()
 
-    if not inbox:
+    if not inbox_version:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Inbox not found for the current user."
         )
 
-    return inbox
+    not_modified = conditional_response(
+        request, response, board_etag(*inbox_version))
+    if not_modified:
+        return not_modified
+
+    if page == Page():
+        inbox = db.query(Board).options(*load_options).filter(
+            Board.id == inbox_version.id
+        ).one()
+        return cache_response(request, response, inbox, current_user.id, board_scope(inbox.id))
+
+    expansion = requested_expansion.get()
+    inbox = db.query(Board).options(*eager_load_options(
+        Board, schemas.Inbox, skip=("lists.cards",), expansion=expansion)
+    ).filter(Board.id == inbox_version.id).one()
+
+    cards = paginate(
+        db.query(Card).options(*eager_load_options(
+            Card, common_schemas.CardSubschema, expansion=expansion))
+        .filter(Card.list_id.in_([inbox_list.id for inbox_list in inbox.lists])),
+        (Card.list_id, *CARD_KEY), page
+    ).all()
+    cards = take_page(response, cards, page,
+                      lambda card: (card.list_id, card.position, card.name, card.id))
+
+    # Loaded as is, the collections are not seen as changed
+    for inbox_list in inbox.lists:
+        set_committed_value(inbox_list, "cards", [
+            card for card in cards if card.list_id == inbox_list.id])
+
+    return cache_response(request, response, inbox, current_user.id, board_scope(inbox.id))
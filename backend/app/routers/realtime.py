@@ -0,0 +1,114 @@
+import asyncio
+
+from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket, WebSocketDisconnect, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.config import settings
+from ..db.database import get_db, get_async_db
+from .. import realtime, security
+from .boards import get_board_version_or_404
+
+router = APIRouter(
+    prefix="/boards",
+    tags=["Realtime"]
+)
+
+# WebSocket routes are not converted by `routers.async_adapter`, the session is picked here
+SubscriptionDbDep = Depends(
+    get_async_db if settings.DATABASE_ASYNC else get_db)
+
+
+# --- HELPER FUNCTIONS ---
+def get_subscription_cursor(db: Session, token: str, board_id: int) -> int:
+    """
+    Authenticate the token (same rules as `security.get_current_user`) and return the version of the board.
+    Raise 401/404 if the token is not valid or the user does not own the board.
+    """
+    claims = security.get_token_claims(token)
+    user = db.execute(security.user_query(claims)).scalars().first()
+
+    if user is None:
+        raise security.credentials_exception()
+
+    return get_board_version_or_404(board_id, db, user)
+
+
+async def authorize_subscription(db: Session | AsyncSession, token: str, board_id: int) -> int:
+    """
+    Run `get_subscription_cursor` without blocking the event loop, then release the session:
+    the connection is not kept for the whole life of the WebSocket.
+    """
+    if isinstance(db, AsyncSession):
+        try:
+            return await db.run_sync(get_subscription_cursor, token, board_id)
+        finally:
+            await db.close()
+
+    try:
+        return await run_in_threadpool(get_subscription_cursor, db, token, board_id)
+    finally:
+        db.close()
+
+
+async def forward_events(websocket: WebSocket, subscription) -> None:
+    """
+    Send the events of the subscription until the subscriber is evicted for being too slow.
+    """
+    try:
+        async for event in subscription:
+            await websocket.send_json(event)
+    except realtime.SubscriberEvicted:
+        await websocket.send_json({"type": "evicted"})
+        await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+
+
+async def wait_disconnect(websocket: WebSocket) -> None:
+    """
+    Read (and ignore) the client messages until it disconnects.
+    """
+    try:
+        while True:
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        pass
+
+
+# --- ROUTES ---
+@router.websocket("/{board_id}/ws")
+async def board_events(
+    websocket: WebSocket,
+    board_id: int,
+    token: str = Query(..., description="Access token (browsers can't set headers on WebSockets)"),
+    db: Session | AsyncSession = SubscriptionDbDep
+):
+    """
+    Subscribe to the changes of a board (see `app.realtime` for the events).
+
+    - The first message is `{"type": "subscribed", "board_id": ..., "cursor": ...}`.
+      Events with a cursor lower or equal to it are already included in the board the client can load now.
+    - A client that falls too far behind receives `{"type": "evicted"}` and the socket is closed (1013):
+      it has to catch up with `GET /boards/{id}/changes?since=<cursor>` and subscribe again.
+    - Invalid tokens and boards of other users are rejected with 1008.
+    """
+    # Subscribe before reading the cursor, so no change is lost in between
+    async with realtime.get_broker().subscribe(board_id) as subscription:
+        try:
+            cursor = await authorize_subscription(db, token, board_id)
+        except HTTPException:
+            await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+            return
+
+        await websocket.accept()
+        await websocket.send_json({"type": "subscribed", "board_id": board_id, "cursor": cursor})
+
+        tasks = [
+            asyncio.create_task(forward_events(websocket, subscription)),
+            asyncio.create_task(wait_disconnect(websocket)),
+        ]
+        try:
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in tasks:
+                task.cancel()
@@ -5,21 +5,37 @@ from .token import Token
 from .token import TokenData
 
 from .board import BoardCreate
+from .board import BoardImport
 from .board import BoardUpdate
 from .board import Board
 from .board import Inbox
+from .board import BoardSnapshot
+from .board import BoardChanges
+from .board import BoardStats
 
 from .list import ListCreate
+from .list import ListImport
 from .list import ListUpdate
+from .list import ListMove
 from .list import List
 
 from .card import CardCreate
+from .card import CardBulkCreate
+from .card import CardImport
+from .card import CardsBulkResult
 from .card import CardUpdate
 from .card import CardMove
+from .card import CardsMove
 from .card import Card
 
 from .tag import TagCreate
+from .tag import TagImport
 from .tag import TagUpdate
 from .tag import Tag
 
+from .batch import BatchOperation
+from .batch import BatchRequest
+from .batch import BatchOperationResult
+from .batch import BatchResult
+
 from .error import HTTPError
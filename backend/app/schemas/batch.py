@@ -0,0 +1,28 @@
+from pydantic import BaseModel, Field
+from typing import Any, Literal
+
+from ..core.config import settings
+
+
+class BatchOperation(BaseModel):
+    method: Literal["POST", "PATCH", "DELETE"]
+    path: str = Field(..., description="Path of the route, e.g. /boards/1/lists/2/cards/3")
+    body: dict[str, Any] | None = Field(None, description="JSON body of the route, if it takes one")
+
+
+class BatchRequest(BaseModel):
+    operations: list[BatchOperation] = Field(
+        ..., min_length=1, max_length=settings.BATCH_MAX_OPERATIONS,
+        description="The operations, run in order.")
+    atomic: bool = Field(
+        False, description="All or nothing: the first failing operation rolls back the whole batch.")
+
+
+class BatchOperationResult(BaseModel):
+    status: int
+    body: Any = None
+
+
+class BatchResult(BaseModel):
+    committed: bool = Field(..., description="False when an atomic batch was rolled back.")
+    results: list[BatchOperationResult]
@@ -1,6 +1,9 @@
 from pydantic import BaseModel, Field, ConfigDict
-from .common import UserSubschema, ListSubschema, TagSubschema, InboxList
-from .tag import HexColor
+from .common import (
+    UserSubschema, BoardSubschema, ListSubschema, TagSubschema, InboxList, SnapshotList,
+    ChangedCard, DeletedItem
+)
+from .tag import HexColor, TagImport
 
 
 class BoardBase(BaseModel):
@@ -13,6 +16,13 @@ class BoardCreate(BoardBase):
     default_tag_colors: list[HexColor] = []
 
 
+class BoardImport(BoardBase):
+    """
+    The first line of a board import, with the tags of the board (see `app.bulk`).
+    """
+    tags: list[TagImport] = []
+
+
 class BoardUpdate(BaseModel):
     name: str | None = Field(None, min_length=1, max_length=100)
     description: str | None = Field(None, max_length=255)
@@ -22,6 +32,8 @@ class BoardUpdate(BaseModel):
 class Board(BoardBase):
     id: int
     user_id: int
+    lists_count: int
+    cards_count: int
     user: UserSubschema
     tags: list[TagSubschema] = []
     lists: list[ListSubschema] = []
@@ -29,6 +41,22 @@ class Board(BoardBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+class TagUsage(TagSubschema):
+    # Cards of the board with the tag
+    cards_count: int
+
+
+class BoardStats(BoardSubschema):
+    """
+    A board of the dashboard (`GET /boards?stats=true`) with the statistics of its cards.
+    Overdue cards are the cards not done with a due date in the past.
+    """
+    cards_count: int
+    done_count: int
+    overdue_count: int
+    tags: list[TagUsage] = []
+
+
 class Inbox(BoardBase):
     id: int
     user_id: int
@@ -37,3 +65,27 @@ class Inbox(BoardBase):
     lists: list[InboxList] = []
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class BoardSnapshot(BoardBase):
+    id: int
+    user_id: int
+    is_inbox: bool
+    # Board version of the snapshot, to be used as `since` in `GET /boards/{id}/changes`
+    cursor: int
+    tags: list[TagSubschema] = []
+    lists: list[SnapshotList] = []
+
+
+class BoardChanges(BaseModel):
+    """
+    What changed in a board after a cursor. Deletions are applied before the other changes.
+    A deleted list takes its cards with it, a deleted tag is removed from the cards
+    and a changed tag replaces its copies in the cards.
+    """
+    cursor: int
+    board: BoardSubschema | None = None
+    lists: list[ListSubschema] = []
+    cards: list[ChangedCard] = []
+    tags: list[TagSubschema] = []
+    deleted: list[DeletedItem] = []
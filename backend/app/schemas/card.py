@@ -1,7 +1,8 @@
 from pydantic import BaseModel, Field, ConfigDict
+from typing import ClassVar
 from datetime import datetime
 
-from .common import ListSubschema, TagSubschema
+from .common import ExpandableSchema, ListSubschema, TagSubschema, Rank
 
 
 class CardBase(BaseModel):
@@ -27,13 +28,46 @@ class CardMove(BaseModel):
         None, ge=1, description="The new position of the list (gather or equal than 1)")
 
 
-class Card(CardBase):
+class CardsMove(CardMove):
+    card_ids: list[int] = Field(
+        ..., min_length=1, max_length=100,
+        description="The IDs of the cards to move, in the order they must have in the destination list.")
+
+
+class CardBulkCreate(CardBase):
+    """
+    A card of a bulk creation (one per line, see `app.bulk`).
+    """
+    is_done: bool = False
+    due_date: datetime | None = None
+    tag_ids: list[int] = Field([], description="The IDs of the tags of the board to attach.")
+
+
+class CardImport(CardBase):
+    """
+    A card of a board import (see `app.bulk`).
+    """
+    is_done: bool = False
+    due_date: datetime | None = None
+    tags: list[str] = Field([], description="The refs of the imported tags to attach.")
+
+
+class CardsBulkResult(BaseModel):
+    list_id: int
+    # Cards created by the request
+    created: int
+    cards_count: int
+
+
+class Card(CardBase, ExpandableSchema):
+    expandable: ClassVar[frozenset[str]] = frozenset({"tags", "list"})
+
     is_done: bool
-    position: int
+    position: Rank
     due_date: datetime | None = None
     id: int
     list_id: int
     tags: list[TagSubschema] = []
-    list: ListSubschema
+    list: ListSubschema | None = None
 
     model_config = ConfigDict(from_attributes=True)
@@ -1,5 +1,7 @@
 from __future__ import annotations
-from pydantic import BaseModel, ConfigDict
+from contextvars import ContextVar
+from pydantic import BaseModel, ConfigDict, PlainSerializer, model_serializer, model_validator
+from typing import Annotated, ClassVar, Literal
 from datetime import datetime
 
 """
@@ -8,6 +10,47 @@ These subschemas will be imported into the response models to be used inside of
 """
 
 
+# Relationships asked with `?expand=` by the current request (set by `db.loading.ResponseLoadDep`)
+requested_expansion: ContextVar[frozenset[str]] = ContextVar(
+    "requested_expansion", default=frozenset())
+
+
+class ExpandableSchema(BaseModel):
+    """
+    Base of the schemas with relationships only sent when asked with `?expand=` (the `expandable`
+    field names, e.g. `?expand=cards,tags`).
+    The relationships that are not asked are not read from the ORM objects (so they are neither
+    loaded nor serialized) and are left out of the response. Plain dicts are taken as they are.
+    """
+    expandable: ClassVar[frozenset[str]] = frozenset()
+
+    @model_validator(mode="before")
+    @classmethod
+    def _read_expanded(cls, data):
+        if isinstance(data, dict):
+            return data
+
+        expansion = requested_expansion.get()
+        return {
+            name: getattr(data, name) for name in cls.model_fields
+            if (name not in cls.expandable or name in expansion) and hasattr(data, name)
+        }
+
+    @model_serializer(mode="wrap")
+    def _drop_unexpanded(self, handler):
+        data = handler(self)
+        for name in self.expandable - self.model_fields_set:
+            data.pop(name, None)
+        return data
+
+
+# Card positions are stored as floats (fractional ranks), but whole ranks are still sent as integers.
+Rank = Annotated[
+    float,
+    PlainSerializer(lambda rank: int(rank) if rank.is_integer() else rank)
+]
+
+
 class UserSubschema(BaseModel):
     id: int
     username: str
@@ -34,14 +77,16 @@ class ListSubschema(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
-class CardSubschema(BaseModel):
+class CardSubschema(ExpandableSchema):
+    expandable: ClassVar[frozenset[str]] = frozenset({"tags"})
+
     id: int
     name: str
     text: str | None
     is_done: bool
-    position: int
+    position: Rank
     due_date: datetime | None
-    tags: list[TagSubschema]
+    tags: list[TagSubschema] = []
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -54,6 +99,24 @@ class InboxList(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class SnapshotList(BaseModel):
+    id: int
+    name: str
+    position: int
+    cards: list[CardSubschema] = []
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ChangedCard(CardSubschema):
+    list_id: int
+
+
+class DeletedItem(BaseModel):
+    entity: Literal["list", "card", "tag"]
+    id: int
+
+
 class TagSubschema(BaseModel):
     id: int
     name: str | None
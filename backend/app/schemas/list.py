@@ -1,5 +1,8 @@
 from pydantic import BaseModel, Field, ConfigDict
-from .common import BoardSubschema, CardSubschema
+from typing import ClassVar
+
+from .common import BoardSubschema, CardSubschema, ExpandableSchema
+from .card import CardImport
 
 
 class ListBase(BaseModel):
@@ -10,14 +13,32 @@ class ListCreate(ListBase):
     pass
 
 
+class ListImport(ListBase):
+    """
+    A list of a board import, with its cards in order (one list per line, see `app.bulk`).
+    """
+    cards: list[CardImport] = []
+
+
 class ListUpdate(BaseModel):
     name: str | None = Field(None, min_length=1, max_length=100)
 
 
-class List(ListBase):
+class ListMove(BaseModel):
+    destination_board_id: int | None = Field(
+        None, description="The ID of the board to which you want to move the list (its board if not specified).")
+    destination_list_position: int | None = Field(
+        None, ge=1, description="The new position of the list (greater or equal than 1)")
+
+
+class List(ListBase, ExpandableSchema):
+    expandable: ClassVar[frozenset[str]] = frozenset({"cards"})
+
     id: int
     position: int
     board_id: int
+    cards_count: int
+    done_count: int
     board: BoardSubschema
     cards: list[CardSubschema] = []
 
@@ -1,7 +1,7 @@
 from pydantic import BaseModel, Field, ConfigDict
-from typing import Annotated
+from typing import Annotated, ClassVar
 
-from .common import BoardSubschema, CardSubschema
+from .common import BoardSubschema, CardSubschema, ExpandableSchema
 
 
 HexColor = Annotated[
@@ -22,12 +22,19 @@ class TagCreate(TagBase):
     pass
 
 
+class TagImport(TagBase):
+    ref: str = Field(..., min_length=1, max_length=50,
+                     description="Key of the tag in the import, used by the cards to attach it.")
+
+
 class TagUpdate(TagBase):
     name: str | None = Field(None, min_length=0, max_length=50)
     color: str | None = Field(None, min_length=4, max_length=7)
 
 
-class Tag(TagBase):
+class Tag(TagBase, ExpandableSchema):
+    expandable: ClassVar[frozenset[str]] = frozenset({"cards"})
+
     id: int
     board_id: int
     board: BoardSubschema
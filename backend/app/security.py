@@ -1,10 +1,16 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
 from passlib.context import CryptContext
 from datetime import timedelta, datetime, timezone
 from .core.config import settings
 from jose import jwt, JWTError
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import select, event
+from sqlalchemy.orm import Session, make_transient_to_detached
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import ValidationError
 from .db import database
 from .models import User
@@ -12,9 +18,18 @@ from .schemas import token as token_schema
 
 
 # --- 1. Password hashing ---
-pwd_context = CryptContext(schemes=["argon2", "bcrypt"], deprecated="auto")
+# Only the costs set in the settings are overridden (see `python -m app.hashing`)
+argon2_costs = {
+    f"argon2__{name}": value
+    for name, value in (("time_cost", settings.ARGON2_TIME_COST), ("memory_cost", settings.ARGON2_MEMORY_COST))
+    if value is not None
+}
 
+pwd_context = CryptContext(
+    schemes=["argon2", "bcrypt"], deprecated="auto", **argon2_costs)
 
+
+# These run inline: the routes call them through the `app.hashing` process pool.
 def get_password_hash(password: str) -> str:
     """Hash a password in plain text."""
     return pwd_context.hash(password)
@@ -41,45 +56,195 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None):
     return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
 
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(database.get_db)) -> User:
-    """
-    Dependency that enforces authentication for protected endpoints.
-
-    Usage:
-        current_user: User = Depends(get_current_user)
-
-    Behavior:
-    1. Depends(oauth2_scheme) extracts the Bearer token from the Authorization header.
-    2. The token is decoded and validated (signature, algorithm, expiration) against SECRET_KEY/ALGORITHM.
-    3. The payload must contain an identifier (e.g. 'sub' or a user id) used to load the user from the database via the provided Session.
-    4. If token validation fails, is expired, or the user is not found, the function raises an HTTPException (401 Unauthorized) so the request is rejected.
-    5. On success, the function returns the SQLAlchemy User instance representing the authenticated user.
-    """
-
-    credentials_exception = HTTPException(
+def credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="The credentials could not be validated",
         headers={"WWW-Authenticate": "Bearer"}
     )
 
+
+@dataclass
+class TokenClaims:
+    username: str
+    user_id: int | None
+    expires_at: float
+
+
+def get_token_claims(token: str) -> TokenClaims:
+    """
+    Decode and validate the token (signature, algorithm, expiration) against SECRET_KEY/ALGORITHM
+    and return its claims: the username ('sub'), the user id ('uid', missing on older tokens)
+    and the expiration ('exp').
+    Raise 401 if the token is not valid.
+    """
     try:
         payload = jwt.decode(token, settings.SECRET_KEY,
                              algorithms=[settings.ALGORITHM])
         token_data = token_schema.TokenData(username=payload.get("sub"))
 
         if token_data.username is None:
-            raise credentials_exception
+            raise credentials_exception()
 
     except (JWTError, ValidationError):
-        raise credentials_exception
+        raise credentials_exception()
+
+    user_id = payload.get("uid")
+
+    return TokenClaims(
+        username=token_data.username,
+        user_id=user_id if isinstance(user_id, int) else None,
+        expires_at=payload.get("exp", float("inf"))
+    )
+
+
+# --- 3. Principal cache ---
+class PrincipalCache:
+    """
+    Bounded LRU cache of the authenticated users, keyed by token.
+
+    A hit skips both the token decoding and the user query: the cached user is a detached copy
+    that is attached to the request session without SQL (`Session.merge(load=False)`).
+    An entry lives until the first of: the cache TTL, the token expiration, or a change of the user
+    (see `evict_user`, called from the `User` mapper events).
+    The cache is per process, `max_size = 0` disables it.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, tuple[User, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token: str) -> User | None:
+        with self._lock:
+            entry = self._entries.get(token)
+
+            if entry is None or entry[1] <= time.time():
+                if entry is not None:
+                    del self._entries[token]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, token: str, user: User, token_expires_at: float) -> None:
+        if self.max_size <= 0:
+            return
+
+        # Copy of the loaded columns only, so the cache never keeps a request session alive
+        cached_user = User(
+            id=user.id,
+            username=user.username,
+            email=user.email,
+            password_hash=user.password_hash
+        )
+        make_transient_to_detached(cached_user)
+        expires_at = min(time.time() + self.ttl, token_expires_at)
+
+        with self._lock:
+            self._entries[token] = (cached_user, expires_at)
+            self._entries.move_to_end(token)
+
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def evict_user(self, user_id: int) -> None:
+        with self._lock:
+            for token in [token for token, (user, _) in self._entries.items() if user.id == user_id]:
+                del self._entries[token]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+principal_cache = PrincipalCache(
+    max_size=settings.PRINCIPAL_CACHE_SIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL
+)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def evict_changed_user(mapper, connection, user: User):
+    principal_cache.evict_user(user.id)
+
+
+def user_query(claims: TokenClaims):
+    """
+    Query of the user of the token: by primary key when the token has the user id.
+    The username must match too, so a token never resolves to another user with a reused id.
+    """
+    query = select(User).where(User.username == claims.username)
+
+    if claims.user_id is not None:
+        query = query.where(User.id == claims.user_id)
+
+    return query
+
+
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(database.get_db)) -> User:
+    """
+    Dependency that enforces authentication for protected endpoints.
+
+    Usage:
+        current_user: User = Depends(get_current_user)
+
+    Behavior:
+    1. Depends(oauth2_scheme) extracts the Bearer token from the Authorization header.
+    2. If the token is in the principal cache, its user is attached to the Session and returned (no decoding, no query).
+    3. Otherwise the token is decoded and validated (signature, algorithm, expiration) against SECRET_KEY/ALGORITHM.
+    4. The payload must contain an identifier ('sub' and 'uid' when present) used to load the user from the database via the provided Session.
+    5. If token validation fails, is expired, or the user is not found, the function raises an HTTPException (401 Unauthorized) so the request is rejected.
+    6. On success, the function returns the SQLAlchemy User instance representing the authenticated user.
+    """
+    cached_user = principal_cache.get(token)
+    if cached_user is not None:
+        return db.merge(cached_user, load=False)
+
+    claims = get_token_claims(token)
 
     # Search the user in the database
-    user = db.query(User).filter(User.username == token_data.username).first()
+    user = db.execute(user_query(claims)).scalars().first()
 
     if user is None:
-        raise credentials_exception
+        raise credentials_exception()
+
+    principal_cache.set(token, user, claims.expires_at)
+
+    return user
+
+
+async def get_current_user_async(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(database.get_async_db)
+) -> User:
+    """
+    Async version of `get_current_user` for the async stack (settings.DATABASE_ASYNC).
+    The user is loaded in the request AsyncSession, the same one the async routes use.
+    """
+    cached_user = principal_cache.get(token)
+    if cached_user is not None:
+        return await db.merge(cached_user, load=False)
+
+    claims = get_token_claims(token)
+
+    result = await db.execute(user_query(claims))
+    user = result.scalars().first()
+
+    if user is None:
+        raise credentials_exception()
+
+    principal_cache.set(token, user, claims.expires_at)
 
     return user
 
 
 CurrentUserDep = Depends(get_current_user)
+
+AsyncCurrentUserDep = Depends(get_current_user_async)
@@ -0,0 +1,226 @@
+"""
+Fast serialization of the large read responses (board, inbox, lists and cards).
+
+By default a route returns ORM objects and FastAPI validates them into the `response_model`
+(`from_attributes`), dumps the model to a dict and encodes it with the standard JSON encoder: every
+value is checked and copied three times, for data that comes from our own database.
+With `FAST_SERIALIZATION`, `serialize_response` skips the validation: the fields of the response
+model are read from the ORM objects by a serializer compiled once per schema and expansion
+(see `schemas.common.ExpandableSchema`), which only applies the serializers of the fields
+(e.g. `Rank`), and the result is encoded with orjson. The output is the same as the response model.
+
+Compare both paths on a large inbox with:
+    python -m app.serialization --cards 2000
+"""
+import argparse
+import json
+import time
+import types
+from collections.abc import Callable
+from functools import lru_cache
+from typing import Union, get_args, get_origin
+
+import orjson
+from fastapi import Request, Response
+from pydantic import BaseModel, PlainSerializer, TypeAdapter
+
+from .core.config import settings
+from .schemas.common import requested_expansion
+
+# Aware datetimes in UTC end with "Z", like Pydantic
+ORJSON_OPTIONS = orjson.OPT_UTC_Z
+
+Serializer = Callable[[object], object]
+
+
+def _compile(annotation, metadata=(), expansion: frozenset[str] = frozenset()) -> Serializer | None:
+    """
+    Return the function that turns a value of `annotation` into JSON-ready data,
+    or None when the value is sent as is (str, int, datetime...).
+    """
+    for item in metadata:
+        if isinstance(item, PlainSerializer):
+            return item.func
+
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return compile_serializer(annotation, expansion)
+
+    origin = get_origin(annotation)
+    if origin is list:
+        serialize_item = _compile(get_args(annotation)[0], expansion=expansion)
+        if serialize_item is None:
+            return list
+        return lambda values: [serialize_item(value) for value in values]
+
+    if origin in (Union, types.UnionType):
+        serializers = [_compile(arg, expansion=expansion)
+                       for arg in get_args(annotation) if arg is not types.NoneType]
+        if len(serializers) == 1 and serializers[0] is not None:
+            serialize = serializers[0]
+            return lambda value: None if value is None else serialize(value)
+
+    return None
+
+
+@lru_cache(maxsize=None)
+def compile_serializer(schema: type[BaseModel], expansion: frozenset[str] = frozenset()) -> Serializer:
+    """
+    Build the function that reads the fields of `schema` from an ORM object into a dict,
+    as `schema.model_validate(obj).model_dump(mode="json")` would, without the validation.
+    The expandable fields not in `expansion` are left out.
+    """
+    if not schema.__pydantic_complete__:
+        schema.model_rebuild()
+
+    unexpanded = getattr(schema, "expandable", frozenset()) - expansion
+    fields = [
+        (name, _compile(field.annotation, field.metadata, expansion))
+        for name, field in schema.model_fields.items() if name not in unexpanded
+    ]
+
+    def serialize(obj) -> dict:
+        data = {}
+        for name, serialize_field in fields:
+            value = getattr(obj, name)
+            data[name] = value if serialize_field is None else serialize_field(value)
+        return data
+
+    return serialize
+
+
+@lru_cache(maxsize=None)
+def _response_adapter(response_model) -> TypeAdapter:
+    return TypeAdapter(response_model)
+
+
+def encode_content(request: Request, content) -> bytes:
+    """
+    Encode `content` as the JSON of the `response_model` of the current route.
+    With `FAST_SERIALIZATION` the compiled serializer is used when the response model has one
+    (not for unions of models), otherwise `content` is validated and dumped like FastAPI does.
+    """
+    response_model = request.scope["route"].response_model
+
+    if settings.FAST_SERIALIZATION:
+        serialize = _compile(response_model, expansion=requested_expansion.get())
+        if serialize is not None:
+            return orjson.dumps(serialize(content), option=ORJSON_OPTIONS)
+
+    adapter = _response_adapter(response_model)
+    return adapter.dump_json(adapter.validate_python(content, from_attributes=True))
+
+
+def json_response(response: Response, body: bytes) -> Response:
+    """
+    Response with an encoded JSON body and the headers set on `response` (e.g. ETag, `X-Next-Cursor`).
+    """
+    return Response(
+        body,
+        media_type="application/json",
+        headers={name: value for name, value in response.headers.items()
+                 if name != "content-length"}
+    )
+
+
+def serialize_response(request: Request, response: Response, content):
+    """
+    Return the JSON response of `content` (ORM objects) for the `response_model` of the current route,
+    without validation, when `FAST_SERIALIZATION` is on. The headers set on `response` are kept.
+    Otherwise `content` is returned as is and FastAPI serializes it with the response model.
+
+    Usage:
+        return serialize_response(request, response, board)
+    """
+    if not settings.FAST_SERIALIZATION:
+        return content
+
+    return json_response(response, encode_content(request, content))
+
+
+# --- BENCHMARK ---
+def _fill_inbox(db, cards_count: int, tags_count: int):
+    from .models import User, Board, List, Card, Tag
+
+    user = User(username="benchmark", email="benchmark@example.com", password_hash="-")
+    inbox = Board(name="Inbox", is_inbox=True, user=user, lists_count=1, cards_count=cards_count)
+    tags = [Tag(name=f"Tag {i}", color="#d62828", board=inbox) for i in range(tags_count)]
+    incoming = List(name="Incoming", position=1, board=inbox, cards_count=cards_count)
+    db.add_all([user, inbox, incoming, *tags])
+    db.add_all([
+        Card(name=f"Card {i}", text="Some text", position=i + 1, list=incoming,
+             tags=tags[:i % (tags_count + 1)])
+        for i in range(cards_count)
+    ])
+    db.commit()
+
+    return inbox.id
+
+
+def _best_time(function: Callable, rounds: int) -> float:
+    durations = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        function()
+        durations.append(time.perf_counter() - start)
+
+    return min(durations)
+
+
+def main(argv: list[str] | None = None) -> None:
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session
+
+    from .db.database import Base
+    from .db.loading import eager_load_options
+    from .models import Board
+    from . import schemas
+
+    parser = argparse.ArgumentParser(
+        description="Compare the default serialization of the inbox with the fast one.")
+    parser.add_argument("--cards", type=int, default=2000,
+                        help="Cards of the inbox (default: 2000)")
+    parser.add_argument("--tags", type=int, default=3,
+                        help="Tags of the inbox, the cards have 0 to all of them (default: 3)")
+    parser.add_argument("--rounds", type=int, default=5,
+                        help="Runs of each path, the best one is kept (default: 5)")
+    args = parser.parse_args(argv)
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+
+    with Session(engine) as db:
+        inbox_id = _fill_inbox(db, args.cards, args.tags)
+
+    for expansion in (frozenset(), frozenset({"tags"})):
+        token = requested_expansion.set(expansion)
+        with Session(engine) as db:
+            inbox = db.query(Board).options(
+                *eager_load_options(Board, schemas.Inbox, expansion=expansion)
+            ).filter(Board.id == inbox_id).one()
+
+            # What FastAPI does with the response model and JSONResponse
+            adapter = TypeAdapter(schemas.Inbox)
+
+            def default_path():
+                model = adapter.validate_python(inbox, from_attributes=True)
+                data = adapter.dump_python(model, mode="json")
+                return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode()
+
+            serialize = compile_serializer(schemas.Inbox, expansion)
+
+            def fast_path():
+                return orjson.dumps(serialize(inbox), option=ORJSON_OPTIONS)
+
+            assert json.loads(default_path()) == json.loads(fast_path())
+            default_time = _best_time(default_path, args.rounds)
+            fast_time = _best_time(fast_path, args.rounds)
+        requested_expansion.reset(token)
+
+        label = f"expand={','.join(sorted(expansion))}" if expansion else "default shape"
+        print(f"# Inbox with {args.cards} cards, {label}")
+        print(f"default: {default_time * 1000:.1f}ms")
+        print(f"fast:    {fast_time * 1000:.1f}ms ({default_time / fast_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,24 +1,76 @@
+"""
+The suite runs against the sync stack by default.
+Run it with `DATABASE_ASYNC=true` to test the async stack (async engine, AsyncSession and async routes).
+"""
+import os
+import tempfile
 import pytest
-from sqlalchemy import create_engine
-from sqlalchemy.pool import StaticPool
+from collections import Counter
+from contextlib import contextmanager
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.pool import StaticPool, NullPool
 from sqlalchemy.orm import sessionmaker
 from fastapi.testclient import TestClient
 
-from app.db.database import Base, get_db
+from app import hashing, realtime
+from app.core.config import settings
+from app.db.database import Base, get_db, get_async_db, to_async_url, enable_sqlite_foreign_keys
+from app.db.instrumentation import statement_shape
 from app.main import app
+from app.security import principal_cache
+from app.cache import get_response_cache
 from app.models import Board, List, Card, Tag
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
-
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
-    connect_args={"check_same_thread": False},
-    poolclass=StaticPool
-)
+if settings.DATABASE_ASYNC:
+    # The app uses its own AsyncSession, so the app and the tests share a temporary database file
+    SQLALCHEMY_DATABASE_URL = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test.db')}"
+
+    engine = create_engine(
+        SQLALCHEMY_DATABASE_URL,
+        connect_args={"check_same_thread": False}
+    )
+    # Each TestClient runs its own event loop, connections can't be reused between them
+    async_engine = create_async_engine(
+        to_async_url(SQLALCHEMY_DATABASE_URL),
+        poolclass=NullPool
+    )
+else:
+    SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
+
+    engine = create_engine(
+        SQLALCHEMY_DATABASE_URL,
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+    async_engine = None
+
+# Engines to listen to when counting queries
+engines = [engine] + ([async_engine.sync_engine] if async_engine else [])
+
+for test_engine in engines:
+    enable_sqlite_foreign_keys(test_engine)
 
 TestingSessionLocal = sessionmaker(
     autocommit=False, autoflush=False, bind=engine)
 
+TestingAsyncSessionLocal = async_sessionmaker(
+    autoflush=False, bind=async_engine)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def hashing_shutdown():
+    """
+    Keep the password hashing processes between the tests: the app stops them at each shutdown
+    (each `TestClient`, see `app.main`) and spawning them again for each test is slow.
+    Yields the real `hashing.shutdown`, called at the end of the session.
+    """
+    shutdown = hashing.shutdown
+    hashing.shutdown = lambda: None
+    yield shutdown
+    hashing.shutdown = shutdown
+    shutdown()
+
 
 @pytest.fixture(scope="function")
 def db_session():
@@ -46,7 +98,15 @@ def client(db_session):
         finally:
             db_session.close()
 
+    async def override_get_async_db():
+        async with TestingAsyncSessionLocal() as db:
+            yield db
+
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    # Ids and tokens are reused between tests (new database for each one)
+    principal_cache.clear()
+    get_response_cache().clear()
 
     with TestClient(app) as c:
         yield c
@@ -73,6 +133,49 @@ def auth_headers(client):
     return {"Authorization": f"Bearer {token}"}
 
 
+@pytest.fixture(scope="function")
+def query_budget():
+    """
+    Fails the test when the code inside the `with` block runs more queries than the budget.
+    Used to catch N+1 regressions in the routes.
+
+    Usage:
+        with query_budget(4):
+            client.get(f"/boards/{board_id}", headers=auth_headers)
+    """
+    @contextmanager
+    def check_budget(max_queries: int):
+        with count_queries() as statements:
+            yield statements
+
+        if len(statements) > max_queries:
+            shapes = Counter(statement_shape(statement) for statement in statements)
+            details = "\n".join(f"{times}x {shape}" for shape, times in shapes.most_common())
+            pytest.fail(
+                f"{len(statements)} queries executed, budget was {max_queries}:\n{details}")
+
+    return check_budget
+
+
+@pytest.fixture(scope="function")
+def published_events():
+    """
+    Replace the broker by one that records what is published (instead of sending it).
+    """
+    class RecordingBroker(realtime.InMemoryBroker):
+        def __init__(self):
+            super().__init__()
+            self.events = []
+
+        def publish(self, board_id, event):
+            self.events.append(event)
+
+    broker = RecordingBroker()
+    realtime.set_broker(broker)
+    yield broker.events
+    realtime.set_broker(None)
+
+
 @pytest.fixture(scope="function")
 def fill_data(client, auth_headers):
     """
@@ -156,6 +259,31 @@ def fill_data(client, auth_headers):
 
 # --- Helpers ---
 
+@contextmanager
+def count_queries():
+    """
+    Collect the SQL statements sent to the test database inside the `with` block.
+
+    Usage:
+        with count_queries() as statements:
+            client.get("/inbox", headers=auth_headers)
+        assert len(statements) == 4
+    """
+    statements = []
+
+    def collect_statement(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    for listened_engine in engines:
+        event.listen(listened_engine, "before_cursor_execute", collect_statement)
+    try:
+        yield statements
+    finally:
+        for listened_engine in engines:
+            event.remove(listened_engine, "before_cursor_execute",
+                         collect_statement)
+
+
 def check_models_count(db, models_count: dict):
     """
     This helpers take each model of `models_count` and assert that the database have the associated count of this item.
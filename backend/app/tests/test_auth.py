@@ -1,4 +1,11 @@
+import threading
+
+from fastapi.testclient import TestClient
+
+from app import hashing, security
+from app.main import app
 from app.models import User, Board, List
+from .conftest import count_queries
 
 
 def test_register_user(client, db_session):
@@ -66,3 +73,97 @@ def test_login_wrong_password(client):
     })
 
     assert response.status_code == 401
+
+
+def test_hashing_metrics(client):
+    completed = hashing.metrics.completed
+
+    client.post("/auth/register", json={
+        "username": "user3", "email": "u3@ex.com", "password": "password"
+    })
+    response = client.post("/auth/login", data={
+        "username": "user3",
+        "password": "password"
+    })
+
+    assert response.status_code == 200
+    # One hash on register and one verification on login
+    assert hashing.metrics.completed == completed + 2
+    assert hashing.metrics.pending == 0
+    assert hashing.metrics.max_latency > 0
+
+
+def test_hashing_queue_full(client, monkeypatch):
+    # No free slot: every hash is rejected without being queued
+    monkeypatch.setattr(hashing, "_slots", threading.BoundedSemaphore(1))
+    hashing._slots.acquire()
+    rejected = hashing.metrics.rejected
+
+    response = client.post("/auth/register", json={
+        "username": "user4", "email": "u4@ex.com", "password": "password"
+    })
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == str(
+        hashing.settings.PASSWORD_HASH_RETRY_AFTER)
+    assert hashing.metrics.rejected == rejected + 1
+
+
+def test_hashing_shutdown(hashing_shutdown, monkeypatch):
+    """
+    Verifies that the app stops the hashing processes when it stops,
+    and that the next hashes run on a new pool.
+    """
+    calls = []
+    monkeypatch.setattr(hashing, "shutdown", lambda: calls.append(True))
+    with TestClient(app):
+        pass
+    assert calls == [True]
+
+    password_hash = hashing.hash_password("password")
+    executor = hashing._executor
+    hashing_shutdown()
+    assert hashing._executor is None
+
+    assert hashing.verify_password("password", password_hash)
+    assert hashing._executor not in (None, executor)
+
+
+def test_hashing_calibration():
+    # A target nothing can reach ends on the cheapest costs allowed
+    time_cost, memory_cost, _ = hashing.calibrate(
+        target=0, max_memory_cost=4096, min_memory_cost=1024, rounds=1)
+
+    assert (time_cost, memory_cost) == (1, 1024)
+
+
+def test_principal_cache(client, db_session, auth_headers):
+    hits, misses = security.principal_cache.hits, security.principal_cache.misses
+
+    response = client.get("/users/me", headers=auth_headers)
+    assert response.status_code == 200
+    assert security.principal_cache.misses == misses + 1
+
+    # Same token: no query for the user
+    with count_queries() as statements:
+        response = client.get("/users/me", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json()["username"] == "testuser"
+    assert security.principal_cache.hits == hits + 1
+    assert not any("FROM users" in statement for statement in statements)
+
+    # A changed user is evicted
+    user = db_session.query(User).filter(User.username == "testuser").one()
+    user.email = "changed@example.com"
+    db_session.commit()
+
+    response = client.get("/users/me", headers=auth_headers)
+    assert response.json()["email"] == "changed@example.com"
+    assert security.principal_cache.misses == misses + 2
+
+    # A deleted user is evicted
+    db_session.delete(user)
+    db_session.commit()
+
+    response = client.get("/users/me", headers=auth_headers)
+    assert response.status_code == 401
@@ -0,0 +1,152 @@
+"""
+Many writes in one transaction with `POST /batch` (see `routers.batch` and `db.batching`).
+"""
+from sqlalchemy import event
+
+from ..models import Card, List
+from .conftest import count_queries, engines
+
+
+def get_ids(db_session):
+    board_id, list_id = db_session.query(List.board_id, List.id).filter(
+        List.name == "List 2").one()
+    card_id = db_session.query(Card.id).filter(Card.name == "Task 5").scalar()
+    return board_id, list_id, card_id
+
+
+def count_commits():
+    commits = []
+
+    def collect_commit(conn):
+        commits.append(conn)
+
+    for listened_engine in engines:
+        event.listen(listened_engine, "commit", collect_commit)
+    return commits, lambda: [event.remove(listened_engine, "commit", collect_commit)
+                             for listened_engine in engines]
+
+
+def test_batch_operations(client, auth_headers, db_session, fill_data, published_events):
+    """
+    Verifies that the operations run in order, in one commit, with the result of each route,
+    and that their changes are published once committed.
+    """
+    board_id, list_id, card_id = get_ids(db_session)
+    card_url = f"/boards/{board_id}/lists/{list_id}/cards/{card_id}"
+    tag_id = client.get(f"/boards/{board_id}/tags", headers=auth_headers).json()[0]["id"]
+
+    commits, stop = count_commits()
+    response = client.post("/batch", json={"operations": [
+        {"method": "PATCH", "path": card_url, "body": {"name": "Renamed"}},
+        {"method": "PATCH", "path": card_url, "body": {"is_done": True}},
+        {"method": "PATCH", "path": card_url, "body": {"due_date": "2030-01-02T03:04:05"}},
+        {"method": "POST", "path": f"/cards/{card_id}/tags/{tag_id}"},
+        {"method": "POST", "path": f"/boards/{board_id}/lists/{list_id}/cards",
+         "body": {"name": "New card"}},
+        {"method": "DELETE", "path": f"/boards/{board_id}/lists/{list_id}/cards/{card_id}"},
+    ]}, headers=auth_headers)
+    stop()
+
+    assert response.status_code == 200
+    batch = response.json()
+    assert batch["committed"]
+    assert [result["status"] for result in batch["results"]] == [200, 200, 200, 201, 201, 204]
+    assert batch["results"][0]["body"]["name"] == "Renamed"
+    assert batch["results"][2]["body"]["due_date"] == "2030-01-02T03:04:05"
+    assert batch["results"][3]["body"]["is_done"]
+    assert batch["results"][4]["body"]["name"] == "New card"
+    assert batch["results"][5]["body"] is None
+    assert len(commits) == 1
+
+    cards = client.get(f"/boards/{board_id}/lists/{list_id}/cards", headers=auth_headers).json()
+    assert [card["name"] for card in cards] == ["Task 6", "New card"]
+
+    assert len(published_events) == 1
+    changes = published_events[0]["changes"]
+    assert {"entity": "card", "id": card_id, "op": "delete"} in changes
+    assert {"entity": "card", "id": batch["results"][4]["body"]["id"], "op": "upsert"} in changes
+
+
+def test_batch_failing_operations(client, auth_headers, db_session, fill_data, published_events):
+    """
+    Verifies that a failing operation gets its error and is rolled back alone, the others are committed.
+    """
+    board_id, list_id, card_id = get_ids(db_session)
+    card_url = f"/boards/{board_id}/lists/{list_id}/cards/{card_id}"
+
+    response = client.post("/batch", json={"operations": [
+        {"method": "PATCH", "path": card_url, "body": {"name": "Renamed"}},
+        {"method": "PATCH", "path": f"/boards/{board_id}/lists/{list_id}/cards/0",
+         "body": {"name": "Missing"}},
+        {"method": "PATCH", "path": card_url, "body": {"name": ""}},
+        {"method": "PATCH", "path": "/unknown", "body": {}},
+        {"method": "DELETE", "path": "/cards/move"},
+        {"method": "PATCH", "path": f"/boards/{board_id}", "body": {"name": "Renamed board"}},
+    ]}, headers=auth_headers)
+
+    batch = response.json()
+    assert batch["committed"]
+    assert [result["status"] for result in batch["results"]] == [200, 404, 422, 404, 405, 200]
+    assert batch["results"][1]["body"] == {"detail": "Card with id 0 not found."}
+    assert batch["results"][2]["body"]["detail"][0]["loc"] == ["name"]
+
+    card = client.get(card_url, headers=auth_headers).json()
+    assert card["name"] == "Renamed"
+    assert client.get(f"/boards/{board_id}", headers=auth_headers).json()["name"] == "Renamed board"
+    assert len(published_events) == 1
+
+
+def test_batch_atomic(client, auth_headers, db_session, fill_data, published_events):
+    """
+    Verifies that, with `atomic`, the first failing operation rolls back the whole batch.
+    """
+    board_id, list_id, card_id = get_ids(db_session)
+    card_url = f"/boards/{board_id}/lists/{list_id}/cards/{card_id}"
+
+    response = client.post("/batch", json={"atomic": True, "operations": [
+        {"method": "PATCH", "path": card_url, "body": {"name": "Renamed"}},
+        {"method": "POST", "path": f"/boards/{board_id}/lists/{list_id}/cards",
+         "body": {"name": "New card"}},
+        {"method": "DELETE", "path": f"/boards/{board_id}/lists/0"},
+        {"method": "PATCH", "path": card_url, "body": {"is_done": True}},
+    ]}, headers=auth_headers)
+
+    batch = response.json()
+    assert not batch["committed"]
+    assert [result["status"] for result in batch["results"]] == [424, 424, 404, 424]
+
+    cards = client.get(f"/boards/{board_id}/lists/{list_id}/cards", headers=auth_headers).json()
+    assert [(card["name"], card["is_done"]) for card in cards] == [
+        ("Task 5", False), ("Task 6", False)]
+    assert published_events == []
+
+
+def test_batch_ownership_lookups(client, auth_headers, db_session, fill_data):
+    """
+    Verifies that the ownership of the board is checked once for many operations on its cards,
+    and that the cards of the other users are still not found.
+    """
+    board_id, list_id, card_id = get_ids(db_session)
+    card_url = f"/boards/{board_id}/lists/{list_id}/cards/{card_id}"
+
+    with count_queries() as statements:
+        response = client.post("/batch", json={"operations": [
+            {"method": "PATCH", "path": card_url, "body": {"name": f"Name {index}"}}
+            for index in range(5)
+        ]}, headers=auth_headers)
+
+    assert [result["body"]["name"] for result in response.json()["results"]] == [
+        f"Name {index}" for index in range(5)]
+    ownership_checks = [statement for statement in statements
+                        if statement.lstrip().startswith("SELECT") and "boards.user_id" in statement]
+    assert len(ownership_checks) == 1
+
+    client.post("/auth/register", json={
+        "username": "other", "email": "other@example.com", "password": "password123"})
+    token = client.post("/auth/login", data={
+        "username": "other", "password": "password123"}).json()["access_token"]
+
+    response = client.post("/batch", json={"operations": [
+        {"method": "PATCH", "path": card_url, "body": {"name": "Stolen"}},
+    ]}, headers={"Authorization": f"Bearer {token}"})
+    assert response.json()["results"][0]["status"] == 404
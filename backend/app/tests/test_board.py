@@ -1,7 +1,10 @@
 from sqlalchemy.orm import joinedload
 
-from ..models import Board, List, Card, Tag
-from .conftest import check_models_count, check_board_count
+from ..core.config import settings
+from ..models import User, Board, List, Card, Tag
+from .. import purge
+from ..routers.boards import get_card_or_404, get_tag_or_404
+from .conftest import check_models_count, check_board_count, count_queries
 
 
 # --- BOARDS TESTS ---
@@ -137,6 +140,85 @@ def test_board_cascade(client, auth_headers, db_session, fill_data):
     check_models_count(db, expected_models_count)
 
 
+def test_board_delete_database_cascade(client, auth_headers, db_session, fill_data):
+    """
+    Verifies that the children of a deleted board are deleted by the database (ON DELETE CASCADE):
+    a single DELETE statement, without loading them.
+    """
+    board_id = db_session.query(Board).filter(
+        Board.name == "First Board").first().id
+
+    with count_queries() as statements:
+        response = client.delete(f"/boards/{board_id}", headers=auth_headers)
+    assert response.status_code == 204
+
+    assert [s for s in statements if s.startswith("DELETE")] == [
+        s for s in statements if s.startswith("DELETE FROM boards")]
+    assert not [s for s in statements if s.startswith("SELECT") and "FROM cards" in s]
+
+    check_models_count(db_session, {Board: 2, Tag: 5, List: 2, Card: 6})
+
+
+def test_board_purge(client, auth_headers, db_session, fill_data, monkeypatch):
+    """
+    Verifies the "purge" delete mode.
+    Scenario: 'First Board' (3 cards) and 'Second Board' (3 cards), boards with more than 2 cards are purged.
+    Action:
+        1. Delete 'First Board' without running the purge.
+        2. Purge the boards left soft deleted, by batches of 2 cards.
+        3. Delete 'Second Board' (purged in the background by the request).
+    Expected Result:
+        - The soft deleted board is hidden from the routes at once, the purge deletes it with its children.
+    """
+    monkeypatch.setattr(settings, "BOARD_DELETE_MODE", "purge")
+    monkeypatch.setattr(settings, "BOARD_PURGE_MIN_CARDS", 2)
+    monkeypatch.setattr(settings, "BOARD_PURGE_BATCH_SIZE", 2)
+
+    first_board_id, second_board_id = [board.id for board in db_session.query(Board).filter(
+        Board.name.in_(["First Board", "Second Board"])).order_by(Board.id)]
+    list_id = db_session.query(List.id).filter(
+        List.board_id == first_board_id).first().id
+
+    # 1. Soft delete
+    purge_board_task = purge.purge_board_task
+
+    async def no_purge(board_id, bind):
+        pass
+    monkeypatch.setattr(purge, "purge_board_task", no_purge)
+
+    response = client.delete(f"/boards/{first_board_id}", headers=auth_headers)
+    assert response.status_code == 204
+
+    assert client.get(f"/boards/{first_board_id}",
+                      headers=auth_headers).status_code == 404
+    assert client.get(f"/boards/{first_board_id}/lists/{list_id}/cards",
+                      headers=auth_headers).status_code == 404
+    assert first_board_id not in [board["id"] for board in client.get(
+        "/boards", headers=auth_headers).json()]
+
+    # Still in the database until purged
+    check_models_count(db_session, {Board: 2, Card: 9})
+    assert db_session.query(Board.id).execution_options(
+        **purge.INCLUDE_DELETED).count() == 3
+
+    # 2. Purge
+    assert purge.purge_deleted_boards(db_session) == [first_board_id]
+    assert db_session.query(Board.id).execution_options(
+        **purge.INCLUDE_DELETED).count() == 2
+    check_models_count(db_session, {Board: 2, Tag: 5, List: 2, Card: 6})
+
+    # 3. Purged by the background task of the request
+    monkeypatch.setattr(purge, "purge_board_task", purge_board_task)
+
+    response = client.delete(f"/boards/{second_board_id}", headers=auth_headers)
+    assert response.status_code == 204
+
+    db_session.expire_all()
+    assert db_session.query(Board.id).execution_options(
+        **purge.INCLUDE_DELETED).count() == 1
+    check_models_count(db_session, {Board: 1, List: 1, Card: 3})
+
+
 def test_default_tag_colors(client, auth_headers, db_session):
     """
     Tests:
@@ -294,6 +376,184 @@ def test_inbox_list_protection(client, auth_headers, db_session):
     assert res.status_code == 403
 
 
+def test_move_list(client, auth_headers):
+    """
+    Verifies the list move, in the same board and to another board.
+    Scenario:
+        Board A: [L1, L2, L3], L1 has a card with the tags "Urgent" (only in Board A) and a default tag.
+        Board B: [M1]
+    Action:
+        1. Move L3 to position 1 of Board A.
+        2. Move L1 to position 1 of Board B.
+    Expected Result:
+        - Board A: [L3, L2], Board B: [L1, M1], numbered 1..n.
+        - The card of L1 has the default tag of Board B and a new "Urgent" tag of Board B.
+    """
+    # 1. Setup
+    board_a = client.post(
+        "/boards/", json={"name": "Board A"}, headers=auth_headers).json()
+    board_b = client.post(
+        "/boards/", json={"name": "Board B"}, headers=auth_headers).json()
+
+    l1, l2, l3 = [client.post(f"/boards/{board_a['id']}/lists", json={
+        "name": name}, headers=auth_headers).json() for name in ["L1", "L2", "L3"]]
+    m1 = client.post(f"/boards/{board_b['id']}/lists",
+                     json={"name": "M1"}, headers=auth_headers).json()
+
+    card = client.post(f"/boards/{board_a['id']}/lists/{l1['id']}/cards",
+                       json={"name": "Card"}, headers=auth_headers).json()
+    urgent = client.post(f"/boards/{board_a['id']}/tags", json={
+        "color": "#111111", "name": "Urgent"}, headers=auth_headers).json()
+    default_tag_a = client.get(
+        f"/boards/{board_a['id']}/tags", headers=auth_headers).json()[0]
+    default_tag_b = client.get(
+        f"/boards/{board_b['id']}/tags", headers=auth_headers).json()[0]
+    assert default_tag_a["color"] == default_tag_b["color"]
+
+    for tag in [urgent, default_tag_a]:
+        client.post(f"/cards/{card['id']}/tags/{tag['id']}",
+                    headers=auth_headers)
+
+    def fetch_lists(board_id):
+        return [(l["id"], l["position"]) for l in client.get(
+            f"/boards/{board_id}/lists", headers=auth_headers).json()]
+
+    # 2. Reorder in the same board
+    res = client.post(f"/boards/{board_a['id']}/lists/{l3['id']}/move",
+                      json={"destination_list_position": 1}, headers=auth_headers)
+    assert res.status_code == 200
+    assert res.json()["position"] == 1
+    assert fetch_lists(board_a["id"]) == [
+        (l3["id"], 1), (l1["id"], 2), (l2["id"], 3)]
+
+    # 3. Move to another board
+    res = client.post(f"/boards/{board_a['id']}/lists/{l1['id']}/move?expand=cards", json={
+        "destination_board_id": board_b["id"], "destination_list_position": 1
+    }, headers=auth_headers)
+    assert res.status_code == 200
+    assert res.json()["board_id"] == board_b["id"]
+    assert [c["id"] for c in res.json()["cards"]] == [card["id"]]
+
+    assert fetch_lists(board_a["id"]) == [(l3["id"], 1), (l2["id"], 2)]
+    assert fetch_lists(board_b["id"]) == [(l1["id"], 1), (m1["id"], 2)]
+
+    # The tags of the card are the ones of Board B, "Urgent" was created there
+    tags_b = client.get(
+        f"/boards/{board_b['id']}/tags", headers=auth_headers).json()
+    urgent_b = [tag for tag in tags_b if tag["name"] == "Urgent"]
+    assert len(urgent_b) == 1 and urgent_b[0]["id"] != urgent["id"]
+
+    moved_card = client.get(
+        f"/boards/{board_b['id']}/lists/{l1['id']}/cards/{card['id']}?expand=tags", headers=auth_headers).json()
+    assert sorted(tag["id"] for tag in moved_card["tags"]) == sorted(
+        [default_tag_b["id"], urgent_b[0]["id"]])
+
+    # The tags of Board A are not touched
+    assert urgent["id"] in [tag["id"] for tag in client.get(
+        f"/boards/{board_a['id']}/tags", headers=auth_headers).json()]
+
+    # 4. Out of range, Inbox and unknown board
+    res = client.post(f"/boards/{board_a['id']}/lists/{l2['id']}/move",
+                      json={"destination_list_position": 3}, headers=auth_headers)
+    assert res.status_code == 400
+
+    inbox = client.get("/inbox", headers=auth_headers).json()
+    res = client.post(f"/boards/{board_a['id']}/lists/{l2['id']}/move",
+                      json={"destination_board_id": inbox["id"]}, headers=auth_headers)
+    assert res.status_code == 403
+
+    res = client.post(f"/boards/{inbox['id']}/lists/{inbox['lists'][0]['id']}/move",
+                      json={"destination_board_id": board_a["id"]}, headers=auth_headers)
+    assert res.status_code == 403
+
+    res = client.post(f"/boards/{board_a['id']}/lists/{l2['id']}/move",
+                      json={"destination_board_id": 99999}, headers=auth_headers)
+    assert res.status_code == 404
+
+
+def test_counters(client, auth_headers, db_session, fill_data):
+    """
+    Verifies that the counters of the lists and boards follow the write routes (see `app.counters`).
+    Scenario: 'First Board' (List 1: Task 4; List 2: Task 5, 6) and 'Second Board' (List 3: Task 7-9).
+    Action: create, complete, move (single, bulk, to another list and board) and delete cards,
+            create, move and delete lists.
+    Expected Result:
+        - After every step the counters are equal to the counts of the rows.
+        - The positions stay 1..n, so the counters give the bottom of the lists and boards.
+    """
+    def check_counters():
+        db_session.expire_all()
+        for board_list in db_session.query(List).all():
+            cards = db_session.query(Card).filter(
+                Card.list_id == board_list.id).all()
+            assert board_list.cards_count == len(cards)
+            assert board_list.done_count == sum(card.is_done for card in cards)
+            assert sorted(card.position for card in cards) == list(
+                range(1, len(cards) + 1))
+
+        for board in db_session.query(Board).all():
+            board_lists = db_session.query(List).filter(
+                List.board_id == board.id).all()
+            assert board.lists_count == len(board_lists)
+            assert board.cards_count == sum(
+                board_list.cards_count for board_list in board_lists)
+            assert sorted(board_list.position for board_list in board_lists) == list(
+                range(1, len(board_lists) + 1))
+
+    first_board_id, second_board_id = [board_id for board_id, in db_session.query(Board.id).filter(
+        Board.name.in_(["First Board", "Second Board"])).order_by(Board.id)]
+    list_1, list_2, list_3 = [db_session.query(List.id).filter(
+        List.name == name).scalar() for name in ["List 1", "List 2", "List 3"]]
+    task_4, task_5, task_6 = [db_session.query(Card.id).filter(
+        Card.name == name).scalar() for name in ["Task 4", "Task 5", "Task 6"]]
+    check_counters()
+
+    # 1. Cards
+    card = client.post(f"/boards/{first_board_id}/lists/{list_1}/cards",
+                       json={"name": "New"}, headers=auth_headers).json()
+    assert card["position"] == 2
+
+    # Setting the same value twice counts once
+    for list_id, card_id, is_done in [(list_2, task_5, True), (list_2, task_5, True),
+                                      (list_1, card["id"], True), (list_1, card["id"], False)]:
+        client.patch(f"/boards/{first_board_id}/lists/{list_id}/cards/{card_id}",
+                     json={"is_done": is_done}, headers=auth_headers)
+    check_counters()
+    assert db_session.get(List, list_2).done_count == 1
+
+    client.post(f"/cards/{task_5}/move",
+                json={"destination_list_id": list_3, "destination_list_position": 1}, headers=auth_headers)
+    client.post("/cards/move", json={"card_ids": [task_4, task_6], "destination_list_id": list_3},
+                headers=auth_headers)
+    check_counters()
+    assert db_session.get(List, list_3).done_count == 1
+    assert db_session.get(Board, first_board_id).cards_count == 1
+
+    client.delete(f"/boards/{second_board_id}/lists/{list_3}/cards/{task_5}",
+                  headers=auth_headers)
+    check_counters()
+    assert db_session.get(List, list_3).done_count == 0
+
+    # 2. Lists
+    new_list = client.post(f"/boards/{first_board_id}/lists",
+                           json={"name": "New list"}, headers=auth_headers).json()
+    assert new_list["position"] == 3
+    assert new_list["cards_count"] == 0
+
+    client.post(f"/boards/{second_board_id}/lists/{list_3}/move",
+                json={"destination_board_id": first_board_id, "destination_list_position": 1}, headers=auth_headers)
+    check_counters()
+    assert db_session.get(Board, first_board_id).lists_count == 4
+    assert db_session.get(Board, second_board_id).cards_count == 0
+
+    client.delete(f"/boards/{first_board_id}/lists/{list_3}",
+                  headers=auth_headers)
+    check_counters()
+
+    board = client.get(f"/boards/{first_board_id}", headers=auth_headers).json()
+    assert (board["lists_count"], board["cards_count"]) == (3, 1)
+
+
 def test_list_cascade(client, auth_headers, db_session, fill_data):
     """
     Tests the CASCADE DELETE functionality of the List model.
@@ -656,3 +916,491 @@ def test_tag_update_void_name(client, auth_headers):
     )
     assert tag_response.status_code == 200
     assert tag_response.json()["name"] == None
+
+
+# --- OWNERSHIP HELPERS TESTS ---
+
+def test_ownership_helpers_single_query(client, auth_headers, db_session):
+    """
+    Verifies that board/list/card/tag ownership is resolved with a single SELECT
+    and that the 404 details are kept for each failing level.
+    """
+    board_id = client.post(
+        "/boards/", json={"name": "Owner Board"}, headers=auth_headers).json()["id"]
+    other_board_id = client.post(
+        "/boards/", json={"name": "Other Board"}, headers=auth_headers).json()["id"]
+    list_id = client.post(
+        f"/boards/{board_id}/lists", json={"name": "L1"}, headers=auth_headers).json()["id"]
+    other_list_id = client.post(
+        f"/boards/{other_board_id}/lists", json={"name": "L2"}, headers=auth_headers).json()["id"]
+    card_id = client.post(
+        f"/boards/{board_id}/lists/{list_id}/cards", json={"name": "C1"}, headers=auth_headers).json()["id"]
+    tag_id = client.get(
+        f"/boards/{board_id}/tags", headers=auth_headers).json()[0]["id"]
+
+    user = db_session.query(User).filter(User.username == "testuser").one()
+
+    db_session.expunge_all()
+    with count_queries() as statements:
+        card = get_card_or_404(board_id, list_id, card_id, db_session, user)
+        tag = get_tag_or_404(board_id, tag_id, db_session, user)
+
+    assert card.id == card_id
+    assert tag.id == tag_id
+    assert len(statements) == 2
+
+    def not_found_detail(url):
+        response = client.get(url, headers=auth_headers)
+        assert response.status_code == 404
+        return response.json()["detail"]
+
+    assert not_found_detail(f"/boards/9999/lists/{list_id}/cards/{card_id}") == \
+        "Board with id 9999 not found."
+    assert not_found_detail(f"/boards/{board_id}/lists/9999/cards/{card_id}") == \
+        "List with id 9999 not found."
+    assert not_found_detail(f"/boards/{board_id}/lists/{other_list_id}") == \
+        f"List with id {other_list_id} does not belong to board with id {board_id}."
+    assert not_found_detail(f"/boards/{board_id}/lists/{list_id}/cards/9999") == \
+        "Card with id 9999 not found."
+    assert not_found_detail(f"/boards/{board_id}/tags/9999") == \
+        "Tag with id 9999 not found."
+
+
+def test_board_reads_fixed_queries(client, auth_headers, monkeypatch):
+    """
+    Verifies that the read endpoints run the same number of queries whatever the number of lists, cards or tags.
+    """
+    # The queries of the responses built, not of the cached ones (see `app.cache`)
+    monkeypatch.setattr(settings, "RESPONSE_CACHE_MAX_ENTRIES", 0)
+    board_id = client.post(
+        "/boards/", json={"name": "Big Board"}, headers=auth_headers).json()["id"]
+
+    def add_list_with_cards(name, cards_count):
+        list_id = client.post(
+            f"/boards/{board_id}/lists", json={"name": name}, headers=auth_headers).json()["id"]
+        tag_ids = [tag["id"] for tag in client.get(
+            f"/boards/{board_id}/tags", headers=auth_headers).json()]
+        for i in range(cards_count):
+            card_id = client.post(f"/boards/{board_id}/lists/{list_id}/cards",
+                                  json={"name": f"{name} {i}"}, headers=auth_headers).json()["id"]
+            client.post(f"/cards/{card_id}/tags/{tag_ids[i % len(tag_ids)]}",
+                        headers=auth_headers)
+        return list_id
+
+    list_id = add_list_with_cards("First", 1)
+    tag_id = client.get(f"/boards/{board_id}/tags",
+                        headers=auth_headers).json()[0]["id"]
+    urls = [
+        f"/boards/{board_id}",
+        f"/boards/{board_id}/lists",
+        f"/boards/{board_id}/lists/{list_id}",
+        f"/boards/{board_id}/lists/{list_id}/cards",
+        f"/boards/{board_id}/tags",
+        f"/boards/{board_id}/tags/{tag_id}",
+    ]
+    # Same with every relationship expanded
+    urls += [f"{url}?expand=cards,tags,list" for url in urls]
+
+    def queries_per_url():
+        counts = {}
+        for url in urls:
+            with count_queries() as statements:
+                assert client.get(url, headers=auth_headers).status_code == 200
+            counts[url] = len(statements)
+        return counts
+
+    small_board = queries_per_url()
+
+    add_list_with_cards("Second", 4)
+    add_list_with_cards("First bis", 0)
+    for i in range(4):
+        client.post(f"/boards/{board_id}/lists/{list_id}/cards",
+                    json={"name": f"Extra {i}"}, headers=auth_headers)
+
+    assert queries_per_url() == small_board
+
+
+def test_expand(client, auth_headers, db_session, fill_data):
+    """
+    Verifies the opt-in expansion of the relationships with `?expand=`.
+    Scenario: 'List 2' of 'First Board' (Task 5, 6), Task 5 tagged.
+    Expected Result:
+        - Without `expand` the lists have no cards, the cards no tags nor list, and fewer queries run.
+        - `expand` adds the asked relationships only, nested ones included.
+        - Unknown names are rejected with 400 and the next request is slim again.
+    """
+    board_id, list_id = db_session.query(List.board_id, List.id).filter(
+        List.name == "List 2").one()
+    card_id = db_session.query(Card.id).filter(Card.name == "Task 5").scalar()
+    tag_id = client.get(f"/boards/{board_id}/tags",
+                        headers=auth_headers).json()[0]["id"]
+    client.post(f"/cards/{card_id}/tags/{tag_id}", headers=auth_headers)
+    list_url = f"/boards/{board_id}/lists/{list_id}"
+    card_url = f"{list_url}/cards/{card_id}"
+
+    def get(url, expand=None):
+        with count_queries() as statements:
+            response = client.get(url, params={"expand": expand} if expand else None,
+                                  headers=auth_headers)
+        assert response.status_code == 200
+        return response.json(), len(statements)
+
+    # 1. Slim by default
+    slim_list, slim_queries = get(list_url)
+    assert "cards" not in slim_list
+    assert slim_list["cards_count"] == 2
+    card, _ = get(card_url)
+    assert "tags" not in card and "list" not in card
+
+    # 2. Expanded
+    cards_list, cards_queries = get(list_url, "cards")
+    assert [c["name"] for c in cards_list["cards"]] == ["Task 5", "Task 6"]
+    assert all("tags" not in c for c in cards_list["cards"])
+    assert cards_queries > slim_queries
+
+    full_list, _ = get(list_url, "cards,tags")
+    assert [t["id"] for t in full_list["cards"][0]["tags"]] == [tag_id]
+
+    card, _ = get(card_url, "tags,list")
+    assert [t["id"] for t in card["tags"]] == [tag_id]
+    assert card["list"]["id"] == list_id
+
+    # 3. Unknown expansion, then back to the default shape
+    response = client.get(list_url, params={"expand": "cards,owner"},
+                          headers=auth_headers)
+    assert response.status_code == 400
+    assert "cards" not in get(list_url)[0]
+
+
+def test_user_boards_stats(client, auth_headers, db_session, fill_data):
+    """
+    Verifies the dashboard mode of `GET /boards`.
+    Scenario: 'First Board' (Task 4, 5, 6) and 'Second Board' (Task 7, 8, 9).
+    Action: Complete Task 4, give Task 5 a past due date and Task 6 a future one,
+            complete Task 7 with a past due date, tag Task 4 and Task 5 with the first tag.
+    Expected Result:
+        - The counts of cards, done and overdue cards (not done and past due) per board.
+        - The number of cards of each tag, with the tags without cards.
+        - A single query whatever the number of boards.
+    """
+    first_board_id, second_board_id = [board_id for board_id, in db_session.query(Board.id).filter(
+        Board.name.in_(["First Board", "Second Board"])).order_by(Board.id)]
+
+    def update_card(board_id, name, **data):
+        card_id, list_id = db_session.query(Card.id, Card.list_id).filter(
+            Card.name == name).one()
+        client.patch(f"/boards/{board_id}/lists/{list_id}/cards/{card_id}",
+                     json=data, headers=auth_headers)
+        return card_id
+
+    task_4 = update_card(first_board_id, "Task 4", is_done=True)
+    task_5 = update_card(first_board_id, "Task 5", due_date="2000-01-01T00:00:00")
+    update_card(first_board_id, "Task 6", due_date="2999-01-01T00:00:00")
+    update_card(second_board_id, "Task 7", is_done=True,
+                due_date="2000-01-01T00:00:00")
+
+    tag_id = client.get(f"/boards/{first_board_id}/tags",
+                        headers=auth_headers).json()[0]["id"]
+    for card_id in [task_4, task_5]:
+        client.post(f"/cards/{card_id}/tags/{tag_id}", headers=auth_headers)
+
+    with count_queries() as statements:
+        response = client.get("/boards?stats=true", headers=auth_headers)
+    assert response.status_code == 200
+    assert len(statements) == 1
+
+    first_board, second_board = response.json()
+    assert (first_board["id"], second_board["id"]) == (
+        first_board_id, second_board_id)
+    assert (first_board["cards_count"], first_board["done_count"],
+            first_board["overdue_count"]) == (3, 1, 1)
+    assert (second_board["cards_count"], second_board["done_count"],
+            second_board["overdue_count"]) == (3, 1, 0)
+
+    assert len(first_board["tags"]) == 5
+    assert [(tag["id"], tag["cards_count"]) for tag in first_board["tags"] if tag["cards_count"]] == [
+        (tag_id, 2)]
+    assert all(tag["cards_count"] == 0 for tag in second_board["tags"])
+
+    # Without the option: only the boards
+    assert set(client.get("/boards", headers=auth_headers).json()[0]) == {
+        "id", "name", "description", "image_url"}
+
+
+# --- CONDITIONAL GET TESTS ---
+
+def test_board_etag(client, auth_headers, db_session, fill_data):
+    """
+    Tests:
+    1. Board reads send an ETag and answer a matching `If-None-Match` with 304, without loading the tree.
+    2. Every write on the board, its lists, cards and tags changes the ETag.
+    3. Moving a card to another board changes the ETag of both boards.
+    4. The boards collection changes its ETag when a board is added or updated.
+    """
+    first_board, second_board = db_session.query(Board).filter(
+        Board.is_inbox == False).order_by(Board.id).all()
+    board_id = first_board.id
+    list_id = client.get(f"/boards/{board_id}/lists",
+                         headers=auth_headers).json()[0]["id"]
+
+    def etag(url):
+        response = client.get(url, headers=auth_headers)
+        assert response.status_code == 200
+        return response.headers["ETag"]
+
+    def is_modified(url, etag):
+        response = client.get(
+            url, headers={**auth_headers, "If-None-Match": etag})
+        assert response.status_code in (200, 304)
+        return response.status_code == 200
+
+    # 1. Not modified
+    board_url = f"/boards/{board_id}"
+    urls = [
+        board_url,
+        f"{board_url}/snapshot",
+        f"{board_url}/lists",
+        f"{board_url}/lists/{list_id}",
+        f"{board_url}/lists/{list_id}/cards",
+    ]
+    for url in urls:
+        url_etag = etag(url)
+        with count_queries() as statements:
+            assert not is_modified(url, url_etag)
+        assert not any("FROM cards" in statement for statement in statements)
+
+    assert not is_modified(board_url, f'W/{etag(board_url)}, "other"')
+
+    # 2. Writes on the board
+    writes = [
+        lambda: client.patch(board_url, json={"name": "Renamed"}, headers=auth_headers),
+        lambda: client.post(f"{board_url}/lists", json={"name": "New"}, headers=auth_headers),
+        lambda: client.post(f"{board_url}/lists/{list_id}/cards",
+                            json={"name": "New"}, headers=auth_headers),
+        lambda: client.post(f"{board_url}/tags", json={"color": "#ffffff"}, headers=auth_headers),
+    ]
+    for write in writes:
+        current_etag = etag(board_url)
+        assert write().status_code in (200, 201)
+        assert is_modified(board_url, current_etag)
+
+    card_id = client.get(f"{board_url}/lists/{list_id}/cards",
+                         headers=auth_headers).json()[0]["id"]
+    tag_id = client.get(f"{board_url}/tags", headers=auth_headers).json()[0]["id"]
+
+    current_etag = etag(board_url)
+    client.post(f"/cards/{card_id}/tags/{tag_id}", headers=auth_headers)
+    assert is_modified(board_url, current_etag)
+
+    # 3. Move to another board
+    second_board_url = f"/boards/{second_board.id}"
+    destination_list_id = client.get(f"{second_board_url}/lists",
+                                     headers=auth_headers).json()[0]["id"]
+    etags = etag(board_url), etag(second_board_url)
+
+    response = client.post(f"/cards/{card_id}/move", json={
+        "destination_list_id": destination_list_id}, headers=auth_headers)
+    assert response.status_code == 200
+    assert is_modified(board_url, etags[0])
+    assert is_modified(second_board_url, etags[1])
+
+    # 4. Boards collection
+    boards_etag = etag("/boards")
+    assert not is_modified("/boards", boards_etag)
+
+    client.patch(second_board_url, json={"name": "Renamed"}, headers=auth_headers)
+    assert is_modified("/boards", boards_etag)
+
+    boards_etag = etag("/boards")
+    client.post("/boards", json={"name": "Third Board"}, headers=auth_headers)
+    assert is_modified("/boards", boards_etag)
+
+
+# --- SNAPSHOT TESTS ---
+
+def test_board_snapshot(client, auth_headers, db_session, fill_data):
+    """
+    Tests:
+    1. The snapshot returns the board with its tags, ordered lists and ordered cards (with tags).
+    2. The snapshot matches what the per-resource routes return.
+    3. The number of queries does not depend on the size of the board.
+    4. Other users and unknown boards get a 404.
+    """
+    board_id = db_session.query(Board).filter(
+        Board.name == "First Board").first().id
+    lists = client.get(f"/boards/{board_id}/lists", params={"expand": "cards"},
+                       headers=auth_headers).json()
+    tag_id = client.get(f"/boards/{board_id}/tags",
+                        headers=auth_headers).json()[0]["id"]
+
+    card_id = lists[1]["cards"][1]["id"]
+    client.post(f"/cards/{card_id}/tags/{tag_id}", headers=auth_headers)
+
+    # 1. Structure
+    with count_queries() as statements:
+        response = client.get(
+            f"/boards/{board_id}/snapshot", headers=auth_headers)
+    assert response.status_code == 200
+    snapshot = response.json()
+    small_board_queries = len(statements)
+
+    assert snapshot["name"] == "First Board"
+    assert len(snapshot["tags"]) == 5
+    assert [l["name"] for l in snapshot["lists"]] == ["List 1", "List 2"]
+    assert [[c["name"] for c in l["cards"]] for l in snapshot["lists"]] == [
+        ["Task 4"], ["Task 5", "Task 6"]]
+    assert [t["id"] for t in snapshot["lists"][1]["cards"][1]["tags"]] == [tag_id]
+
+    # 2. Same data as the per-resource routes
+    for snapshot_list in snapshot["lists"]:
+        cards = client.get(
+            f"/boards/{board_id}/lists/{snapshot_list['id']}/cards?expand=tags", headers=auth_headers).json()
+        assert [{key: card[key] for key in snapshot_list["cards"][0]} for card in cards] == \
+            snapshot_list["cards"]
+
+    # 3. Fixed number of queries
+    list_id = snapshot["lists"][0]["id"]
+    for i in range(5):
+        client.post(f"/boards/{board_id}/lists/{list_id}/cards",
+                    json={"name": f"Extra {i}"}, headers=auth_headers)
+    client.post(f"/boards/{board_id}/lists",
+                json={"name": "List 3"}, headers=auth_headers)
+
+    with count_queries() as statements:
+        snapshot = client.get(
+            f"/boards/{board_id}/snapshot", headers=auth_headers).json()
+    assert len(statements) == small_board_queries
+    assert len(snapshot["lists"]) == 3
+    assert len(snapshot["lists"][0]["cards"]) == 6
+
+    # 4. Not found
+    response = client.get("/boards/9999/snapshot", headers=auth_headers)
+    assert response.status_code == 404
+
+    client.post("/auth/register", json={
+        "username": "other", "email": "other@example.com", "password": "password123"})
+    token = client.post("/auth/login", data={
+        "username": "other", "password": "password123"}).json()["access_token"]
+    response = client.get(f"/boards/{board_id}/snapshot",
+                          headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 404
+
+
+# --- CHANGES TESTS ---
+
+def normalize_snapshot(snapshot: dict) -> dict:
+    """
+    Flatten a snapshot to lists, cards (with their list id) and tags by id, as a sync client would keep them.
+    """
+    return {
+        "lists": {l["id"]: {key: value for key, value in l.items() if key != "cards"}
+                  for l in snapshot["lists"]},
+        "cards": {c["id"]: {**c, "list_id": l["id"]}
+                  for l in snapshot["lists"] for c in l["cards"]},
+        "tags": {t["id"]: t for t in snapshot["tags"]},
+    }
+
+
+def apply_changes(replica: dict, changes: dict):
+    """
+    Apply the response of `/changes` to a normalized replica (deletions first).
+    """
+    for deleted in changes["deleted"]:
+        replica[f"{deleted['entity']}s"].pop(deleted["id"], None)
+
+        if deleted["entity"] == "list":
+            replica["cards"] = {card_id: card for card_id, card in replica["cards"].items()
+                                if card["list_id"] != deleted["id"]}
+        if deleted["entity"] == "tag":
+            for card in replica["cards"].values():
+                card["tags"] = [t for t in card["tags"] if t["id"] != deleted["id"]]
+
+    for board_list in changes["lists"]:
+        replica["lists"][board_list["id"]] = {
+            key: value for key, value in board_list.items() if key != "board_id"}
+    for card in changes["cards"]:
+        replica["cards"][card["id"]] = card
+    for tag in changes["tags"]:
+        replica["tags"][tag["id"]] = tag
+        for card in replica["cards"].values():
+            card["tags"] = [tag if t["id"] == tag["id"] else t for t in card["tags"]]
+
+
+def test_board_changes(client, auth_headers, db_session, fill_data):
+    """
+    Tests:
+    1. Nothing changed: empty changes and the same cursor.
+    2. Only the changed rows are sent, and applying them to a replica gives the current board,
+       for every kind of write (including deletions and moves to another board).
+    3. `since=0` sends the whole board.
+    4. A cursor ahead of the board is rejected.
+    """
+    first_board, second_board = db_session.query(Board).filter(
+        Board.is_inbox == False).order_by(Board.id).all()
+    board_url = f"/boards/{first_board.id}"
+
+    def get_snapshot(url=board_url):
+        return client.get(f"{url}/snapshot", headers=auth_headers).json()
+
+    def get_changes(since, url=board_url):
+        response = client.get(f"{url}/changes", params={"since": since},
+                              headers=auth_headers)
+        assert response.status_code == 200
+        return response.json()
+
+    snapshot = get_snapshot()
+    cursor = snapshot["cursor"]
+    replica = normalize_snapshot(snapshot)
+
+    # 1. No changes
+    changes = get_changes(cursor)
+    assert changes == {"cursor": cursor, "board": None, "lists": [],
+                       "cards": [], "tags": [], "deleted": []}
+
+    # 2. Writes
+    first_list, second_list = snapshot["lists"]
+    card_id = second_list["cards"][0]["id"]
+    tag_id = snapshot["tags"][0]["id"]
+    destination_list_id = get_snapshot(
+        f"/boards/{second_board.id}")["lists"][0]["id"]
+
+    writes = [
+        lambda: client.patch(f"{board_url}/lists/{first_list['id']}/cards/{first_list['cards'][0]['id']}",
+                             json={"name": "Renamed"}, headers=auth_headers),
+        lambda: client.post(f"/cards/{card_id}/tags/{tag_id}", headers=auth_headers),
+        lambda: client.post(f"/cards/{card_id}/move", json={
+            "destination_list_id": first_list["id"], "destination_list_position": 1}, headers=auth_headers),
+        lambda: client.patch(f"{board_url}/tags/{tag_id}", json={"name": "Urgent"}, headers=auth_headers),
+        lambda: client.delete(f"{board_url}/tags/{tag_id}", headers=auth_headers),
+        lambda: client.post(f"{board_url}/lists", json={"name": "New"}, headers=auth_headers),
+        lambda: client.delete(f"{board_url}/lists/{second_list['id']}", headers=auth_headers),
+        lambda: client.post(f"/cards/{card_id}/move", json={
+            "destination_list_id": destination_list_id}, headers=auth_headers),
+    ]
+
+    for write in writes:
+        assert write().status_code < 300
+
+        changes = get_changes(cursor)
+        assert changes["cursor"] > cursor
+        assert changes["board"]["id"] == first_board.id
+        # Only the changed rows (at most the moved card and the cards it shifted), never the whole board
+        assert len(changes["cards"]) <= 3
+
+        apply_changes(replica, changes)
+        assert replica == normalize_snapshot(get_snapshot())
+        cursor = changes["cursor"]
+
+    # The moved card is in the other board
+    changes = get_changes(0, f"/boards/{second_board.id}")
+    assert card_id in [card["id"] for card in changes["cards"]]
+
+    # 3. Whole board
+    replica = {"lists": {}, "cards": {}, "tags": {}}
+    apply_changes(replica, get_changes(0))
+    assert replica == normalize_snapshot(get_snapshot())
+
+    # 4. Cursor ahead
+    response = client.get(f"{board_url}/changes", params={"since": cursor + 1},
+                          headers=auth_headers)
+    assert response.status_code == 400
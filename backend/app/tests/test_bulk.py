@@ -0,0 +1,156 @@
+"""
+Bulk card creation and board import (see `app.bulk`).
+"""
+import orjson
+
+from ..core.config import settings
+from ..models import Board, List
+from .conftest import count_queries
+
+NDJSON = {"Content-Type": "application/x-ndjson"}
+
+
+def ndjson(*documents, split: int = 7):
+    """
+    NDJSON body sent in small chunks, cutting the lines (as received from the network).
+    """
+    body = b"".join(orjson.dumps(document) + b"\n" for document in documents)
+    return (body[start:start + split] for start in range(0, len(body), split))
+
+
+def test_bulk_create_cards(client, auth_headers, db_session, fill_data, monkeypatch):
+    """
+    Verifies that the cards are created at the bottom of the list, in order, with their tags,
+    by chunks of `BULK_INSERT_CHUNK_SIZE`, and that the counters follow.
+    """
+    monkeypatch.setattr(settings, "BULK_INSERT_CHUNK_SIZE", 2)
+    board_id, list_id = db_session.query(List.board_id, List.id).filter(
+        List.name == "List 2").one()
+    tag_id = client.get(f"/boards/{board_id}/tags", headers=auth_headers).json()[0]["id"]
+
+    cards = [{"name": f"Bulk {index}", "is_done": index % 2 == 0} for index in range(5)]
+    cards[1] |= {"text": "Tab\tand\nnew line", "due_date": "2030-01-02T03:04:05", "tag_ids": [tag_id]}
+
+    with count_queries() as statements:
+        response = client.post(f"/boards/{board_id}/lists/{list_id}/cards:bulk",
+                               content=ndjson(*cards), headers=auth_headers | NDJSON)
+
+    assert response.status_code == 201
+    assert response.json() == {"list_id": list_id, "created": 5, "cards_count": 7}
+    assert len([statement for statement in statements
+                if statement.startswith("INSERT INTO cards")]) == 3
+
+    board_list = client.get(f"/boards/{board_id}/lists/{list_id}?expand=cards",
+                            headers=auth_headers).json()
+    assert [card["name"] for card in board_list["cards"]] == [
+        "Task 5", "Task 6", *[card["name"] for card in cards]]
+    assert [card["position"] for card in board_list["cards"]] == list(range(1, 8))
+    assert (board_list["cards_count"], board_list["done_count"]) == (7, 3)
+
+    card = client.get(f"/boards/{board_id}/lists/{list_id}/cards/{board_list['cards'][3]['id']}?expand=tags",
+                      headers=auth_headers).json()
+    assert card["text"] == "Tab\tand\nnew line"
+    assert card["due_date"] == "2030-01-02T03:04:05"
+    assert [tag["id"] for tag in card["tags"]] == [tag_id]
+
+    board = client.get(f"/boards/{board_id}", headers=auth_headers).json()
+    assert board["cards_count"] == 8
+
+    # Fractional ranks: after the last card
+    monkeypatch.setattr(settings, "CARD_POSITION_MODE", "fractional")
+    client.post(f"/cards/{board_list['cards'][0]['id']}/move", json={
+        "destination_list_id": list_id, "destination_list_position": 7}, headers=auth_headers)
+    client.post(f"/boards/{board_id}/lists/{list_id}/cards:bulk",
+                content=ndjson({"name": "Last"}), headers=auth_headers | NDJSON)
+    names = [card["name"] for card in client.get(
+        f"/boards/{board_id}/lists/{list_id}/cards", headers=auth_headers).json()]
+    assert names[-2:] == ["Task 5", "Last"]
+
+
+def test_bulk_create_cards_errors(client, auth_headers, db_session, fill_data):
+    """
+    Verifies that an invalid line or an unknown tag creates no card.
+    """
+    board_id, list_id = db_session.query(List.board_id, List.id).filter(
+        List.name == "List 2").one()
+    url = f"/boards/{board_id}/lists/{list_id}/cards:bulk"
+
+    response = client.post(url, content=ndjson({"name": "A"}, {"name": "B"}, {"name": ""}),
+                           headers=auth_headers | NDJSON)
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"] == ["body", 3, "name"]
+
+    response = client.post(url, content=ndjson({"name": "A"}, {"name": "B", "tag_ids": [0]}),
+                           headers=auth_headers | NDJSON)
+    assert response.status_code == 404
+
+    response = client.post(f"/boards/{board_id}/lists/0/cards:bulk",
+                           content=ndjson({"name": "A"}), headers=auth_headers | NDJSON)
+    assert response.status_code == 404
+
+    cards = client.get(f"/boards/{board_id}/lists/{list_id}/cards", headers=auth_headers).json()
+    assert [card["name"] for card in cards] == ["Task 5", "Task 6"]
+
+
+def test_import_board(client, auth_headers, db_session, fill_data, monkeypatch):
+    """
+    Verifies that a board tree is imported with its tags, lists, cards and tag links, in order.
+    """
+    monkeypatch.setattr(settings, "BULK_INSERT_CHUNK_SIZE", 2)
+    response = client.post("/boards:import", content=ndjson(
+        {"name": "Imported", "description": "Backlog",
+         "tags": [{"ref": "bug", "name": "Bug", "color": "#d62828"}, {"ref": "ux", "color": "#00b4d8"}]},
+        {"name": "To do", "cards": [
+            {"name": "One", "tags": ["bug", "ux"]},
+            {"name": "Two", "is_done": True},
+            {"name": "Three", "tags": ["ux"]},
+        ]},
+        {"name": "Empty"},
+        {"name": "Done", "cards": [{"name": "Four", "is_done": True}]},
+    ), headers=auth_headers | NDJSON)
+
+    assert response.status_code == 201
+    board = response.json()
+    assert (board["name"], board["description"]) == ("Imported", "Backlog")
+    assert (board["lists_count"], board["cards_count"]) == (3, 4)
+    assert [tag["name"] for tag in board["tags"]] == ["Bug", None]
+
+    lists = client.get(f"/boards/{board['id']}/lists?expand=cards",
+                       headers=auth_headers).json()
+    assert [(board_list["name"], board_list["cards_count"], board_list["done_count"])
+            for board_list in lists] == [("To do", 3, 1), ("Empty", 0, 0), ("Done", 1, 1)]
+    assert [card["name"] for card in lists[0]["cards"]] == ["One", "Two", "Three"]
+
+    cards = client.get(f"/boards/{board['id']}/lists/{lists[0]['id']}/cards?expand=tags",
+                       headers=auth_headers).json()
+    assert [[tag["name"] for tag in card["tags"]] for card in cards] == [["Bug", None], [], [None]]
+
+    boards = client.get("/boards", headers=auth_headers).json()
+    assert boards[-1]["name"] == "Imported"
+
+
+def test_import_board_errors(client, auth_headers, db_session, fill_data):
+    """
+    Verifies that an invalid import creates nothing.
+    """
+    def boards_count():
+        return db_session.query(Board).filter(Board.is_inbox == False).count()
+
+    before = boards_count()
+
+    response = client.post("/boards:import", content=ndjson(
+        {"name": "Imported", "tags": [{"ref": "bug", "color": "#d62828"}]},
+        {"name": "To do", "cards": [{"name": "One", "tags": ["feature"]}]},
+    ), headers=auth_headers | NDJSON)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Unknown tag ref: feature"
+
+    response = client.post("/boards:import", content=ndjson(
+        {"name": "Imported"}, {"cards": []}), headers=auth_headers | NDJSON)
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"] == ["body", 2, "name"]
+
+    response = client.post("/boards:import", content=b"", headers=auth_headers | NDJSON)
+    assert response.status_code == 422
+
+    assert boards_count() == before
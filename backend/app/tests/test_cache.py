@@ -0,0 +1,181 @@
+"""
+Cache of the encoded responses of the board reads (see `app.cache`).
+"""
+import pytest
+
+from ..cache import (
+    CachedResponse, InMemoryResponseCache, SQLiteResponseCache, set_response_cache
+)
+from ..core.config import settings
+from ..models import Board, List
+from .conftest import count_queries
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def response_cache(request, tmp_path):
+    """
+    Serve the app with each cache backend.
+    """
+    if request.param == "memory":
+        cache = InMemoryResponseCache()
+    else:
+        cache = SQLiteResponseCache(str(tmp_path / "cache.sqlite3"))
+
+    set_response_cache(cache)
+    yield cache
+    set_response_cache(None)
+
+
+def entry(body: bytes, *scopes: str) -> CachedResponse:
+    return CachedResponse(body, {}, frozenset(scopes))
+
+
+def test_cached_reads_and_invalidation(client, auth_headers, db_session, fill_data, response_cache):
+    """
+    Tests:
+    1. A read served again runs no query, and answers `If-None-Match` with 304.
+    2. A change of a board invalidates its reads, not the ones of the other boards.
+    3. Creating and deleting a board invalidates `GET /boards`.
+    """
+    first_id, list_id = db_session.query(List.board_id, List.id).filter(
+        List.name == "List 1").one()
+    second_id = db_session.query(Board.id).filter(
+        Board.name == "Second Board").scalar()
+
+    def get(url, headers=None):
+        with count_queries() as statements:
+            response = client.get(url, headers=auth_headers | (headers or {}))
+        return response, len(statements)
+
+    urls = ["/boards", "/inbox", f"/boards/{first_id}", f"/boards/{first_id}/lists?expand=cards",
+            f"/boards/{first_id}/tags", f"/boards/{second_id}/lists"]
+
+    # 1. Cached
+    built = {url: get(url)[0] for url in urls}
+    for url in urls:
+        response, queries = get(url)
+        assert queries == 0
+        assert response.json() == built[url].json()
+        assert response.headers.get("ETag") == built[url].headers.get("ETag")
+
+    etag = built[f"/boards/{first_id}"].headers["ETag"]
+    response, queries = get(f"/boards/{first_id}", {"If-None-Match": etag})
+    assert response.status_code == 304 and queries == 0
+
+    # 2. Change of the first board
+    client.post(f"/boards/{first_id}/lists/{list_id}/cards",
+                json={"name": "New card"}, headers=auth_headers)
+
+    response, queries = get(f"/boards/{first_id}/lists?expand=cards")
+    assert queries > 0
+    assert [card["name"] for card in response.json()[0]["cards"]] == ["Task 4", "New card"]
+    assert get(f"/boards/{first_id}/tags")[1] > 0
+    assert get(f"/boards/{second_id}/lists")[1] == 0
+    assert get("/inbox")[1] == 0
+
+    # 3. Boards of the user
+    board = client.post("/boards", json={"name": "Third Board"}, headers=auth_headers).json()
+    assert [b["name"] for b in get("/boards")[0].json()] == [
+        "First Board", "Second Board", "Third Board"]
+
+    client.delete(f"/boards/{second_id}", headers=auth_headers)
+    assert [b["id"] for b in get("/boards")[0].json()] == [first_id, board["id"]]
+    assert get(f"/boards/{second_id}/lists")[0].status_code == 404
+
+
+def test_cached_reads_per_user(client, auth_headers, db_session, fill_data, response_cache):
+    """
+    Verifies that the cached responses of a user are not served to another one.
+    """
+    board_id = db_session.query(Board.id).filter(
+        Board.name == "First Board").scalar()
+    assert client.get(f"/boards/{board_id}", headers=auth_headers).status_code == 200
+
+    client.post("/auth/register", json={
+        "username": "other", "email": "other@example.com", "password": "password123"})
+    token = client.post("/auth/login", data={
+        "username": "other", "password": "password123"}).json()["access_token"]
+
+    response = client.get(f"/boards/{board_id}", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 404
+
+
+def test_stale_while_revalidate(client, auth_headers, db_session, fill_data, response_cache, monkeypatch):
+    """
+    Verifies that, with `RESPONSE_CACHE_STALE_SECONDS`, the first request after an invalidation
+    rebuilds the entry while the other ones get the stale response.
+    """
+    monkeypatch.setattr(settings, "RESPONSE_CACHE_STALE_SECONDS", 30)
+    board_id, list_id = db_session.query(List.board_id, List.id).filter(
+        List.name == "List 1").one()
+    user_id = client.get("/users/me", headers=auth_headers).json()["id"]
+    lists_url = f"/boards/{board_id}/lists?expand=cards"
+
+    before = client.get(lists_url, headers=auth_headers).json()
+    assert client.get(f"/boards/{board_id}", headers=auth_headers).json()["name"] == "First Board"
+    client.post(f"/boards/{board_id}/lists/{list_id}/cards",
+                json={"name": "New card"}, headers=auth_headers)
+    client.patch(f"/boards/{board_id}", json={"name": "Renamed"}, headers=auth_headers)
+
+    # Another request is rebuilding the lists
+    assert response_cache.claim_revalidation(f"{user_id}:/boards/{board_id}/lists?expand=cards", 30)
+    assert client.get(lists_url, headers=auth_headers).json() == before
+
+    # First request after the change: rebuilt
+    assert client.get(f"/boards/{board_id}", headers=auth_headers).json()["name"] == "Renamed"
+
+
+def test_response_cache_backend(response_cache):
+    """
+    Tests the backends:
+    1. A response read before an invalidation of its scopes is not stored.
+    2. Invalidation by scope, with or without keeping the entries as stale.
+    3. Only one request at a time revalidates a stale entry.
+    """
+    # 1. Read, then invalidated, then stored
+    since = response_cache.sequence()
+    response_cache.invalidate(["board:1"])
+    assert not response_cache.set("a", entry(b"a", "board:1"), since)
+    assert response_cache.set("a", entry(b"a", "board:1"), response_cache.sequence())
+    assert response_cache.set("b", entry(b"b", "board:2"), since)
+
+    # 2. Invalidation
+    response_cache.invalidate(["board:2"])
+    assert response_cache.get("b") is None
+    assert response_cache.get("a").body == b"a"
+
+    response_cache.invalidate(["board:1"], keep_stale=True)
+    stale = response_cache.get("a")
+    assert stale.body == b"a" and stale.stale_since is not None
+
+    # 3. Revalidation
+    assert response_cache.claim_revalidation("a", 30)
+    assert not response_cache.claim_revalidation("a", 30)
+    assert response_cache.set("a", entry(b"new", "board:1"), response_cache.sequence())
+    assert response_cache.get("a").stale_since is None
+
+
+def test_response_cache_bounds(tmp_path):
+    """
+    Verifies that the least recently used entries are evicted over the entries and bytes limits,
+    and that the SQLite backend is shared by the processes using the same file.
+    """
+    for cache in (InMemoryResponseCache(max_entries=2, max_bytes=10),
+                  SQLiteResponseCache(str(tmp_path / "cache.sqlite3"), max_entries=2, max_bytes=10)):
+        cache.set("a", entry(b"aaaa"), 0)
+        cache.set("b", entry(b"bbbb"), 0)
+        cache.get("a")
+        cache.set("c", entry(b"cccc"), 0)
+        assert cache.get("b") is None
+        assert cache.get("a") and cache.get("c")
+
+        cache.set("d", entry(b"dddddddd"), 0)
+        assert cache.get("d") and cache.get("a") is None and cache.get("c") is None
+        assert not cache.set("e", entry(b"e" * 11), 0)
+
+    # Another worker of the host
+    other = SQLiteResponseCache(str(tmp_path / "cache.sqlite3"), max_entries=2, max_bytes=10)
+    assert other.get("d").body == b"dddddddd"
+    cache.set("f", entry(b"f", "board:1"), cache.sequence())
+    other.invalidate(["board:1"])
+    assert cache.get("f") is None
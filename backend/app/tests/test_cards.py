@@ -1,3 +1,8 @@
+from ..core.config import settings
+from .. import ranking
+from .conftest import count_queries
+
+
 # --- CARD ISOLATED OPERATIONS ---
 
 def test_card_due_date(client, auth_headers):
@@ -207,6 +212,241 @@ def test_move_card_security(client, auth_headers):
     assert res.status_code == 403
 
 
+def test_move_card_fractional(client, auth_headers, monkeypatch):
+    """
+    Verifies the "fractional" position mode.
+    Scenario:
+        List A: [A1, A2, A3]
+        List B: [B1]
+    Action:
+        1. Move A1 to position 2 of List A.
+        2. Move A3 to List B, position 1.
+    Expected Result:
+        - Only the moved card changes its position.
+        - List A: [A2, A1], List B: [A3, B1]
+    """
+    monkeypatch.setattr(settings, "CARD_POSITION_MODE", "fractional")
+
+    # 1. Setup
+    board_id = client.post(
+        "/boards/", json={"name": "Rank Board"}, headers=auth_headers).json()["id"]
+    list_a = client.post(
+        f"/boards/{board_id}/lists", json={"name": "List A"}, headers=auth_headers).json()
+    list_b = client.post(
+        f"/boards/{board_id}/lists", json={"name": "List B"}, headers=auth_headers).json()
+
+    a1, a2, a3 = [client.post(f"/boards/{board_id}/lists/{list_a['id']}/cards", json={
+        "name": name}, headers=auth_headers).json() for name in ["A1", "A2", "A3"]]
+    b1 = client.post(f"/boards/{board_id}/lists/{list_b['id']}/cards", json={
+        "name": "B1"}, headers=auth_headers).json()
+
+    def fetch_cards(list_id):
+        return client.get(
+            f"/boards/{board_id}/lists/{list_id}/cards", headers=auth_headers).json()
+
+    # 2. Move A1 between A2 and A3
+    res = client.post(f"/cards/{a1['id']}/move",
+                      json={"destination_list_id": list_a["id"], "destination_list_position": 2}, headers=auth_headers)
+    assert res.status_code == 200
+    assert res.json()["position"] == 2.5
+
+    cards = fetch_cards(list_a["id"])
+    assert [c["name"] for c in cards] == ["A2", "A1", "A3"]
+    assert {c["name"]: c["position"] for c in cards} == {
+        "A2": 2, "A1": 2.5, "A3": 3}
+
+    # 3. Move A3 at the top of List B
+    res = client.post(f"/cards/{a3['id']}/move",
+                      json={"destination_list_id": list_b["id"], "destination_list_position": 1}, headers=auth_headers)
+    assert res.status_code == 200
+
+    assert [c["id"] for c in fetch_cards(list_a["id"])] == [a2["id"], a1["id"]]
+    cards = fetch_cards(list_b["id"])
+    assert [c["id"] for c in cards] == [a3["id"], b1["id"]]
+    assert cards[1]["position"] == b1["position"]
+
+    # 4. Out of range
+    res = client.post(f"/cards/{a3['id']}/move",
+                      json={"destination_list_id": list_b["id"], "destination_list_position": 3}, headers=auth_headers)
+    assert res.status_code == 400
+
+
+def test_move_card_fractional_rebalance(client, auth_headers, monkeypatch):
+    """
+    Verifies that a list is renumbered to 1..n when the ranks get too dense.
+    Scenario: List with 3 cards [C1, C2, C3].
+    Action: Move the last card to position 2 until the gap is under `REBALANCE_GAP`.
+    Expected Result: [C1, C3, C2] with positions 1, 2, 3.
+    """
+    monkeypatch.setattr(settings, "CARD_POSITION_MODE", "fractional")
+    monkeypatch.setattr(ranking, "REBALANCE_GAP", 0.3)
+
+    board_id = client.post(
+        "/boards/", json={"name": "Rank Board"}, headers=auth_headers).json()["id"]
+    list_id = client.post(
+        f"/boards/{board_id}/lists", json={"name": "List"}, headers=auth_headers).json()["id"]
+    c1, c2, c3 = [client.post(f"/boards/{board_id}/lists/{list_id}/cards", json={
+        "name": name}, headers=auth_headers).json() for name in ["C1", "C2", "C3"]]
+
+    def move_to_second(card):
+        res = client.post(f"/cards/{card['id']}/move",
+                          json={"destination_list_id": list_id, "destination_list_position": 2}, headers=auth_headers)
+        assert res.status_code == 200
+        return res.json()["position"]
+
+    assert move_to_second(c3) == 1.5   # [C1, C3, C2], gap used: 1
+    assert move_to_second(c2) == 1.25  # [C1, C2, C3], gap used: 0.5
+    assert move_to_second(c3) == 1.125  # [C1, C3, C2], gap used: 0.25 -> rebalance
+
+    cards = client.get(
+        f"/boards/{board_id}/lists/{list_id}/cards", headers=auth_headers).json()
+    assert [(c["id"], c["position"]) for c in cards] == [
+        (c1["id"], 1), (c3["id"], 2), (c2["id"], 3)]
+
+
+def test_move_cards_bulk(client, auth_headers):
+    """
+    Verifies the multi-card move.
+    Scenario:
+        List A: [A1, A2, A3, A4]
+        List B: [B1, B2]
+    Action: Move [A3, A1, B2] to List B, position 2.
+    Expected Result:
+        - List A: [A2, A4], List B: [B1, A3, A1, B2], both numbered 1..n.
+        - The cards are written with two UPDATEs, whatever their number.
+    """
+    # 1. Setup
+    board_id = client.post(
+        "/boards/", json={"name": "Bulk Board"}, headers=auth_headers).json()["id"]
+    list_a = client.post(
+        f"/boards/{board_id}/lists", json={"name": "List A"}, headers=auth_headers).json()
+    list_b = client.post(
+        f"/boards/{board_id}/lists", json={"name": "List B"}, headers=auth_headers).json()
+
+    a1, a2, a3, a4 = [client.post(f"/boards/{board_id}/lists/{list_a['id']}/cards", json={
+        "name": name}, headers=auth_headers).json() for name in ["A1", "A2", "A3", "A4"]]
+    b1, b2 = [client.post(f"/boards/{board_id}/lists/{list_b['id']}/cards", json={
+        "name": name}, headers=auth_headers).json() for name in ["B1", "B2"]]
+
+    def fetch_cards(list_id):
+        return [(c["id"], c["position"]) for c in client.get(
+            f"/boards/{board_id}/lists/{list_id}/cards", headers=auth_headers).json()]
+
+    # 2. Move
+    with count_queries() as statements:
+        res = client.post("/cards/move", json={
+            "card_ids": [a3["id"], a1["id"], b2["id"]],
+            "destination_list_id": list_b["id"],
+            "destination_list_position": 2
+        }, headers=auth_headers)
+    assert res.status_code == 200
+    assert [c["id"] for c in res.json()] == [a3["id"], a1["id"], b2["id"]]
+    assert all(c["list_id"] == list_b["id"] for c in res.json())
+    assert len([s for s in statements if s.startswith("UPDATE cards")]) == 2
+
+    assert fetch_cards(list_a["id"]) == [(a2["id"], 1), (a4["id"], 2)]
+    assert fetch_cards(list_b["id"]) == [
+        (b1["id"], 1), (a3["id"], 2), (a1["id"], 3), (b2["id"], 4)]
+
+    # 3. Default position: bottom of the list (the moved cards are not counted)
+    res = client.post("/cards/move", json={
+        "card_ids": [b1["id"], a4["id"]],
+        "destination_list_id": list_b["id"]
+    }, headers=auth_headers)
+    assert res.status_code == 200
+    assert fetch_cards(list_a["id"]) == [(a2["id"], 1)]
+    assert fetch_cards(list_b["id"]) == [
+        (a3["id"], 1), (a1["id"], 2), (b2["id"], 3), (b1["id"], 4), (a4["id"], 5)]
+
+    # 4. Out of range
+    res = client.post("/cards/move", json={
+        "card_ids": [a2["id"]],
+        "destination_list_id": list_b["id"],
+        "destination_list_position": 7
+    }, headers=auth_headers)
+    assert res.status_code == 400
+
+
+def test_move_cards_bulk_security(client, auth_headers):
+    """
+    Verifies that a multi-card move is rejected as a whole if one card or the list is not found or not owned.
+    """
+    board_id = client.post(
+        "/boards/", json={"name": "Mine"}, headers=auth_headers).json()["id"]
+    list_id = client.post(
+        f"/boards/{board_id}/lists", json={"name": "List"}, headers=auth_headers).json()["id"]
+    card_id = client.post(f"/boards/{board_id}/lists/{list_id}/cards",
+                          json={"name": "Card"}, headers=auth_headers).json()["id"]
+
+    client.post("/auth/register", json={
+        "username": "hacker", "email": "hacker@test.com", "password": "password123"})
+    token = client.post(
+        "/auth/login", data={"username": "hacker", "password": "password123"}).json()["access_token"]
+    hacker_headers = {"Authorization": f"Bearer {token}"}
+
+    hacker_board_id = client.post(
+        "/boards/", json={"name": "Other"}, headers=hacker_headers).json()["id"]
+    hacker_list_id = client.post(
+        f"/boards/{hacker_board_id}/lists", json={"name": "List"}, headers=hacker_headers).json()["id"]
+    hacker_card_id = client.post(f"/boards/{hacker_board_id}/lists/{hacker_list_id}/cards",
+                                 json={"name": "Card"}, headers=hacker_headers).json()["id"]
+
+    def move(card_ids, destination_list_id):
+        return client.post("/cards/move", json={
+            "card_ids": card_ids, "destination_list_id": destination_list_id
+        }, headers=auth_headers).status_code
+
+    assert move([card_id, hacker_card_id], list_id) == 403
+    assert move([card_id], hacker_list_id) == 403
+    assert move([card_id, 99999], list_id) == 404
+    assert move([card_id], 99999) == 404
+    assert move([], list_id) == 422
+
+    cards = client.get(
+        f"/boards/{hacker_board_id}/lists/{hacker_list_id}/cards", headers=hacker_headers).json()
+    assert [c["id"] for c in cards] == [hacker_card_id]
+
+
+def test_move_cards_bulk_fractional(client, auth_headers, monkeypatch):
+    """
+    Verifies the multi-card move in "fractional" mode: only the moved cards are written,
+    spread between their new neighbours.
+    Scenario: List A: [A1, A2, A3], List B: [B1, B2]
+    Action: Move [A1, A3] to List B, position 2.
+    Expected Result: List A: [A2], List B: [B1, A1, A3, B2]
+    """
+    monkeypatch.setattr(settings, "CARD_POSITION_MODE", "fractional")
+
+    board_id = client.post(
+        "/boards/", json={"name": "Rank Board"}, headers=auth_headers).json()["id"]
+    list_a = client.post(
+        f"/boards/{board_id}/lists", json={"name": "List A"}, headers=auth_headers).json()
+    list_b = client.post(
+        f"/boards/{board_id}/lists", json={"name": "List B"}, headers=auth_headers).json()
+
+    a1, a2, a3 = [client.post(f"/boards/{board_id}/lists/{list_a['id']}/cards", json={
+        "name": name}, headers=auth_headers).json() for name in ["A1", "A2", "A3"]]
+    b1, b2 = [client.post(f"/boards/{board_id}/lists/{list_b['id']}/cards", json={
+        "name": name}, headers=auth_headers).json() for name in ["B1", "B2"]]
+
+    res = client.post("/cards/move", json={
+        "card_ids": [a1["id"], a3["id"]],
+        "destination_list_id": list_b["id"],
+        "destination_list_position": 2
+    }, headers=auth_headers)
+    assert res.status_code == 200
+
+    def fetch_cards(list_id):
+        return [(c["id"], c["position"]) for c in client.get(
+            f"/boards/{board_id}/lists/{list_id}/cards", headers=auth_headers).json()]
+
+    assert fetch_cards(list_a["id"]) == [(a2["id"], 2)]
+    b_cards = fetch_cards(list_b["id"])
+    assert [card_id for card_id, _ in b_cards] == [
+        b1["id"], a1["id"], a3["id"], b2["id"]]
+    assert b_cards[0][1] == 1 and b_cards[3][1] == 2
+
+
 # --- TAG ASSIGN TESTS ---
 
 def test_attach_tag(client, auth_headers):
@@ -245,7 +485,7 @@ def test_attach_tag(client, auth_headers):
 
     # 5. Check if the tag was attached
     cards = client.get(
-        f"/boards/{board_id}/lists/{list_id}/cards",
+        f"/boards/{board_id}/lists/{list_id}/cards?expand=tags",
         headers=auth_headers
     ).json()
     card = [card for card in cards if card["id"] == card_id][0]
@@ -290,7 +530,7 @@ def test_detach_tag(client, auth_headers):
 
     # 4. Check if the tag was attached
     cards = client.get(
-        f"/boards/{board_id}/lists/{list_id}/cards",
+        f"/boards/{board_id}/lists/{list_id}/cards?expand=tags",
         headers=auth_headers
     ).json()
     card = [card for card in cards if card["id"] == card_id][0]
@@ -309,7 +549,7 @@ def test_detach_tag(client, auth_headers):
 
     # 6. Check if the tag was attached
     cards = client.get(
-        f"/boards/{board_id}/lists/{list_id}/cards",
+        f"/boards/{board_id}/lists/{list_id}/cards?expand=tags",
         headers=auth_headers
     ).json()
     card = [card for card in cards if card["id"] == card_id][0]
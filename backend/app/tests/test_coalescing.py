@@ -0,0 +1,162 @@
+"""
+Single-flight of identical concurrent reads (see `app.coalescing`).
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.util.concurrency import await_only, greenlet_spawn
+
+from ..coalescing import SingleFlight
+
+FOLLOWERS = 4
+
+
+def wait_until(condition, timeout: float = 5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "Timed out"
+        time.sleep(0.001)
+
+
+def run_concurrently(flight: SingleFlight, key: str, function, release: threading.Event) -> list:
+    """
+    Run the leader call, then `FOLLOWERS` calls of the same key while the leader waits for `release`.
+    Returns the result (or error) of each call.
+    """
+    results = [None] * (FOLLOWERS + 1)
+
+    def call(index):
+        try:
+            results[index] = flight.run(key, function, "route")
+        except Exception as error:
+            results[index] = error
+
+    threads = [threading.Thread(target=call, args=(index,)) for index in range(FOLLOWERS + 1)]
+    threads[0].start()
+    wait_until(lambda: flight.in_flight(key))
+    for thread in threads[1:]:
+        thread.start()
+
+    wait_until(lambda: flight.metrics.waiting == FOLLOWERS)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    return results
+
+
+def test_single_flight_shares_result():
+    """
+    Verifies that the concurrent calls of the same key run the function once and all get its result,
+    and that the next call runs it again.
+    """
+    flight = SingleFlight(timeout=5)
+    release = threading.Event()
+    calls = []
+
+    def load():
+        calls.append(1)
+        release.wait()
+        return {"board": len(calls)}
+
+    results = run_concurrently(flight, "board-1", load, release)
+
+    assert len(calls) == 1
+    assert results == [{"board": 1}] * (FOLLOWERS + 1)
+    assert flight.metrics.leaders == 1
+    assert flight.metrics.coalesced == FOLLOWERS
+    assert flight.metrics.coalesced_by_route["route"] == FOLLOWERS
+    assert flight.metrics.waiting == 0
+
+    assert flight.run("board-1", load) == {"board": 2}
+    assert flight.metrics.leaders == 2
+
+
+def test_single_flight_shares_error():
+    """
+    Verifies that the error of the leader (e.g. a 404) is raised in the followers.
+    """
+    flight = SingleFlight(timeout=5)
+    release = threading.Event()
+
+    def load():
+        release.wait()
+        raise HTTPException(status_code=404, detail="Board not found")
+
+    results = run_concurrently(flight, "board-1", load, release)
+
+    assert all(isinstance(result, HTTPException) and result.status_code == 404
+               for result in results)
+    assert flight.metrics.coalesced == FOLLOWERS
+
+
+def test_single_flight_timeout():
+    """
+    Verifies that a follower stops waiting at the deadline of the key and runs the function itself.
+    """
+    flight = SingleFlight(timeout=0.05)
+    release = threading.Event()
+    calls = []
+
+    def load():
+        calls.append(threading.current_thread())
+        if len(calls) == 1:
+            release.wait()
+        return len(calls)
+
+    leader = threading.Thread(target=flight.run, args=("board-1", load))
+    leader.start()
+    wait_until(lambda: flight.in_flight("board-1"))
+
+    assert flight.run("board-1", load) == 2
+    assert flight.metrics.timeouts == 1
+    assert flight.metrics.coalesced == 0
+
+    release.set()
+    leader.join()
+
+
+def test_single_flight_async_stack():
+    """
+    Verifies the coalescing of calls running in greenlets on the event loop (async stack, see
+    `AsyncSession.run_sync`): the followers wait without blocking the loop.
+    """
+    flight = SingleFlight(timeout=5)
+    calls = []
+
+    def load():
+        calls.append(1)
+        # The leader awaits the database
+        await_only(asyncio.sleep(0.05))
+        return "board"
+
+    async def main():
+        return await asyncio.gather(*[
+            greenlet_spawn(flight.run, "board-1", load) for _ in range(FOLLOWERS + 1)])
+
+    assert asyncio.run(main()) == ["board"] * (FOLLOWERS + 1)
+    assert len(calls) == 1
+    assert flight.metrics.coalesced == FOLLOWERS
+
+
+@pytest.mark.parametrize("stack", ["sync", "async"])
+def test_single_flight_keys(stack):
+    """
+    Verifies that calls of different keys are not coalesced.
+    """
+    flight = SingleFlight(timeout=5)
+
+    if stack == "sync":
+        assert [flight.run(f"board-{index}", lambda: index) for index in range(3)] == [0, 1, 2]
+    else:
+        async def main():
+            return await asyncio.gather(*[
+                greenlet_spawn(flight.run, f"board-{index}", lambda index=index: index)
+                for index in range(3)])
+        assert asyncio.run(main()) == [0, 1, 2]
+
+    assert flight.metrics.leaders == 3
+    assert flight.metrics.coalesced == 0
@@ -0,0 +1,164 @@
+"""
+Concurrent card moves (see `db.locking`), run with threads on their own database and sessions.
+The Postgres case runs when `TEST_POSTGRES_URL` is set (the tables are created and dropped there).
+The throughput is logged (`pytest --log-cli-level=INFO`) and recorded as the `moves_per_second` property.
+"""
+import logging
+import os
+import random
+import tempfile
+import threading
+import time
+
+import pytest
+from fastapi import BackgroundTasks, HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.db.database import Base, enable_sqlite_foreign_keys
+from app.models import User, Board, List, Card
+from app.routers import cards
+from app import schemas
+
+logger = logging.getLogger(__name__)
+
+THREADS = 8
+MOVES_PER_THREAD = 25
+LISTS = 3
+CARDS_PER_LIST = 6
+
+
+def database_urls():
+    yield pytest.param(
+        f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'stress.db')}", id="sqlite")
+
+    postgres_url = os.environ.get("TEST_POSTGRES_URL")
+    yield pytest.param(postgres_url, id="postgres", marks=pytest.mark.skipif(
+        not postgres_url, reason="TEST_POSTGRES_URL is not set"))
+
+
+@pytest.fixture(params=list(database_urls()))
+def stress_engine(request):
+    connect_args = {"check_same_thread": False} if request.param.startswith(
+        "sqlite") else {}
+    stress_engine = create_engine(request.param, connect_args=connect_args,
+                                  pool_size=THREADS, max_overflow=0)
+    enable_sqlite_foreign_keys(stress_engine)
+    Base.metadata.create_all(bind=stress_engine)
+
+    yield stress_engine
+
+    Base.metadata.drop_all(bind=stress_engine)
+    stress_engine.dispose()
+
+
+def seed_board(session_factory) -> tuple[int, list[int], list[int]]:
+    """
+    Create a user with a board of `LISTS` lists of `CARDS_PER_LIST` cards.
+    Returns the user id, the list ids and the card ids.
+    """
+    with session_factory() as db:
+        user = User(username="stress", email="stress@test.com",
+                    password_hash="x")
+        board = Board(name="Stress", user=user, lists_count=LISTS,
+                      cards_count=LISTS * CARDS_PER_LIST)
+        board_lists = [List(name=f"List {index}", position=index, board=board,
+                            cards_count=CARDS_PER_LIST)
+                       for index in range(1, LISTS + 1)]
+        board_cards = [
+            Card(name=f"Card {list_index}-{position}",
+                 position=position, list=board_list)
+            for list_index, board_list in enumerate(board_lists)
+            for position in range(1, CARDS_PER_LIST + 1)
+        ]
+        db.add_all([user, board, *board_lists, *board_cards])
+        db.commit()
+
+        return user.id, [board_list.id for board_list in board_lists], [card.id for card in board_cards]
+
+
+@pytest.mark.parametrize("position_mode", ["integer", "fractional"])
+def test_concurrent_moves(stress_engine, position_mode, monkeypatch, record_property):
+    """
+    Verifies that concurrent moves on the same lists keep consistent positions.
+    Scenario: `THREADS` threads move random cards (single and multi-card moves) between 3 lists.
+    Expected Result:
+        - No move fails with something else than a 400 (position out of range) or a 409 (too many conflicts).
+        - No card is lost and no two cards share a position, the "integer" lists are numbered 1..n.
+    """
+    monkeypatch.setattr(settings, "CARD_POSITION_MODE", position_mode)
+    session_factory = sessionmaker(
+        autocommit=False, autoflush=False, bind=stress_engine)
+    user_id, list_ids, card_ids = seed_board(session_factory)
+
+    results = {"moved": 0, "rejected": 0}
+    errors = []
+    results_lock = threading.Lock()
+
+    def move_cards(seed: int):
+        rng = random.Random(seed)
+
+        for _ in range(MOVES_PER_THREAD):
+            with session_factory() as db:
+                current_user = db.get(User, user_id)
+                destination_list_id = rng.choice(list_ids)
+                position = rng.choice([None, 1, 2, 3])
+
+                try:
+                    if rng.random() < 0.8:
+                        cards.move_card(
+                            card_id=rng.choice(card_ids),
+                            move_data=schemas.CardMove(
+                                destination_list_id=destination_list_id, destination_list_position=position),
+                            background_tasks=BackgroundTasks(),
+                            db=db, current_user=current_user, load_options=()
+                        )
+                    else:
+                        cards.move_cards(
+                            move_data=schemas.CardsMove(
+                                card_ids=rng.sample(card_ids, 3),
+                                destination_list_id=destination_list_id, destination_list_position=position),
+                            background_tasks=BackgroundTasks(),
+                            db=db, current_user=current_user, load_options=()
+                        )
+                    outcome = "moved"
+                except HTTPException as error:
+                    if error.status_code not in (400, 409):
+                        errors.append(error)
+                    outcome = "rejected"
+                except Exception as error:
+                    errors.append(error)
+                    outcome = "rejected"
+
+            with results_lock:
+                results[outcome] += 1
+
+    threads = [threading.Thread(target=move_cards, args=(seed,))
+               for seed in range(THREADS)]
+    started_at = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started_at
+
+    moves_per_second = results["moved"] / elapsed
+    record_property("moves_per_second", round(moves_per_second, 1))
+    logger.info("%s (%s): %d moves, %d rejected in %.2fs, %.1f moves/s",
+                stress_engine.dialect.name, position_mode, results["moved"], results["rejected"],
+                elapsed, moves_per_second)
+
+    assert errors == []
+    assert results["moved"] > 0
+
+    with session_factory() as db:
+        rows = db.query(Card.list_id, Card.position).all()
+
+    assert len(rows) == len(card_ids)
+    for list_id in list_ids:
+        positions = sorted(position for card_list_id,
+                           position in rows if card_list_id == list_id)
+        assert len(set(positions)) == len(positions)
+        if position_mode == "integer":
+            assert positions == list(range(1, len(positions) + 1))
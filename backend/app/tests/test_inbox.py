@@ -1,3 +1,6 @@
+from .conftest import count_queries
+
+
 def test_get_inbox(client, auth_headers):
     """
     Tests retrieving the Inbox board for the authenticated user.
@@ -32,3 +35,49 @@ def test_get_inbox_unauthorized(client):
     # Not passing the headers
     response = client.get("/inbox/")
     assert response.status_code == 401
+
+
+def test_get_inbox_fixed_queries(client, auth_headers):
+    """
+    Verifies that the number of queries to build the Inbox does not depend on the number of cards or tags.
+    """
+    inbox = client.get("/inbox/", headers=auth_headers).json()
+    cards_url = f"/boards/{inbox['id']}/lists/{inbox['lists'][0]['id']}/cards"
+
+    def inbox_queries():
+        with count_queries() as statements:
+            response = client.get("/inbox/", headers=auth_headers)
+        assert response.status_code == 200
+        return len(statements)
+
+    client.post(cards_url, json={"name": "Task 1"}, headers=auth_headers)
+    queries_with_one_card = inbox_queries()
+
+    for i in range(2, 6):
+        client.post(cards_url, json={"name": f"Task {i}"}, headers=auth_headers)
+
+    assert inbox_queries() == queries_with_one_card
+    assert len(client.get("/inbox/", headers=auth_headers).json()
+               ["lists"][0]["cards"]) == 5
+
+
+def test_get_inbox_etag(client, auth_headers):
+    """
+    Verifies that the Inbox answers `If-None-Match` with 304 until one of its cards changes.
+    """
+    response = client.get("/inbox", headers=auth_headers)
+    etag = response.headers["ETag"]
+    inbox = response.json()
+
+    response = client.get(
+        "/inbox", headers={**auth_headers, "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+
+    client.post(f"/boards/{inbox['id']}/lists/{inbox['lists'][0]['id']}/cards",
+                json={"name": "Task 1"}, headers=auth_headers)
+
+    response = client.get(
+        "/inbox", headers={**auth_headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
@@ -0,0 +1,141 @@
+"""
+Query plan regression tests.
+Each hot query is run through SQLite `EXPLAIN QUERY PLAN` to check that it is resolved with an
+index lookup (SEARCH ... USING INDEX) instead of a full table scan.
+"""
+import pytest
+from sqlalchemy import func, select, update, text
+from sqlalchemy.exc import IntegrityError
+
+from ..models import User, Board, List, Card, Tag, Tombstone, card_tags
+from ..ranking import CARD_KEY, CARD_ORDER
+from ..pagination import Page, paginate
+
+
+def query_plan(db, statement) -> str:
+    """
+    Return the details of the SQLite query plan of a statement (or ORM query) as a single string.
+    """
+    if hasattr(statement, "statement"):
+        statement = statement.statement
+
+    sql = statement.compile(
+        dialect=db.get_bind().dialect,
+        compile_kwargs={"literal_binds": True}
+    )
+    rows = db.execute(text(f"EXPLAIN QUERY PLAN {sql}")).all()
+    return "\n".join(row.detail for row in rows)
+
+
+def assert_index_lookup(plan: str, table: str, index: str):
+    assert f"SEARCH {table} USING" in plan, plan
+    assert index in plan, plan
+    assert f"SCAN {table}" not in plan, plan
+
+
+HOT_QUERIES = {
+    # create_card: bottom of the list
+    "cards max position": (
+        lambda db: db.query(func.max(Card.position)).filter(Card.list_id == 1),
+        "cards", "ix_cards_list_id_position"
+    ),
+    # move_card: shift of the positions after the moved card
+    "cards position shift": (
+        lambda db: update(Card).where(Card.list_id == 1, Card.position > 2)
+        .values({Card.position: Card.position - 1}),
+        "cards", "ix_cards_list_id_position"
+    ),
+    # move_card: size of the destination list
+    "cards count": (
+        lambda db: db.query(func.count(Card.id)).filter(Card.list_id == 1),
+        "cards", "ix_cards_list_id_"
+    ),
+    # get_list_cards and List.cards
+    "cards of a list": (
+        lambda db: select(Card).where(Card.list_id == 1).order_by(*CARD_ORDER),
+        "cards", "ix_cards_list_id_position"
+    ),
+    # create_list: bottom of the board, get_board_lists and Board.lists
+    "lists of a board": (
+        lambda db: select(List).where(List.board_id == 1)
+        .order_by(List.position.asc(), List.name.asc()),
+        "lists", "ix_lists_board_id_position"
+    ),
+    # get_inbox
+    "inbox of a user": (
+        lambda db: db.query(Board).filter(
+            Board.user_id == 1, Board.is_inbox == True),
+        "boards", "_user_id_"
+    ),
+    # get_user_boards
+    "boards of a user": (
+        lambda db: db.query(Board).filter(
+            Board.user_id == 1, Board.is_inbox == False),
+        "boards", "ix_boards_user_id_is_inbox_id"
+    ),
+    # get_board_tags and Board.tags
+    "tags of a board": (
+        lambda db: select(Tag).where(Tag.board_id == 1),
+        "tags", "ix_tags_board_id"
+    ),
+    # Tag.cards
+    "cards of a tag": (
+        lambda db: select(card_tags.c.card_id).where(card_tags.c.tag_id == 1),
+        "card_tags", "ix_card_tags_tag_id_card_id"
+    ),
+    # Pages (see `app.pagination`): get_list_cards and get_inbox, get_user_boards, Tag.cards
+    "page of cards of a list": (
+        lambda db: paginate(select(Card).where(Card.list_id == 1),
+                            CARD_KEY, Page(limit=50, cursor=(3, "Task", 7))),
+        "cards", "ix_cards_list_id_position"
+    ),
+    "page of boards of a user": (
+        lambda db: paginate(select(Board.id).where(Board.user_id == 1, Board.is_inbox == False),
+                            (Board.id,), Page(limit=50, cursor=(7,))),
+        "boards", "ix_boards_user_id_is_inbox_id"
+    ),
+    "page of cards of a tag": (
+        lambda db: paginate(select(card_tags.c.card_id).where(card_tags.c.tag_id == 1),
+                            (card_tags.c.card_id,), Page(limit=50, cursor=(7,))),
+        "card_tags", "ix_card_tags_tag_id_card_id"
+    ),
+    # get_board_changes: cards changed since the cursor
+    "cards changed since": (
+        lambda db: select(Card.id).join(List, List.id == Card.list_id)
+        .where(List.board_id == 1, Card.change_seq > 5),
+        "cards", "ix_cards_list_id_change_seq"
+    ),
+    # get_board_changes: deletions since the cursor
+    "tombstones since": (
+        lambda db: select(Tombstone).where(
+            Tombstone.board_id == 1, Tombstone.change_seq > 5),
+        "tombstones", "ix_tombstones_board_id_change_seq"
+    ),
+}
+
+
+@pytest.mark.parametrize("name", HOT_QUERIES)
+def test_hot_query_uses_index(db_session, name):
+    build_query, table, index = HOT_QUERIES[name]
+    plan = query_plan(db_session, build_query(db_session))
+    assert_index_lookup(plan, table, index)
+
+
+def test_one_inbox_per_user(db_session):
+    """
+    The partial unique index only allows one inbox per user (and any number of regular boards).
+    """
+    user = User(username="indexuser", email="index@example.com",
+                password_hash="hash")
+    db_session.add_all([
+        user,
+        Board(name="Inbox", is_inbox=True, user=user),
+        Board(name="Board 1", user=user),
+        Board(name="Board 2", user=user),
+    ])
+    db_session.commit()
+
+    db_session.add(Board(name="Second Inbox", is_inbox=True, user=user))
+    with pytest.raises(IntegrityError):
+        db_session.commit()
+    db_session.rollback()
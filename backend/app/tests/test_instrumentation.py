@@ -0,0 +1,66 @@
+import logging
+
+from fastapi.testclient import TestClient
+
+from ..main import app
+from ..db import instrumentation
+from .conftest import engines
+
+
+def test_sql_instrumentation_headers_and_log(client, auth_headers, caplog):
+    """
+    Tests:
+    1. The instrumented app adds the Server-Timing and X-DB-Query-Count headers.
+    2. The request summary is logged and repeated statements are reported as possible N+1.
+    """
+    for engine in engines:
+        instrumentation.install(engine)
+    instrumented_app = instrumentation.SQLInstrumentationMiddleware(
+        app, repeated_threshold=1)
+
+    try:
+        with TestClient(instrumented_app) as instrumented_client:
+            with caplog.at_level(logging.DEBUG, logger=instrumentation.__name__):
+                response = instrumented_client.get(
+                    "/inbox", headers=auth_headers)
+    finally:
+        for engine in engines:
+            instrumentation.uninstall(engine)
+
+    assert response.status_code == 200
+    query_count = int(response.headers["X-DB-Query-Count"])
+    assert query_count > 0
+    assert response.headers["Server-Timing"].startswith("db;dur=")
+    assert f'desc="{query_count} queries"' in response.headers["Server-Timing"]
+
+    messages = [record.getMessage() for record in caplog.records]
+    assert f"GET /inbox: {query_count} queries" in messages[0]
+    assert any("possible N+1" in message for message in messages)
+
+
+def test_statement_shape():
+    assert instrumentation.statement_shape(
+        "SELECT * FROM tags\n WHERE tags.id IN (?, ?, ?)"
+    ) == instrumentation.statement_shape(
+        "SELECT * FROM tags WHERE tags.id IN (?)"
+    )
+
+
+def test_query_budget(client, auth_headers, query_budget, fill_data):
+    """
+    Budgets of the most used read routes.
+    The budgets include the query of the authenticated user.
+    """
+    board_id = client.get("/boards/", headers=auth_headers).json()[0]["id"]
+
+    with query_budget(4):
+        client.get(f"/boards/{board_id}", headers=auth_headers)
+
+    with query_budget(6):
+        client.get(f"/boards/{board_id}/lists", headers=auth_headers)
+
+    with query_budget(6):
+        client.get("/inbox/", headers=auth_headers)
+
+    with query_budget(2):
+        client.get("/boards/", headers=auth_headers)
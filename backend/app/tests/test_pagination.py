@@ -0,0 +1,166 @@
+"""
+Keyset pagination of the collections (see `app.pagination`).
+"""
+from ..models import Board, List, Tag
+from ..pagination import NEXT_CURSOR_HEADER, encode_cursor
+from .conftest import count_queries
+
+
+def fetch_pages(client, auth_headers, url, limit, items=lambda data: data, params=None):
+    """
+    Walk every page of a paginated url. Returns the items of each page.
+    """
+    pages = []
+    cursor = None
+
+    while True:
+        page_params = (params or {}) | {"limit": limit} | (
+            {"cursor": cursor} if cursor else {})
+        response = client.get(url, params=page_params, headers=auth_headers)
+        assert response.status_code == 200
+
+        pages.append(items(response.json()))
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if not cursor:
+            break
+
+    return pages
+
+
+def test_list_cards_pages(client, auth_headers, db_session, fill_data):
+    """
+    Verifies the pages of the cards of a list.
+    Scenario: 'List 3' with Task 7, 8, 9 and 4 more cards, one of them moved to the top.
+    Expected Result:
+        - Pages of 3, 3 and 1 cards, in the order of the whole list, the last one without next cursor.
+        - A next page runs the same queries as the first one.
+    """
+    board_id, list_id = db_session.query(List.board_id, List.id).filter(
+        List.name == "List 3").one()
+    url = f"/boards/{board_id}/lists/{list_id}/cards"
+
+    for i in range(4):
+        card = client.post(url, json={"name": f"Extra {i}"},
+                           headers=auth_headers).json()
+    client.post(f"/cards/{card['id']}/move", json={
+        "destination_list_id": list_id, "destination_list_position": 1}, headers=auth_headers)
+
+    all_cards = [card["id"] for card in client.get(
+        url, headers=auth_headers).json()]
+    assert len(all_cards) == 7
+
+    pages = fetch_pages(client, auth_headers, url, 3,
+                        lambda cards: [card["id"] for card in cards])
+
+    assert [len(page) for page in pages] == [3, 3, 1]
+    assert sum(pages, []) == all_cards
+
+    def queries_per_page(params):
+        with count_queries() as statements:
+            response = client.get(url, params=params, headers=auth_headers)
+        return response, len(statements)
+
+    first_page, first_page_queries = queries_per_page({"limit": 3})
+    _, next_page_queries = queries_per_page(
+        {"limit": 3, "cursor": first_page.headers[NEXT_CURSOR_HEADER]})
+    assert next_page_queries == first_page_queries
+
+    # An exact page has no next cursor
+    response = client.get(url, params={"limit": 7}, headers=auth_headers)
+    assert NEXT_CURSOR_HEADER not in response.headers
+
+
+def test_user_boards_pages(client, auth_headers, db_session, fill_data):
+    """
+    Verifies the pages of `GET /boards`, with and without the statistics.
+    """
+    for i in range(3):
+        client.post("/boards", json={"name": f"Board {i}"}, headers=auth_headers)
+
+    board_ids = [board["id"]
+                 for board in client.get("/boards", headers=auth_headers).json()]
+    assert len(board_ids) == 5
+
+    pages = fetch_pages(client, auth_headers, "/boards", 2,
+                        lambda boards: [board["id"] for board in boards])
+    assert pages == [board_ids[:2], board_ids[2:4], board_ids[4:]]
+
+    pages = fetch_pages(client, auth_headers, "/boards", 2,
+                        lambda boards: [(board["id"], len(board["tags"])) for board in boards],
+                        params={"stats": True})
+    assert [[board_id for board_id, _ in page] for page in pages] == [
+        board_ids[:2], board_ids[2:4], board_ids[4:]]
+    # The tags of a board are not cut by the page
+    assert all(tags_count == 5 for page in pages for _, tags_count in page)
+
+
+def test_inbox_pages(client, auth_headers, fill_data):
+    """
+    Verifies the pages of the cards of the inbox (Task 1, 2, 3).
+    """
+    pages = fetch_pages(client, auth_headers, "/inbox", 2,
+                        lambda inbox: [card["name"] for card in inbox["lists"][0]["cards"]])
+
+    assert pages == [["Task 1", "Task 2"], ["Task 3"]]
+
+    # Without the parameters the whole inbox is returned
+    inbox = client.get("/inbox", headers=auth_headers).json()
+    assert len(inbox["lists"][0]["cards"]) == 3
+
+
+def test_tag_cards_pages(client, auth_headers, db_session, fill_data):
+    """
+    Verifies the pages of the cards of a tag, by id.
+    Scenario: The first tag of 'Second Board' on Task 7, 8 and 9.
+    Expected Result: Pages of 2 and 1 cards, the tagged cards themselves are untouched.
+    """
+    board_id, tag_id = db_session.query(Board.id, Tag.id).join(Board.tags).filter(
+        Board.name == "Second Board").order_by(Tag.id).first()
+    list_id = db_session.query(List.id).filter(
+        List.board_id == board_id).scalar()
+    card_ids = [card["id"] for card in client.get(
+        f"/boards/{board_id}/lists/{list_id}/cards", headers=auth_headers).json()]
+
+    for card_id in card_ids:
+        client.post(f"/cards/{card_id}/tags/{tag_id}", headers=auth_headers)
+
+    pages = fetch_pages(client, auth_headers, f"/boards/{board_id}/tags/{tag_id}", 2,
+                        lambda tag: [card["id"] for card in tag["cards"]],
+                        params={"expand": "cards"})
+    assert pages == [sorted(card_ids)[:2], sorted(card_ids)[2:]]
+
+    # Reading a page does not detach the tag from the other cards
+    tag = client.get(f"/boards/{board_id}/tags/{tag_id}", params={"expand": "cards"},
+                     headers=auth_headers).json()
+    assert sorted(card["id"] for card in tag["cards"]) == sorted(card_ids)
+
+
+def test_invalid_cursor(client, auth_headers, fill_data):
+    """
+    Verifies that a malformed cursor, one of another collection or one with values of the wrong
+    type is rejected with 400.
+    """
+    response = client.get("/boards", params={"cursor": "not a cursor"},
+                          headers=auth_headers)
+    assert response.status_code == 400
+
+    # A cursor of the cards (3 columns) used on the boards (1 column)
+    inbox = client.get("/inbox", params={"limit": 1}, headers=auth_headers)
+    response = client.get("/boards", params={"cursor": inbox.headers[NEXT_CURSOR_HEADER]},
+                          headers=auth_headers)
+    assert response.status_code == 400
+
+    # Values that are not scalars, or not of the type of their column
+    for key in ([[1]], [{"a": 1}], [None], [True], ["x"], [1.5]):
+        response = client.get("/boards", params={"cursor": encode_cursor(key)},
+                              headers=auth_headers)
+        assert response.status_code == 400, key
+
+    response = client.get("/inbox", params={"cursor": encode_cursor([1, "x", "Task", 1])},
+                          headers=auth_headers)
+    assert response.status_code == 400
+
+    # An integer rank is a valid float
+    response = client.get("/inbox", params={"cursor": encode_cursor([0, 0, "Task", 1])},
+                          headers=auth_headers)
+    assert response.status_code == 200
@@ -0,0 +1,117 @@
+import asyncio
+
+import pytest
+from starlette.websockets import WebSocketDisconnect
+
+from app import realtime
+from app.models import Board
+
+
+def ws_url(board_id, auth_headers):
+    token = auth_headers["Authorization"].split()[1]
+    return f"/boards/{board_id}/ws?token={token}"
+
+
+def test_board_events(client, auth_headers, db_session, fill_data):
+    """
+    Tests:
+    1. The subscriber gets the current cursor of the board.
+    2. Committed changes of the board are pushed with the new cursor (create, move, delete).
+    3. Changes of other boards are not pushed.
+    """
+    (board_id, version), (second_board_id, _) = db_session.query(Board.id, Board.version).filter(
+        Board.is_inbox == False).order_by(Board.id).all()
+    board_url = f"/boards/{board_id}"
+    list_id = client.get(f"{board_url}/lists",
+                         headers=auth_headers).json()[1]["id"]
+
+    with client.websocket_connect(ws_url(board_id, auth_headers)) as websocket:
+        # 1. Subscribed
+        subscribed = websocket.receive_json()
+        assert subscribed == {"type": "subscribed",
+                              "board_id": board_id, "cursor": version}
+
+        # 2. Changes
+        # A change of another board first: it must not be received
+        client.patch(f"/boards/{second_board_id}",
+                     json={"name": "Renamed"}, headers=auth_headers)
+
+        card = client.post(f"{board_url}/lists/{list_id}/cards",
+                           json={"name": "New card"}, headers=auth_headers).json()
+        event = websocket.receive_json()
+        assert event["board_id"] == board_id
+        assert event["cursor"] == subscribed["cursor"] + 1
+        assert event["changes"] == [
+            {"entity": "card", "id": card["id"], "op": "upsert"}]
+
+        client.post(f"/cards/{card['id']}/move", json={
+            "destination_list_id": list_id, "destination_list_position": 1}, headers=auth_headers)
+        event = websocket.receive_json()
+        assert {"entity": "card", "id": card["id"],
+                "op": "upsert"} in event["changes"]
+        assert {"entity": "list", "id": list_id,
+                "op": "reorder"} in event["changes"]
+
+        client.delete(f"{board_url}/lists/{list_id}/cards/{card['id']}",
+                      headers=auth_headers)
+        event = websocket.receive_json()
+        # The next cards of the list move up
+        assert event["changes"] == [
+            {"entity": "card", "id": card["id"], "op": "delete"},
+            {"entity": "list", "id": list_id, "op": "reorder"}]
+
+
+def test_board_events_unauthorized(client, auth_headers, db_session, fill_data):
+    """
+    Invalid tokens and boards of other users are rejected.
+    """
+    board_id = db_session.query(Board.id).filter(
+        Board.is_inbox == False).first().id
+
+    client.post("/auth/register", json={
+        "username": "other", "email": "other@example.com", "password": "password123"})
+    token = client.post("/auth/login", data={
+        "username": "other", "password": "password123"}).json()["access_token"]
+
+    for url in [f"/boards/{board_id}/ws?token=invalid",
+                ws_url(board_id, {"Authorization": f"Bearer {token}"})]:
+        with pytest.raises(WebSocketDisconnect) as exc_info:
+            with client.websocket_connect(url) as websocket:
+                websocket.receive_json()
+        assert exc_info.value.code == 1008
+
+
+def test_changes_published_on_commit(db_session, published_events):
+    """
+    Queued changes are published once committed, and dropped on rollback.
+    """
+    realtime.queue_change(db_session, 1, 2, "card", 3)
+    db_session.rollback()
+    assert published_events == []
+
+    realtime.queue_change(db_session, 1, 2, "card", 3)
+    realtime.queue_change(db_session, 1, 3, "card", 3)
+    db_session.commit()
+    assert published_events == [{"type": "changes", "board_id": 1, "cursor": 3,
+                                 "changes": [{"entity": "card", "id": 3, "op": "upsert"}]}]
+
+
+def test_slow_subscriber_evicted():
+    """
+    A subscriber whose queue is full is evicted, the others keep receiving the events.
+    """
+    async def scenario():
+        broker = realtime.InMemoryBroker(max_queue=2)
+
+        async with broker.subscribe(1) as slow, broker.subscribe(1) as fast:
+            for cursor in range(1, 4):
+                broker.publish(1, {"cursor": cursor})
+                await asyncio.sleep(0)
+                assert (await fast.__anext__())["cursor"] == cursor
+
+            with pytest.raises(realtime.SubscriberEvicted):
+                await slow.__anext__()
+
+        assert broker.subscribers_count(1) == 0
+
+    asyncio.run(scenario())
@@ -0,0 +1,78 @@
+"""
+Fast serialization of the large reads (see `app.serialization`).
+"""
+from ..cache import get_response_cache
+from ..core.config import settings
+from ..models import Board, List, Card
+from ..pagination import NEXT_CURSOR_HEADER
+
+
+def test_fast_serialization_same_output(client, auth_headers, db_session, fill_data, monkeypatch):
+    """
+    Verifies that the fast path sends the same responses as the response models.
+    Scenario: Task 5 of 'List 2' with a fractional rank, a due date and a tag.
+    Expected Result: Same status, body, ETag and next cursor for every route, shape and page.
+    """
+    board_id, list_id = db_session.query(List.board_id, List.id).filter(
+        List.name == "List 2").one()
+    card_id = db_session.query(Card.id).filter(Card.name == "Task 5").scalar()
+    tag_id = client.get(f"/boards/{board_id}/tags",
+                        headers=auth_headers).json()[0]["id"]
+    client.post(f"/cards/{card_id}/tags/{tag_id}", headers=auth_headers)
+    client.patch(f"/boards/{board_id}/lists/{list_id}/cards/{card_id}",
+                 json={"due_date": "2030-01-02T03:04:05.678"}, headers=auth_headers)
+
+    monkeypatch.setattr(settings, "CARD_POSITION_MODE", "fractional")
+    client.post(f"/boards/{board_id}/lists/{list_id}/cards",
+                json={"name": "Task 6 bis"}, headers=auth_headers)
+    client.post(f"/cards/{card_id}/move", json={
+        "destination_list_id": list_id, "destination_list_position": 2}, headers=auth_headers)
+
+    urls = [
+        "/inbox",
+        "/inbox?limit=2",
+        f"/boards/{board_id}",
+        f"/boards/{board_id}/lists",
+        f"/boards/{board_id}/lists/{list_id}",
+        f"/boards/{board_id}/lists/{list_id}/cards",
+        f"/boards/{board_id}/lists/{list_id}/cards?limit=1",
+        f"/boards/{board_id}/lists/{list_id}/cards/{card_id}",
+    ]
+    urls += [f"{url}{'&' if '?' in url else '?'}expand=cards,tags,list" for url in urls]
+
+    def get_all():
+        responses = {}
+        for url in urls:
+            response = client.get(url, headers=auth_headers)
+            responses[url] = (response.status_code, response.json(),
+                              response.headers.get("ETag"), response.headers.get(NEXT_CURSOR_HEADER))
+        return responses
+
+    default = get_all()
+    # Built again, not served from the response cache (see `app.cache`)
+    get_response_cache().clear()
+    monkeypatch.setattr(settings, "FAST_SERIALIZATION", True)
+    fast = get_all()
+
+    assert fast == default
+    card = default[f"/boards/{board_id}/lists/{list_id}/cards/{card_id}?expand=cards,tags,list"][1]
+    assert card["position"] == 2.5
+    assert card["due_date"] == "2030-01-02T03:04:05.678000"
+    assert [tag["id"] for tag in card["tags"]] == [tag_id]
+
+
+def test_fast_serialization_not_modified(client, auth_headers, db_session, fill_data, monkeypatch):
+    """
+    Verifies that the conditional requests still get a 304 with the fast path.
+    """
+    monkeypatch.setattr(settings, "FAST_SERIALIZATION", True)
+    board_id = db_session.query(Board.id).filter(
+        Board.name == "First Board").scalar()
+
+    response = client.get(f"/boards/{board_id}", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+
+    response = client.get(f"/boards/{board_id}", headers=auth_headers | {
+        "If-None-Match": response.headers["ETag"]})
+    assert response.status_code == 304
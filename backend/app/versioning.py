@@ -0,0 +1,217 @@
+"""
+Board versions, change tracking and conditional GETs.
+
+Every board has a `version` counter, increased by the write routes (in the same transaction as the
+change) whenever the board, its lists, its cards or its tags change.
+- The board reads send an `ETag` built from it and answer `If-None-Match` with a 304 after a single
+  version query, without loading (nor serializing) the tree.
+- The version is also the change sequence of the board: changed lists, cards and tags are stamped
+  with it (`change_seq`) and deletions leave a `Tombstone` with it. A client that knows the version
+  it synced (the cursor) only asks for what changed after it (`GET /boards/{id}/changes`).
+  Attaching or detaching a tag is a change of the card, changing a tag is not (the clients update
+  the copies of the tag in their cards).
+- The recorded changes are published to the real-time subscribers once committed (see `app.realtime`)
+  and the cached responses of the changed boards are invalidated (see `app.cache`).
+"""
+import hashlib
+
+from fastapi import Request, Response, status
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from .models import Board, List, Card, Tag, Tombstone
+from .realtime import queue_change
+from . import cache
+
+ENTITIES = {Board: "board", List: "list", Card: "card", Tag: "tag"}
+
+
+def bump_board_version(db: Session, *board_ids: int) -> dict[int, int]:
+    """
+    Increase the version of the given boards and return their new version by board id.
+    Does not commit: it is part of the transaction of the change.
+    """
+    board_ids = {board_id for board_id in board_ids if board_id is not None}
+    if not board_ids:
+        return {}
+
+    rows = db.execute(
+        update(Board)
+        .where(Board.id.in_(board_ids))
+        .values({Board.version: Board.version + 1})
+        .returning(Board.id, Board.version, Board.user_id)
+        .execution_options(synchronize_session=False)
+    ).all()
+
+    for board_id, _, user_id in rows:
+        cache.queue_invalidation(db, cache.board_scope(board_id), cache.boards_scope(user_id))
+
+    return {board_id: version for board_id, version, _ in rows}
+
+
+def bump_list_board_version(db: Session, list_id: int) -> tuple[int, int]:
+    """
+    Increase the version of the board of the given list and return the board id and its new version
+    (see `bump_board_version`).
+    """
+    board_id, version, user_id = db.execute(
+        update(Board)
+        .where(Board.id == select(List.board_id).where(List.id == list_id).scalar_subquery())
+        .values({Board.version: Board.version + 1})
+        .returning(Board.id, Board.version, Board.user_id)
+        .execution_options(synchronize_session=False)
+    ).one()
+    cache.queue_invalidation(db, cache.board_scope(board_id), cache.boards_scope(user_id))
+
+    return board_id, version
+
+
+def record_change(db: Session, board_id: int, *objects) -> int:
+    """
+    Bump the board version and stamp the changed (or new) lists, cards and tags with it.
+    The board itself has no stamp: it is sent whenever its version changed.
+    Returns the new version.
+    """
+    version = bump_board_version(db, board_id)[board_id]
+
+    for changed in objects:
+        if not isinstance(changed, Board):
+            changed.change_seq = version
+        queue_change(db, board_id, version, ENTITIES[type(changed)], changed)
+
+    return version
+
+
+def record_deletion(db: Session, board_id: int, entity: str, entity_id: int) -> int:
+    """
+    Bump the board version and leave a tombstone for the deleted list, card or tag.
+    The children are not recorded: the clients drop the cards of a deleted list and the
+    deleted tags from their cards.
+    Returns the new version.
+    """
+    version = bump_board_version(db, board_id)[board_id]
+    db.add(Tombstone(board_id=board_id, entity=entity,
+                     entity_id=entity_id, change_seq=version))
+    queue_change(db, board_id, version, entity, entity_id, "delete")
+
+    return version
+
+
+def record_move(db: Session, card: Card, origin_board_id: int, destination_board_id: int) -> tuple[int, int]:
+    """
+    Bump the versions of the boards of a card move and stamp the card.
+    A card moved to another board leaves a tombstone in its previous board.
+    Returns the new (origin, destination) versions, to stamp the cards shifted by the move.
+    """
+    versions = record_bulk_move(
+        db, {card.id: origin_board_id}, destination_board_id)
+    card.change_seq = versions[destination_board_id]
+
+    return versions[origin_board_id], versions[destination_board_id]
+
+
+def record_bulk_move(db: Session, origin_board_ids: dict[int, int], destination_board_id: int) -> dict[int, int]:
+    """
+    Bump once the versions of the boards of a move of several cards (`origin_board_ids`: the board
+    of each moved card by card id). The cards are stamped by the caller, with the destination version.
+    The cards moved to another board leave a tombstone in their previous board.
+    Returns the new versions by board id.
+    """
+    versions = bump_board_version(
+        db, destination_board_id, *origin_board_ids.values())
+    destination_version = versions[destination_board_id]
+
+    for card_id, origin_board_id in origin_board_ids.items():
+        queue_change(db, destination_board_id,
+                     destination_version, "card", card_id)
+
+        if origin_board_id != destination_board_id:
+            db.add(Tombstone(board_id=origin_board_id, entity="card",
+                             entity_id=card_id, change_seq=versions[origin_board_id]))
+            queue_change(db, origin_board_id,
+                         versions[origin_board_id], "card", card_id, "delete")
+
+    return versions
+
+
+def record_list_move(db: Session, board_list: List, origin_board_id: int, destination_board_id: int) -> dict[int, int]:
+    """
+    Bump the versions of the boards of a list move and stamp the list.
+    A list moved to another board leaves a tombstone in its previous board (the clients drop its cards
+    there), its cards are stamped by the caller with the destination version.
+    Returns the new versions by board id, to stamp the lists shifted by the move.
+    """
+    versions = bump_board_version(db, origin_board_id, destination_board_id)
+    destination_version = versions[destination_board_id]
+
+    board_list.change_seq = destination_version
+    queue_change(db, destination_board_id,
+                 destination_version, "list", board_list)
+
+    if origin_board_id != destination_board_id:
+        db.add(Tombstone(board_id=origin_board_id, entity="list",
+                         entity_id=board_list.id, change_seq=versions[origin_board_id]))
+        queue_change(db, origin_board_id,
+                     versions[origin_board_id], "list", board_list.id, "delete")
+
+    return versions
+
+
+def record_bulk_change(db: Session, board_id: int, version: int, entity: str, entity_ids: list[int]) -> None:
+    """
+    Record the lists, cards or tags changed (or created) by a bulk statement, already stamped with `version`.
+    """
+    for entity_id in entity_ids:
+        queue_change(db, board_id, version, entity, entity_id)
+
+
+def record_reorder(db: Session, board_id: int, version: int, list_id: int) -> None:
+    """
+    Record that the positions of the cards of a list were shifted by a bulk update
+    (already stamped with `version`).
+    """
+    queue_change(db, board_id, version, "list", list_id, "reorder")
+
+
+def board_etag(board_id: int, version: int) -> str:
+    return f'"board-{board_id}-v{version}"'
+
+
+def boards_etag(versions: list[tuple[int, int]]) -> str:
+    """
+    ETag of a collection of boards from their (id, version) pairs: it changes when a board
+    of the collection changes, is added or is removed.
+    """
+    digest = hashlib.sha1(
+        ",".join(f"{board_id}:{version}" for board_id, version in versions).encode()
+    ).hexdigest()
+
+    return f'"boards-{digest[:20]}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    Check the `If-None-Match` header against an ETag (weak comparison, as in RFC 9110).
+    """
+    if not if_none_match:
+        return False
+
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or etag in [candidate.removeprefix("W/") for candidate in candidates]
+
+
+def conditional_response(request: Request, response: Response, etag: str) -> Response | None:
+    """
+    Set the ETag of the response and return a 304 response if the client already has this version.
+
+    Usage:
+        not_modified = conditional_response(request, response, board_etag(board_id, version))
+        if not_modified:
+            return not_modified
+    """
+    response.headers["ETag"] = etag
+
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+    return None